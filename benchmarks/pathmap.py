@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Benchmark for fs.path.PathMap.
+
+Times setting, getting and iterating over a large number of paths laid out
+like a filesystem (/dN/sN/fN), and reports the memory used by the map.  To
+compare against another version of PathMap, give a git revision with
+--compare; its fs/path.py is loaded alongside the one in this tree and both
+are run on the same paths, using the same iteratepath() so that only the
+map itself is compared.
+
+    python benchmarks/pathmap.py -n 1000000 --compare HEAD~1
+
+Memory is measured as the growth in maximum RSS, so each version is run in
+a separate process.
+"""
+
+import os
+import gc
+import sys
+import imp
+import time
+import resource
+import subprocess
+from optparse import OptionParser, SUPPRESS_HELP
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import fs.path
+
+
+def load_pathmap(rev):
+    """Get the PathMap class from fs/path.py at the given git revision."""
+    if rev is None:
+        return fs.path.PathMap
+    source = subprocess.check_output(["git", "show", "%s:fs/path.py" % rev])
+    #  Keep the module alive, or Python 2 will clear its globals
+    module = sys.modules["path_%s" % rev] = imp.new_module("path_%s" % rev)
+    exec compile(source, "fs/path.py@%s" % rev, "exec") in module.__dict__
+    module.iteratepath = fs.path.iteratepath
+    return module.PathMap
+
+
+def make_paths(n):
+    return [u"/d%d/s%d/f%d" % (i // 10000, (i // 100) % 100, i) for i in xrange(n)]
+
+
+def best_of(repeat, func):
+    times = []
+    for _ in xrange(repeat):
+        gc.collect()
+        start = time.clock()
+        func()
+        times.append(time.clock() - start)
+    return min(times)
+
+
+def run(rev, n, repeat):
+    PathMap = load_pathmap(rev)
+    paths = make_paths(n)
+    lookups = paths[::10]
+
+    gc.collect()
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pm = PathMap()
+    for (i, path) in enumerate(paths):
+        pm[path] = i
+    mem = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss
+
+    def set_all():
+        m = PathMap()
+        for (i, path) in enumerate(paths):
+            m[path] = i
+
+    def get_some():
+        for path in lookups:
+            pm[path]
+
+    def iterate():
+        for _ in pm.iteritems():
+            pass
+
+    results = [("memory", "+%dMB" % (mem // 1024)),
+               ("%d __setitem__" % n, "%.2fs" % best_of(repeat, set_all)),
+               ("%d __getitem__" % len(lookups), "%.2fs" % best_of(repeat, get_some)),
+               ("iteritems()", "%.2fs" % best_of(repeat, iterate))]
+    if hasattr(PathMap, "update"):
+        def update():
+            PathMap().update((path, i) for (i, path) in enumerate(paths))
+        results.append(("update()", "%.2fs" % best_of(repeat, update)))
+    for (name, result) in results:
+        print "%-12s %-20s %s" % (rev or "working tree", name, result)
+
+
+def main():
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-n", dest="n", type="int", default=200000,
+                      help="number of paths (default 200000)")
+    parser.add_option("-r", "--repeat", dest="repeat", type="int", default=3,
+                      help="take the best of this many runs (default 3)")
+    parser.add_option("--compare", dest="compare", metavar="REV",
+                      help="also run the PathMap from this git revision")
+    parser.add_option("--rev", dest="rev", help=SUPPRESS_HELP)
+    (options, args) = parser.parse_args()
+    if options.compare is None or options.rev is not None:
+        run(options.rev, options.n, options.repeat)
+        return
+    for rev in (options.compare, None):
+        cmd = [sys.executable, __file__, "-n", str(options.n),
+               "-r", str(options.repeat)]
+        if rev is not None:
+            cmd += ["--rev", rev]
+        subprocess.check_call(cmd)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,11 @@ For more information regarding implementing a working PyFilesystem interface, se
 from __future__ import with_statement
 
 __all__ = ['DummyLock',
+           'ReadWriteLock',
            'silence_fserrors',
            'NullFile',
            'synchronize',
+           'synchronize_read',
            'FS',
            'flags_to_mode',
            'NoDefaultMeta']
@@ -33,10 +35,16 @@ try:
     import threading
 except ImportError:
     import dummy_threading as threading
+try:
+    _get_ident = threading.get_ident
+except AttributeError:
+    _get_ident = threading._get_ident
 
 from fs.path import *
 from fs.errors import *
 from fs.local_functools import wraps
+from fs import fastcopy
+from fs import iotools
 
 import six
 from six import b
@@ -67,6 +75,100 @@ class DummyLock(object):
         pass
 
 
+class ReadWriteLock(object):
+    """A reentrant readers-writer lock.
+
+    Any number of threads may hold the lock for reading at the same time,
+    but only one thread may hold it for writing, and not while any other
+    thread is reading.  :meth:`acquire` and :meth:`release` (and the context
+    manager protocol) take the lock for writing, so a ReadWriteLock can be
+    used anywhere an RLock is expected; :meth:`acquire_read` and
+    :meth:`release_read` take it for reading.
+
+    Both kinds of lock are reentrant, and a thread holding the write lock may
+    also take the read lock.  A thread holding only the read lock can't take
+    the write lock, since two threads doing so would deadlock, and attempting
+    it raises RuntimeError.  Waiting writers are given priority over new
+    readers so a steady stream of reads can't starve them.
+
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}
+        self._writer = None
+        self._write_count = 0
+        self._waiting_writers = 0
+
+    def acquire_read(self, blocking=1):
+        """Acquire the lock for reading."""
+        me = _get_ident()
+        with self._cond:
+            if me in self._readers:
+                self._readers[me] += 1
+                return True
+            if self._writer != me:
+                while self._writer is not None or self._waiting_writers:
+                    if not blocking:
+                        return False
+                    self._cond.wait()
+            self._readers[me] = 1
+            return True
+
+    def release_read(self):
+        """Release a lock acquired with :meth:`acquire_read`."""
+        me = _get_ident()
+        with self._cond:
+            try:
+                count = self._readers[me]
+            except KeyError:
+                raise RuntimeError("cannot release un-acquired lock")
+            if count > 1:
+                self._readers[me] = count - 1
+            else:
+                del self._readers[me]
+                if not self._readers:
+                    self._cond.notifyAll()
+
+    def acquire(self, blocking=1):
+        """Acquire the lock for writing."""
+        me = _get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_count += 1
+                return True
+            if me in self._readers:
+                raise RuntimeError("cannot acquire a write lock while holding a read lock")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    if not blocking:
+                        return False
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_count = 1
+            return True
+
+    def release(self):
+        """Release a lock acquired with :meth:`acquire`."""
+        with self._cond:
+            if self._writer != _get_ident():
+                raise RuntimeError("cannot release un-acquired lock")
+            self._write_count -= 1
+            if not self._write_count:
+                self._writer = None
+                self._cond.notifyAll()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
 def silence_fserrors(f, *args, **kwargs):
     """Perform a function call and return ``None`` if an :class:`fs.errors.FSError` is thrown
 
@@ -149,6 +251,35 @@ def synchronize(func):
     return acquire_lock
 
 
+def synchronize_read(func):
+    """Decorator to synchronize a method that doesn't modify the filesystem.
+
+    If self._lock is a :class:`ReadWriteLock` the method takes it for reading,
+    so it may run at the same time as other readers.  With any other lock
+    this is the same as :func:`synchronize`.
+
+    A method decorated this way must not call methods decorated with
+    :func:`synchronize`.
+
+    """
+    @wraps(func)
+    def acquire_read_lock(self, *args, **kwargs):
+        lock = self._lock
+        try:
+            acquire = lock.acquire_read
+        except AttributeError:
+            acquire = lock.acquire
+            release = lock.release
+        else:
+            release = lock.release_read
+        acquire()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            release()
+    return acquire_read_lock
+
+
 class FS(object):
     """The base class for Filesystem abstraction objects.
     An instance of a class derived from FS is an abstraction on some kind of filesystem, such as the OS filesystem or a zip file.
@@ -161,14 +292,17 @@ class FS(object):
         """The base class for Filesystem objects.
 
         :param thread_synconize: If True, a lock object will be created for the object, otherwise a dummy lock will be used.
-        :type thread_synchronize: bool
+            If "rw", a :class:`ReadWriteLock` is used so that methods decorated with :func:`synchronize_read` may run concurrently.
+        :type thread_synchronize: bool or "rw"
 
         """
 
         self.closed = False
         super(FS, self).__init__()
         self.thread_synchronize = thread_synchronize
-        if thread_synchronize:
+        if thread_synchronize == "rw":
+            self._lock = ReadWriteLock()
+        elif thread_synchronize:
             self._lock = threading.RLock()
         else:
             self._lock = DummyLock()
@@ -213,11 +347,14 @@ class FS(object):
     def __getstate__(self):
         #  Locks can't be pickled, so instead we just indicate the
         #  type of lock that should be there.  None == no lock,
-        #  True == a proper lock, False == a dummy lock.
+        #  True == a proper lock, False == a dummy lock, "rw" == a
+        #  readers-writer lock.
         state = self.__dict__.copy()
         lock = state.get("_lock", None)
         if lock is not None:
-            if isinstance(lock, threading._RLock):
+            if isinstance(lock, ReadWriteLock):
+                state["_lock"] = "rw"
+            elif isinstance(lock, threading._RLock):
                 state["_lock"] = True
             else:
                 state["_lock"] = False
@@ -227,7 +364,9 @@ class FS(object):
         self.__dict__.update(state)
         lock = state.get("_lock")
         if lock is not None:
-            if lock:
+            if lock == "rw":
+                self._lock = ReadWriteLock()
+            elif lock:
                 self._lock = threading.RLock()
             else:
                 self._lock = DummyLock()
@@ -560,9 +699,7 @@ class FS(object):
             raise ValueError("dirs_only and files_only can not both be True")
 
         if wildcard is not None:
-            if not callable(wildcard):
-                wildcard_re = re.compile(fnmatch.translate(wildcard))
-                wildcard = lambda fn: bool(wildcard_re.match(fn))
+            wildcard = wildcard_matcher(wildcard)
             entries = [p for p in entries if wildcard(p)]
 
         if dirs_only:
@@ -756,6 +893,43 @@ class FS(object):
         info = self.getinfo(path)
         return dict((k, info[k]) for k in keys if k in info)
 
+    def getinfo_many(self, paths, ignore_errors=False):
+        """Retrieves the info dictionaries for a number of paths.
+
+        The default implementation simply calls `getinfo` for each path, but
+        filesystems where each call has a high latency (network filesystems
+        in particular) may override this to fetch the information in fewer
+        round trips, or concurrently.
+
+        :param paths: an iterable of paths to retrieve information for
+        :param ignore_errors: if True, an empty dictionary is returned for paths
+            that could not be queried, rather than raising an exception
+        :rtype: list of (path, info) tuples, in the same order as `paths`
+
+        :raises `fs.errors.ResourceNotFoundError`: if a path does not exist
+            (and ignore_errors is False)
+
+        """
+        infos = []
+        for path in paths:
+            try:
+                info = self.getinfo(path)
+            except FSError:
+                if not ignore_errors:
+                    raise
+                info = {}
+            infos.append((path, info))
+        return infos
+
+    def igetinfo_many(self, paths, ignore_errors=False):
+        """Generator yielding the (path, info) tuples of `getinfo_many`.
+
+        The default implementation simply wraps `getinfo_many`, but a
+        filesystem may override it to yield results as they become available.
+
+        """
+        return iter(self.getinfo_many(paths, ignore_errors=ignore_errors))
+
     def desc(self, path):
         """Returns short descriptive text regarding a path. Intended mainly as
         a debugging aid.
@@ -795,6 +969,41 @@ class FS(object):
             if f is not None:
                 f.close()
 
+    def getcontents_into(self, path, buffer):
+        """Reads the contents of a file in to a writable buffer.
+
+        This avoids creating a new string for the file contents, so a single
+        buffer can be reused to read many files.  At most ``len(buffer)``
+        bytes are read.
+
+        :param path: A path of file to read
+        :param buffer: A writable buffer object, such as a bytearray or memoryview
+        :rtype: int
+        :returns: the number of bytes read in to the buffer
+
+        """
+        view = memoryview(buffer)
+        size = len(view)
+        bytes_read = 0
+        f = None
+        try:
+            f = self.open(path, mode='rb')
+            readinto = getattr(f, 'readinto', None)
+            while bytes_read < size:
+                if readinto is not None:
+                    count = readinto(view[bytes_read:])
+                else:
+                    data = f.read(size - bytes_read)
+                    count = len(data)
+                    view[bytes_read:bytes_read + count] = data
+                if not count:
+                    break
+                bytes_read += count
+        finally:
+            if f is not None:
+                f.close()
+        return bytes_read
+
     def _setcontents(self,
                      path,
                      data,
@@ -819,21 +1028,11 @@ class FS(object):
         progress_callback(0)
 
         if hasattr(data, 'read'):
-            read = data.read
-            chunk = read(chunk_size)
-            if isinstance(chunk, six.text_type):
-                f = self.open(path, 'wt', encoding=encoding, errors=errors)
-            else:
-                f = self.open(path, 'wb')
-            write = f.write
-            try:
-                while chunk:
-                    write(chunk)
-                    bytes_written += len(chunk)
-                    progress_callback(bytes_written)
-                    chunk = read(chunk_size)
-            finally:
-                f.close()
+            bytes_written = iotools.copy_file_to_fs(data, self, path,
+                                                    encoding=encoding,
+                                                    errors=errors,
+                                                    progress_callback=progress_callback,
+                                                    chunk_size=chunk_size)
         else:
             if isinstance(data, six.text_type):
                 with self.open(path, 'wt', encoding=encoding, errors=errors) as f:
@@ -949,7 +1148,8 @@ class FS(object):
              wildcard=None,
              dir_wildcard=None,
              search="breadth",
-             ignore_errors=False):
+             ignore_errors=False,
+             workers=None):
         """Walks a directory tree and yields the root path and contents.
         Yields a tuple of the path of each directory and a list of its file
         contents.
@@ -967,11 +1167,22 @@ class FS(object):
 
         :param ignore_errors: ignore any errors reading the directory
         :type ignore_errors: bool
+        :param workers: if given, list this many directories concurrently using a pool
+            of threads (see :mod:`fs.walk`); paths are then yielded in the order they are
+            listed, but a directory is still yielded before (breadth) or after (depth) its
+            sub-directories
+        :type workers: integer
 
         :rtype: iterator of (current_path, paths)
 
         """
 
+        if workers:
+            from fs.walk import walk
+            for item in walk(self, path, wildcard=wildcard, dir_wildcard=dir_wildcard, search=search, ignore_errors=ignore_errors, workers=workers):
+                yield item
+            return
+
         path = normpath(path)
 
         if not self.exists(path):
@@ -986,17 +1197,8 @@ class FS(object):
             else:
                 return self.ilistdirinfo(path, *args, **kwargs)
 
-        if wildcard is None:
-            wildcard = lambda f: True
-        elif not callable(wildcard):
-            wildcard_re = re.compile(fnmatch.translate(wildcard))
-            wildcard = lambda fn: bool(wildcard_re.match(fn))
-
-        if dir_wildcard is None:
-            dir_wildcard = lambda f: True
-        elif not callable(dir_wildcard):
-            dir_wildcard_re = re.compile(fnmatch.translate(dir_wildcard))
-            dir_wildcard = lambda fn: bool(dir_wildcard_re.match(fn))
+        wildcard = wildcard_matcher(wildcard)
+        dir_wildcard = wildcard_matcher(dir_wildcard)
 
         if search == "breadth":
             dirs = [path]
@@ -1051,7 +1253,8 @@ class FS(object):
                   wildcard=None,
                   dir_wildcard=None,
                   search="breadth",
-                  ignore_errors=False):
+                  ignore_errors=False,
+                  workers=None):
         """Like the 'walk' method, but just yields file paths.
 
         :param path: root path to start walking
@@ -1067,10 +1270,17 @@ class FS(object):
 
         :param ignore_errors: ignore any errors reading the directory
         :type ignore_errors: bool
+        :param workers: if given, list this many directories concurrently using a pool of threads
+        :type workers: integer
 
         :rtype: iterator of file paths
 
         """
+        if workers:
+            from fs.walk import walkfiles
+            for p in walkfiles(self, path, wildcard=wildcard, dir_wildcard=dir_wildcard, search=search, ignore_errors=ignore_errors, workers=workers):
+                yield p
+            return
         for path, files in self.walk(normpath(path), wildcard=wildcard, dir_wildcard=dir_wildcard, search=search, ignore_errors=ignore_errors):
             for f in files:
                 yield pathcombine(path, f)
@@ -1079,7 +1289,8 @@ class FS(object):
                  path="/",
                  wildcard=None,
                  search="breadth",
-                 ignore_errors=False):
+                 ignore_errors=False,
+                 workers=None):
         """Like the 'walk' method but yields directories.
 
         :param path: root path to start walking
@@ -1093,13 +1304,56 @@ class FS(object):
 
         :param ignore_errors: ignore any errors reading the directory
         :type ignore_errors: bool
+        :param workers: if given, list this many directories concurrently using a pool of threads
+        :type workers: integer
 
         :rtype: iterator of dir paths
 
         """
+        if workers:
+            from fs.walk import walkdirs
+            for p in walkdirs(self, path, wildcard=wildcard, search=search, ignore_errors=ignore_errors, workers=workers):
+                yield p
+            return
         for p, _files in self.walk(path, dir_wildcard=wildcard, search=search, ignore_errors=ignore_errors):
             yield p
 
+    def iglob(self, pattern, path="/", ignore_errors=False):
+        """Generator yielding the paths of files and directories that match a glob pattern.
+
+        Within a path component, ``*``, ``?`` and ``[seq]`` are wildcards; a component of
+        ``**`` matches any number of nested directories (including none), and a pattern
+        that ends with ``/`` matches only directories (see :mod:`fs.globbing`).  For example,
+        ``fs.iglob("logs/**/*.gz")``.
+
+        :param pattern: a glob pattern
+        :type pattern: string
+        :param path: the directory the pattern is relative to
+        :type path: string
+        :param ignore_errors: ignore any errors reading directories
+        :type ignore_errors: bool
+
+        :rtype: iterator of paths
+
+        """
+        from fs.globbing import iglob
+        return iglob(self, pattern, path, ignore_errors=ignore_errors)
+
+    def glob(self, pattern, path="/", ignore_errors=False):
+        """Like the 'iglob' method, but returns a list of paths.
+
+        :param pattern: a glob pattern
+        :type pattern: string
+        :param path: the directory the pattern is relative to
+        :type path: string
+        :param ignore_errors: ignore any errors reading directories
+        :type ignore_errors: bool
+
+        :rtype: list of paths
+
+        """
+        return list(self.iglob(pattern, path, ignore_errors=ignore_errors))
+
     def getsize(self, path):
         """Returns the size (in bytes) of a resource.
 
@@ -1161,8 +1415,8 @@ class FS(object):
     @convert_os_errors
     def _shutil_copyfile(cls, src_syspath, dst_syspath):
         try:
-            shutil.copyfile(src_syspath, dst_syspath)
-        except IOError, e:
+            fastcopy.copyfile(src_syspath, dst_syspath)
+        except EnvironmentError, e:
             #  shutil reports ENOENT when a parent directory is missing
             if getattr(e, "errno", None) == errno.ENOENT:
                 if not os.path.exists(dirname(dst_syspath)):
@@ -1214,6 +1468,67 @@ class FS(object):
             self.copy(src, dst, overwrite=overwrite, chunk_size=chunk_size)
             self.remove(src)
 
+    def can_copy_from(self, src_fs):
+        """Check if files can be copied directly from another FS object.
+
+        Some filesystems can copy from another instance of the same kind
+        without the file contents passing through the client, for example
+        two S3FS objects using the same account.  :func:`fs.utils.copyfile`
+        and :func:`fs.utils.movefile` call this on the destination FS, and use
+        :meth:`copy_from` or :meth:`move_from` if it returns True.
+
+        :param src_fs: the filesystem that files would be copied from
+        :rtype: bool
+
+        """
+        return False
+
+    def can_move_from(self, src_fs):
+        """Check if files can be moved directly from another FS object.
+
+        By default this is the same as :meth:`can_copy_from`.
+
+        :param src_fs: the filesystem that files would be moved from
+        :rtype: bool
+
+        """
+        return self.can_copy_from(src_fs)
+
+    def copy_from(self, src_fs, src, dst, overwrite=False):
+        """Copies a file from another FS object, without reading its contents.
+
+        This is only called if :meth:`can_copy_from` returns True for
+        `src_fs`.  An implementation may still raise UnsupportedError if it
+        turns out that the file can't be copied directly, in which case the
+        caller falls back to an ordinary copy.
+
+        :param src_fs: the source filesystem
+        :param src: the source path, in `src_fs`
+        :param dst: the destination path
+        :param overwrite: if True, then an existing file at the destination may
+            be overwritten; If False then DestinationExistsError
+            will be raised.
+
+        """
+        raise UnsupportedError("copy from another filesystem")
+
+    def move_from(self, src_fs, src, dst, overwrite=False):
+        """Moves a file from another FS object, without reading its contents.
+
+        The default implementation calls :meth:`copy_from` and then removes
+        the source file.
+
+        :param src_fs: the source filesystem
+        :param src: the source path, in `src_fs`
+        :param dst: the destination path
+        :param overwrite: if True, then an existing file at the destination may
+            be overwritten; If False then DestinationExistsError
+            will be raised.
+
+        """
+        self.copy_from(src_fs, src, dst, overwrite=overwrite)
+        src_fs.remove(src)
+
     def movedir(self, src, dst, overwrite=False, ignore_errors=False, chunk_size=16384):
         """moves a directory from one location to another.
 
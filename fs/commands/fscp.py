@@ -142,6 +142,9 @@ Copy SOURCE to DESTINATION"""
                 sys.stdout.write(self.progress_bar(len(srcs), i + 1, 'scanning...'))
                 sys.stdout.flush()
                                        
+        if options.update:
+            copy_fs_paths = self.skip_unchanged(copy_fs_paths, dst_fs)
+
         if progress:
             sys.stdout.write(self.progress_bar(len(copy_fs_paths), 0, self.get_verb()))
             sys.stdout.flush()
@@ -215,6 +218,28 @@ Copy SOURCE to DESTINATION"""
         
     def post_actions(self):
         pass
+
+    def skip_unchanged(self, copy_fs_paths, dst_fs):
+        """Remove the files that are no newer than their destination.
+
+        The modification times are looked up with getinfo_many, so that
+        filesystems with a batched implementation need a few requests
+        rather than two for every file.
+        """
+        files = [r for r in copy_fs_paths if r[0] == self.FILE]
+        dst_infos = dict(dst_fs.getinfo_many([r[3] for r in files], ignore_errors=True))
+        files_by_fs = {}
+        for resource in files:
+            files_by_fs.setdefault(id(resource[1]), (resource[1], []))[1].append(resource)
+        skip = set()
+        for src_fs, resources in files_by_fs.itervalues():
+            src_infos = src_fs.getinfo_many([r[2] for r in resources], ignore_errors=True)
+            for resource, (_path, src_info) in zip(resources, src_infos):
+                src_mtime = src_info.get('modified_time')
+                dst_mtime = dst_infos[resource[3]].get('modified_time')
+                if src_mtime is not None and dst_mtime is not None and src_mtime <= dst_mtime:
+                    skip.add(id(resource))
+        return [r for r in copy_fs_paths if id(r) not in skip]
         
     def on_done(self, path_type, src_fs, src_path, dst_fs, dst_path, error=None):
         self.lock.acquire()        
@@ -449,17 +449,8 @@ class ArchiveMountFS(mountfs.MountFS):
                 listing = filter(isdir, listing)
             return listing
 
-        if wildcard is None:
-            wildcard = lambda f:True
-        elif not callable(wildcard):
-            wildcard_re = re.compile(fnmatch.translate(wildcard))
-            wildcard = lambda fn:bool (wildcard_re.match(fn))
-
-        if dir_wildcard is None:
-            dir_wildcard = lambda f:True
-        elif not callable(dir_wildcard):
-            dir_wildcard_re = re.compile(fnmatch.translate(dir_wildcard))
-            dir_wildcard = lambda fn:bool (dir_wildcard_re.match(fn))
+        wildcard = wildcard_matcher(wildcard)
+        dir_wildcard = wildcard_matcher(dir_wildcard)
 
         if search == "breadth":
 
@@ -31,7 +31,6 @@ import re
 import time
 import datetime
 import cookielib
-import fnmatch
 import xml.dom.pulldom
 import threading
 from collections import deque
@@ -451,6 +450,8 @@ class DAVFS(FS):
         return list(self.ilistdir(path=path,wildcard=wildcard,full=full,absolute=absolute,dirs_only=dirs_only,files_only=files_only))
 
     def ilistdir(self,path="./",wildcard=None,full=False,absolute=False,dirs_only=False,files_only=False):
+        if wildcard is not None:
+            wildcard = wildcard_matcher(wildcard, normcase=True)
         props = "<D:resourcetype />"
         dir_ok = False
         for res in self._do_propfind(path,props):
@@ -479,12 +480,8 @@ class DAVFS(FS):
                 if not entry_ok:
                     continue
                 if wildcard is not None:
-                    if isinstance(wildcard,basestring):
-                        if not fnmatch.fnmatch(nm,wildcard):
-                            continue
-                    else:
-                        if not wildcard(nm):
-                            continue
+                    if not wildcard(nm):
+                        continue
                 if full:
                     yield relpath(pathjoin(path,nm))
                 elif absolute:
@@ -498,6 +495,8 @@ class DAVFS(FS):
         return list(self.ilistdirinfo(path=path,wildcard=wildcard,full=full,absolute=absolute,dirs_only=dirs_only,files_only=files_only))
 
     def ilistdirinfo(self,path="./",wildcard=None,full=False,absolute=False,dirs_only=False,files_only=False):
+        if wildcard is not None:
+            wildcard = wildcard_matcher(wildcard, normcase=True)
         props = "<D:resourcetype /><D:getcontentlength />" \
                 "<D:getlastmodified /><D:getetag />"
         dir_ok = False
@@ -530,12 +529,8 @@ class DAVFS(FS):
                 if not entry_ok:
                     continue
                 if wildcard is not None:
-                    if isinstance(wildcard,basestring):
-                        if not fnmatch.fnmatch(nm,wildcard):
-                            continue
-                    else:
-                        if not wildcard(nm):
-                            continue
+                    if not wildcard(nm):
+                        continue
                 if full:
                     yield (relpath(pathjoin(path,nm)),info)
                 elif absolute:
@@ -615,6 +610,59 @@ class DAVFS(FS):
         finally:
             response.close()
 
+    def getinfo_many(self,paths,ignore_errors=False):
+        """Get the info for several paths, sharing PROPFIND requests.
+
+        Paths that are in the same directory are looked up with a single
+        Depth:1 PROPFIND on that directory, rather than one request each.
+        """
+        paths = list(paths)
+        infos = [None] * len(paths)
+        groups = {}
+        roots = []
+        for (i,path) in enumerate(paths):
+            npath = normpath(relpath(path))
+            if npath in ("","."):
+                roots.append((i,path))
+            else:
+                groups.setdefault(dirname(npath),[]).append((i,path))
+        batches = groups.items()
+        if roots:
+            #  The root has no parent directory to list
+            batches.append((None,roots))
+        props = "<D:resourcetype /><D:getcontentlength />" \
+                "<D:getlastmodified /><D:getetag />"
+        for (parent,group) in batches:
+            #  If the directory can't be listed, fall back to getinfo
+            entries = None
+            if parent is not None and len(group) > 1:
+                try:
+                    entries = {}
+                    for res in self._do_propfind(parent,props):
+                        if not self._isurl(parent,res.href):
+                            nm = basename(self._url2path(res.href))
+                            entries[nm] = self._info_from_propfind(res)
+                except ResourceNotFoundError:
+                    entries = {}
+                except FSError:
+                    entries = None
+            for (i,path) in group:
+                try:
+                    if entries is None:
+                        info = self.getinfo(path)
+                    else:
+                        try:
+                            info = dict(entries[basename(normpath(path))])
+                        except KeyError:
+                            raise ResourceNotFoundError(path)
+                        info["name"] = basename(normpath(path))
+                except FSError:
+                    if not ignore_errors:
+                        raise
+                    info = {}
+                infos[i] = (path,info)
+        return infos
+
     def _do_propfind(self,path,props):
         """Incremental PROPFIND parsing, for use with ilistdir/ilistdirinfo.
 
@@ -690,8 +738,10 @@ class DAVFS(FS):
             raise ResourceInvalidError(src, msg=msg)
         self._copy(src,dst,overwrite=overwrite)
 
-    def _copy(self,src,dst,overwrite=False):
-        headers = {"Destination":self.getpathurl(dst)}
+    def _copy(self,src,dst,overwrite=False,dst_fs=None):
+        if dst_fs is None:
+            dst_fs = self
+        headers = {"Destination":dst_fs.getpathurl(dst)}
         if overwrite:
             headers["Overwrite"] = "T"
         else:
@@ -705,6 +755,28 @@ class DAVFS(FS):
         if response.status < 200 or response.status >= 300:
             raise_generic_error(response,"copy",src)
 
+    def can_copy_from(self,src_fs):
+        """A COPY or MOVE request can target any URL on the same server."""
+        if not isinstance(src_fs,DAVFS):
+            return False
+        return (src_fs._url_p.scheme,src_fs._url_p.netloc) == (self._url_p.scheme,self._url_p.netloc)
+
+    def copy_from(self,src_fs,src,dst,overwrite=False):
+        if not self.can_copy_from(src_fs):
+            raise UnsupportedError("copy from another filesystem")
+        if src_fs.isdir(src):
+            msg = "Source is not a file: %(path)s"
+            raise ResourceInvalidError(src, msg=msg)
+        src_fs._copy(src,dst,overwrite=overwrite,dst_fs=self)
+
+    def move_from(self,src_fs,src,dst,overwrite=False):
+        if not self.can_move_from(src_fs):
+            raise UnsupportedError("move from another filesystem")
+        if src_fs.isdir(src):
+            msg = "Source is not a file: %(path)s"
+            raise ResourceInvalidError(src, msg=msg)
+        src_fs._move(src,dst,overwrite=overwrite,dst_fs=self)
+
     def move(self,src,dst,overwrite=False,chunk_size=None):
         if self.isdir(src):
             msg = "Source is not a file: %(path)s"
@@ -717,8 +789,10 @@ class DAVFS(FS):
             raise ResourceInvalidError(src, msg=msg)
         self._move(src,dst,overwrite=overwrite)
 
-    def _move(self,src,dst,overwrite=False):
-        headers = {"Destination":self.getpathurl(dst)}
+    def _move(self,src,dst,overwrite=False,dst_fs=None):
+        if dst_fs is None:
+            dst_fs = self
+        headers = {"Destination":dst_fs.getpathurl(dst)}
         if overwrite:
             headers["Overwrite"] = "T"
         else:
@@ -454,6 +454,13 @@ class SqliteFS(FS):
                         FROM FsFileTable where rowid=?',(contentid,))
         row = fetchone(self._querycur)
         assert(row != None)
+        return(self._file_info_from_row(row))
+
+    def _file_info_from_row(self, row):
+        '''
+        build the file information dictionary from a row of
+        (author, size, created, last_modified, last_accessed)
+        '''
         info = dict()
         info['author'] = row[0]
         info['size'] = row[1]
@@ -653,6 +660,63 @@ class SqliteFS(FS):
             info= self._get_file_info(path)
         return(info)
 
+    @synchronize
+    def getinfo_many(self, paths, ignore_errors=False):
+        '''
+        get the information for several paths, with one query for the
+        directories and one for the files rather than several per path.
+        '''
+        self._initdb()
+        paths = list(paths)
+        dirpaths = set()
+        filepaths = set()
+        for path in paths:
+            path = normpath(path)
+            dirpaths.add(remove_end_slash(path) or '/')
+            filepaths.add((remove_end_slash(dirname(path)) or '/', basename(path)))
+        dirs = set()
+        for chunk in self._chunks(list(dirpaths)):
+            self._querycur.execute('SELECT fullpath FROM FsDirMetaData WHERE fullpath IN (%s)'
+                        % ','.join('?' * len(chunk)), chunk)
+            for row in self._querycur:
+                dirs.add(row[0])
+        files = dict()
+        for chunk in self._chunks(list(set(parent for (parent, name) in filepaths))):
+            self._querycur.execute('SELECT FsDirMetaData.fullpath, FsFileMetaData.name, \
+                        author, size, created, last_modified, last_accessed \
+                        FROM FsFileMetaData \
+                        JOIN FsDirMetaData ON FsFileMetaData.parent = FsDirMetaData.ROWID \
+                        JOIN FsFileTable ON FsFileMetaData.fileid = FsFileTable.ROWID \
+                        WHERE FsDirMetaData.fullpath IN (%s)' % ','.join('?' * len(chunk)), chunk)
+            for row in self._querycur:
+                if (row[0], row[1]) in filepaths:
+                    files[(row[0], row[1])] = row[2:]
+        # directories all have the same information
+        dir_info = self._get_dir_info('/')
+        infos = []
+        for path in paths:
+            npath = normpath(path)
+            dirpath = remove_end_slash(npath) or '/'
+            filekey = (remove_end_slash(dirname(npath)) or '/', basename(npath))
+            if dirpath in dirs:
+                info = dict(dir_info)
+            elif filekey in files:
+                info = self._file_info_from_row(files[filekey])
+            elif ignore_errors:
+                info = dict()
+            else:
+                raise ResourceNotFoundError(path)
+            infos.append((path, info))
+        return(infos)
+
+    def _chunks(self, values, size=500):
+        '''
+        split a list of query parameters so as to stay below sqlite's limit
+        on the number of host parameters in a statement.
+        '''
+        for start in xrange(0, len(values), size):
+            yield values[start:start+size]
+
 #import msvcrt # built-in module
 #
 #def kbfunc():
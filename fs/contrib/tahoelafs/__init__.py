@@ -64,11 +64,11 @@ from logging import DEBUG, INFO, ERROR, CRITICAL
 
 import fs
 import fs.errors as errors
-from fs.path import abspath, relpath, normpath, dirname, pathjoin
+from fs.path import abspath, relpath, normpath, dirname, pathjoin, wildcard_matcher
 from fs.base import FS, NullFile
 from fs import _thread_synchronize_default, SEEK_END
 from fs.remote import CacheFSMixin, RemoteFileBuffer
-from fs.base import fnmatch, NoDefaultMeta
+from fs.base import NoDefaultMeta
 
 from util import TahoeUtil
 from connection import Connection   
@@ -161,6 +161,12 @@ class _TahoeLAFS(FS):
             handler = NullFile()
         else:
             self._log(DEBUG, 'Opening existing file %s for reading' % path)
+            if RemoteFileBuffer._can_read_ranges(self, mode, 0):
+                # Fetch only the ranges of the file that are actually read
+                size = self.getinfo(path).get('size')
+                if size is not None:
+                    return RemoteFileBuffer(self, path, mode, size=int(size),
+                                write_on_flush=False)
             handler = self.getrange(path,0)
         
         return RemoteFileBuffer(self, path, mode, handler,
@@ -232,6 +238,8 @@ class _TahoeLAFS(FS):
         
         if dirs_only and files_only:
             raise ValueError("dirs_only and files_only can not both be True")
+        if wildcard is not None:
+            wildcard = wildcard_matcher(wildcard, normcase=True)
         
         for item in self.tahoeutil.list(self.dircap, path):
             if dirs_only and item['type'] == 'filenode':
@@ -240,12 +248,8 @@ class _TahoeLAFS(FS):
                 continue
             
             if wildcard is not None:
-                if isinstance(wildcard,basestring):
-                    if not fnmatch.fnmatch(item['name'], wildcard):
-                        continue
-                else:
-                    if not wildcard(item['name']):
-                        continue
+                if not wildcard(item['name']):
+                    continue
             
             if full:
                 item_path = relpath(pathjoin(path, item['name']))
@@ -359,6 +363,15 @@ class _TahoeLAFS(FS):
     def getrange(self, path, offset, length=None):
         return self.connection.get(u'/uri/%s%s' % (self.dircap, path),
                     offset=offset, length=length)
+
+    def read_range(self, path, offset, length):
+        if length <= 0:
+            return b('')
+        f = self.getrange(path, offset, length)
+        try:
+            return f.read(length)
+        finally:
+            f.close()
        
     @_fix_path             
     def setcontents(self, path, file, chunk_size=64*1024):    
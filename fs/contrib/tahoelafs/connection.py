@@ -89,10 +89,10 @@ class Connection:
 
         headers = {}
         headers.update(self.headers)
-        if offset:
+        if offset or length:
             if length:
                 headers['Range'] = 'bytes=%d-%d' % \
-                                    (int(offset), int(offset+length))
+                                    (int(offset or 0), int((offset or 0)+length-1))
             else:
                 headers['Range'] = 'bytes=%d-' % int(offset)
             
@@ -39,6 +39,7 @@ __all__ = ['FSError',
 
 import sys
 import errno
+import inspect
 import six
 
 from fs.path import *
@@ -254,67 +255,85 @@ def convert_fs_errors(func):
 
 
 def convert_os_errors(func):
-    """Function wrapper to convert OSError/IOError instances into FSError."""
+    """Function wrapper to convert OSError/IOError instances into FSError.
+
+    If `func` is a generator function, errors raised while iterating over
+    the generator are converted as well.
+    """
     opname = func.__name__
+    if inspect.isgeneratorfunction(func):
+        @wraps(func)
+        def gen_wrapper(self,*args,**kwds):
+            try:
+                for item in func(self,*args,**kwds):
+                    yield item
+            except (OSError,IOError), e:
+                _raise_fs_error(self,opname,e)
+        return gen_wrapper
     @wraps(func)
     def wrapper(self,*args,**kwds):
         try:
             return func(self,*args,**kwds)
         except (OSError,IOError), e:
-            (exc_type,exc_inst,tb) = sys.exc_info()
-            path = getattr(e,"filename",None)
-            if path and path[0] == "/" and hasattr(self,"root_path"):
-                path = normpath(path)
-                if isprefix(self.root_path,path):
-                    path = path[len(self.root_path):]
-            if not hasattr(e,"errno") or not e.errno:
-                raise OperationFailedError(opname,details=e),None,tb
-            if e.errno == errno.ENOENT:
-                raise ResourceNotFoundError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.EFAULT:
-                # This can happen when listdir a directory that is deleted by another thread
-                # Best to interpret it as a resource not found
-                raise ResourceNotFoundError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.ESRCH:
-                raise ResourceNotFoundError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.ENOTEMPTY:
-                raise DirectoryNotEmptyError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.EEXIST:
-                raise DestinationExistsError(path,opname=opname,details=e),None,tb
-            if e.errno == 183: # some sort of win32 equivalent to EEXIST
-                raise DestinationExistsError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.ENOTDIR:
-                raise ResourceInvalidError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.EISDIR:
-                raise ResourceInvalidError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.EINVAL:
-                raise ResourceInvalidError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.ENOSPC:
-                raise StorageSpaceError(opname,path=path,details=e),None,tb
-            if e.errno == errno.EPERM:
-                raise PermissionDeniedError(opname,path=path,details=e),None,tb
-            if hasattr(errno,"ENONET") and e.errno == errno.ENONET:
-                raise RemoteConnectionError(opname,path=path,details=e),None,tb
-            if e.errno == errno.ENETDOWN:
-                raise RemoteConnectionError(opname,path=path,details=e),None,tb
-            if e.errno == errno.ECONNRESET:
-                raise RemoteConnectionError(opname,path=path,details=e),None,tb
-            if e.errno == errno.EACCES:
-                if sys.platform == "win32":
-                    if e.args[0] and e.args[0] == 32:
-                        raise ResourceLockedError(path,opname=opname,details=e),None,tb
-                raise PermissionDeniedError(opname,details=e),None,tb
-            # Sometimes windows gives some random errors...
-            if sys.platform == "win32":
-                if e.errno in (13,):
-                    raise ResourceInvalidError(path,opname=opname,details=e),None,tb
-            if e.errno == errno.ENAMETOOLONG:
-                raise PathError(path,details=e),None,tb
-            if e.errno == errno.EOPNOTSUPP:
-                raise UnsupportedError(opname,details=e),None,tb
-            if e.errno == errno.ENOSYS:
-                raise UnsupportedError(opname,details=e),None,tb
-            raise OperationFailedError(opname,details=e),None,tb
+            _raise_fs_error(self,opname,e)
     return wrapper
 
 
+def _raise_fs_error(self,opname,e):
+    """Raise the FSError corresponding to the OSError/IOError being handled."""
+    (exc_type,exc_inst,tb) = sys.exc_info()
+    path = getattr(e,"filename",None)
+    if path and path[0] == "/" and hasattr(self,"root_path"):
+        path = normpath(path)
+        if isprefix(self.root_path,path):
+            path = path[len(self.root_path):]
+    if not hasattr(e,"errno") or not e.errno:
+        raise OperationFailedError(opname,details=e),None,tb
+    if e.errno == errno.ENOENT:
+        raise ResourceNotFoundError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.EFAULT:
+        # This can happen when listdir a directory that is deleted by another thread
+        # Best to interpret it as a resource not found
+        raise ResourceNotFoundError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.ESRCH:
+        raise ResourceNotFoundError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.ENOTEMPTY:
+        raise DirectoryNotEmptyError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.EEXIST:
+        raise DestinationExistsError(path,opname=opname,details=e),None,tb
+    if e.errno == 183: # some sort of win32 equivalent to EEXIST
+        raise DestinationExistsError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.ENOTDIR:
+        raise ResourceInvalidError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.EISDIR:
+        raise ResourceInvalidError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.EINVAL:
+        raise ResourceInvalidError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.ENOSPC:
+        raise StorageSpaceError(opname,path=path,details=e),None,tb
+    if e.errno == errno.EPERM:
+        raise PermissionDeniedError(opname,path=path,details=e),None,tb
+    if hasattr(errno,"ENONET") and e.errno == errno.ENONET:
+        raise RemoteConnectionError(opname,path=path,details=e),None,tb
+    if e.errno == errno.ENETDOWN:
+        raise RemoteConnectionError(opname,path=path,details=e),None,tb
+    if e.errno == errno.ECONNRESET:
+        raise RemoteConnectionError(opname,path=path,details=e),None,tb
+    if e.errno == errno.EACCES:
+        if sys.platform == "win32":
+            if e.args[0] and e.args[0] == 32:
+                raise ResourceLockedError(path,opname=opname,details=e),None,tb
+        raise PermissionDeniedError(opname,details=e),None,tb
+    # Sometimes windows gives some random errors...
+    if sys.platform == "win32":
+        if e.errno in (13,):
+            raise ResourceInvalidError(path,opname=opname,details=e),None,tb
+    if e.errno == errno.ENAMETOOLONG:
+        raise PathError(path,details=e),None,tb
+    if e.errno == errno.EOPNOTSUPP:
+        raise UnsupportedError(opname,details=e),None,tb
+    if e.errno == errno.ENOSYS:
+        raise UnsupportedError(opname,details=e),None,tb
+    raise OperationFailedError(opname,details=e),None,tb
+
+
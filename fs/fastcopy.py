@@ -0,0 +1,162 @@
+"""
+fs.fastcopy
+===========
+
+Copy files between local file descriptors inside the kernel.
+
+On Linux, the `copy_file_range` and `sendfile` system calls copy data from
+one file descriptor to another without it passing through user space, which
+is much cheaper than reading and writing chunks of a file in Python (and
+`copy_file_range` lets the filesystem share or offload the copy entirely).
+
+:func:`copyfile` is used by :meth:`fs.base.FS.copy` and
+:func:`fs.utils.copyfile` when both files have a system path.  If the kernel
+calls aren't available it falls back to an ordinary chunked copy.
+
+"""
+
+__all__ = ['copyfd',
+           'copyfile']
+
+import os
+import sys
+import errno
+import shutil
+
+
+#  Size of the chunks requested from the kernel in each call
+KERNEL_CHUNK_SIZE = 1024 * 1024 * 1024
+
+#  Size of the chunks used when copying in user space
+CHUNK_SIZE = 1024 * 1024
+
+#  Error codes that mean a kernel copy isn't possible for these descriptors,
+#  rather than that something went wrong with the copy.
+_UNSUPPORTED_ERRNOS = frozenset(getattr(errno, name) for name in
+                                ('ENOSYS', 'EXDEV', 'EINVAL', 'EOPNOTSUPP',
+                                 'ENOTSUP', 'EBADF', 'EPERM', 'ETXTBSY')
+                                if hasattr(errno, name))
+
+
+def _load_kernel_calls():
+    """Find implementations of copy_file_range() and sendfile().
+
+    Python 3 exposes these in the os module (from 3.8 and 3.3 respectively);
+    on earlier versions they are called through ctypes.
+    """
+    if not sys.platform.startswith('linux'):
+        return None, None
+    copy_file_range = getattr(os, 'copy_file_range', None)
+    sendfile = getattr(os, 'sendfile', None)
+    if copy_file_range is not None and sendfile is not None:
+        return copy_file_range, sendfile
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except (ImportError, OSError):
+        return copy_file_range, sendfile
+
+    def _check(result):
+        if result < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        return result
+
+    if copy_file_range is None and hasattr(libc, 'copy_file_range'):
+        c_copy_file_range = libc.copy_file_range
+        c_copy_file_range.restype = ctypes.c_ssize_t
+        c_copy_file_range.argtypes = [ctypes.c_int, ctypes.c_void_p,
+                                      ctypes.c_int, ctypes.c_void_p,
+                                      ctypes.c_size_t, ctypes.c_uint]
+
+        def copy_file_range(src, dst, count):
+            return _check(c_copy_file_range(src, None, dst, None, count, 0))
+
+    if sendfile is None and hasattr(libc, 'sendfile'):
+        c_sendfile = libc.sendfile
+        c_sendfile.restype = ctypes.c_ssize_t
+        c_sendfile.argtypes = [ctypes.c_int, ctypes.c_int,
+                               ctypes.c_void_p, ctypes.c_size_t]
+
+        def sendfile(dst, src, offset, count):
+            return _check(c_sendfile(dst, src, offset, count))
+
+    return copy_file_range, sendfile
+
+_copy_file_range, _sendfile = _load_kernel_calls()
+
+
+def _kernel_copy(call, src_fd, dst_fd):
+    """Copy with a kernel call until EOF.
+
+    Returns False, without having copied anything, if the call can't be used
+    with these file descriptors.
+    """
+    copied = 0
+    while True:
+        try:
+            n = call(src_fd, dst_fd)
+        except OSError, e:
+            if copied == 0 and e.errno in _UNSUPPORTED_ERRNOS:
+                return False
+            raise
+        if n == 0:
+            #  Some filesystems (e.g. procfs) report 0 bytes rather than
+            #  an error, so if nothing was copied let a fallback try.
+            return copied > 0
+        copied += n
+
+
+def copyfd(src_fd, dst_fd):
+    """Copy everything from one file descriptor to another.
+
+    The data is copied from the current position of `src_fd` to the current
+    position of `dst_fd`, using copy_file_range() or sendfile() where
+    possible, and os.read()/os.write() otherwise.
+
+    :param src_fd: a file descriptor open for reading
+    :param dst_fd: a file descriptor open for writing
+
+    """
+    if _copy_file_range is not None:
+        if _kernel_copy(lambda s, d: _copy_file_range(s, d, KERNEL_CHUNK_SIZE), src_fd, dst_fd):
+            return
+    if _sendfile is not None:
+        if _kernel_copy(lambda s, d: _sendfile(d, s, None, KERNEL_CHUNK_SIZE), src_fd, dst_fd):
+            return
+    read = os.read
+    write = os.write
+    while True:
+        data = read(src_fd, CHUNK_SIZE)
+        if not data:
+            break
+        while data:
+            data = data[write(dst_fd, data):]
+
+
+def copyfile(src_syspath, dst_syspath):
+    """Copy the contents of one system file to another.
+
+    This is a drop-in replacement for shutil.copyfile, which uses
+    :func:`copyfd` to copy the data in the kernel where possible.
+
+    :param src_syspath: system path of the source file
+    :param dst_syspath: system path of the destination file
+
+    """
+    if _copy_file_range is None and _sendfile is None:
+        shutil.copyfile(src_syspath, dst_syspath)
+        return
+    if os.path.exists(dst_syspath) and os.path.samefile(src_syspath, dst_syspath):
+        raise shutil.Error("`%s` and `%s` are the same file" % (src_syspath, dst_syspath))
+    flags = getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+    src_fd = os.open(src_syspath, os.O_RDONLY | flags)
+    try:
+        dst_fd = os.open(dst_syspath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | flags, 0666)
+        try:
+            copyfd(src_fd, dst_fd)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
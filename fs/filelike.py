@@ -56,6 +56,22 @@ else:
     except ImportError:
         from StringIO import StringIO as _StringIO
 
+#  Objects other than strings that may be passed to write(), such as the
+#  reused buffer in fs.iotools.copy_file_data
+if PY3:
+    _buffer_types = (memoryview, bytearray)
+else:
+    _buffer_types = (memoryview, bytearray, buffer)
+
+
+def _tobytes(data):
+    """Copy data given as a buffer object (e.g. a memoryview) in to a string."""
+    if isinstance(data, memoryview):
+        return data.tobytes()
+    if isinstance(data, _buffer_types):
+        return bytes(data)
+    return data
+
 
 class FileLikeBase(object):
     """Base class for implementing file-like objects.
@@ -148,6 +164,30 @@ class FileLikeBase(object):
         """
         raise NotReadableError("Object not readable")
 
+    def _readinto(self,buf):
+        """Read data from the file-like object directly into <buf>.
+
+        This method may be implemented by subclasses that can fill a buffer
+        without creating an intermediate string.  It should read at most
+        len(buf) bytes into the writable buffer <buf> and return the number
+        of bytes read, which may be zero if no data is yet available.  As
+        with _read(), it must return None to signify that EOF has been
+        reached.
+
+        The default implementation copies the data returned by _read().
+        """
+        data = self._read(len(buf))
+        if data is None:
+            return None
+        size = len(data)
+        if size > len(buf):
+            # _read() gave us too much, keep the rest for the next read
+            self._rbuffer = data[len(buf):]
+            size = len(buf)
+            data = data[:size]
+        buf[:size] = data
+        return size
+
     def _write(self,string,flushing=False):
         """Write the given string to the file-like object.
 
@@ -415,6 +455,31 @@ class FileLikeBase(object):
         self._assert_mode("r-")
         return self._do_read(size)
 
+    def readinto(self,buf):
+        """Read up to len(buf) bytes into the writable buffer 'buf'.
+
+        Returns the number of bytes read, which is only less than len(buf)
+        if EOF is reached.
+        """
+        if self.closed:
+            raise IOError("File has been closed")
+        self._assert_mode("r-")
+        view = memoryview(buf)
+        size = len(view)
+        # Any pending buffers need the full machinery of _do_read()
+        if self._wbuffer is not None or self._sbuffer or self._soffset or self._rbuffer:
+            data = self._do_read(size)
+            view[:len(data)] = data
+            return len(data)
+        self._rbuffer = b("")
+        sizeSoFar = 0
+        while sizeSoFar < size:
+            count = self._readinto(view[sizeSoFar:])
+            if count is None:
+                break
+            sizeSoFar += count
+        return sizeSoFar
+
     def _do_read(self,size):
         """Private method to read from the file.
 
@@ -532,6 +597,9 @@ class FileLikeBase(object):
         # If we were previously reading, ensure position is correct
         if self._rbuffer is not None:
             self.seek(0, 1)
+        # Buffer objects can't be joined on to strings
+        if self._sbuffer or self._soffset or self._wbuffer:
+            string = _tobytes(string)
         # If we're actually behind the apparent position, we must also
         # write the data in the gap.
         if self._sbuffer:
@@ -552,7 +620,8 @@ class FileLikeBase(object):
             self._wbuffer = b("")
             return len(string) - (leftover or 0)
         else:
-            self._wbuffer = leftover
+            # The caller may reuse a buffer object, so keep a copy
+            self._wbuffer = _tobytes(leftover)
             return len(string) - len(leftover)
 
     def writelines(self,seq):
@@ -661,6 +730,17 @@ class FileWrapper(FileLikeBase):
             return None
         return data
 
+    def _readinto(self,buf):
+        #  Read straight into the buffer, unless a subclass has changed
+        #  how data is read from the wrapped file.
+        readinto = getattr(self.wrapped_file,"readinto",None)
+        if readinto is None or six.get_unbound_function(type(self)._read) is not _FileWrapper_read:
+            return super(FileWrapper,self)._readinto(buf)
+        count = readinto(buf)
+        if not count:
+            return None
+        return count
+
     def _write(self,string,flushing=False):
         self.wrapped_file.write(string)
 
@@ -674,6 +754,9 @@ class FileWrapper(FileLikeBase):
         return self.wrapped_file.truncate(size)
 
 
+_FileWrapper_read = six.get_unbound_function(FileWrapper._read)
+
+
 class StringIO(FileWrapper):
     """StringIO wrapper that more closely matches standard file behavior.
 
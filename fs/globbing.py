@@ -0,0 +1,252 @@
+"""
+fs.globbing
+===========
+
+Find paths that match a glob pattern, such as ``logs/**/*.gz``.
+
+A pattern is a sequence of path components separated by ``/``.  Within a
+component ``*``, ``?`` and ``[seq]`` have their usual wildcard meanings (and
+never match a ``/``), while a component that is exactly ``**`` matches any
+number of directories, including none.  A pattern that ends with ``/``
+matches only directories.
+
+Patterns are compiled once by :class:`GlobPattern`.  The leading components
+that contain no wildcards are the pattern's *prefix*, which is resolved
+without listing any directories, and while searching, a sub-directory is only
+listed if some path beneath it could still match the pattern::
+
+    >>> from fs.globbing import iglob
+    >>> for path in iglob(s3fs, "logs/2014-*/**/*.gz"):
+    ...     print path
+
+The :meth:`~fs.base.FS.glob` and :meth:`~fs.base.FS.iglob` methods call the
+functions in this module, and filesystems may override them to take advantage
+of a more efficient way of listing (for example, :class:`~fs.s3fs.S3FS` lists
+every key under the prefix in a single request).
+
+"""
+
+__all__ = ['GlobPattern',
+           'iglob',
+           'glob']
+
+import re
+
+from fs.path import normpath, abspath, pathjoin, pathcombine, compile_wildcard
+from fs.errors import FSError, ResourceNotFoundError
+
+
+#  Marks a '**' component in a compiled pattern
+RECURSE = object()
+
+_magic_re = re.compile(r'[*?[]')
+
+
+def has_magic(component):
+    """Check if a path component contains any wildcard characters."""
+    return _magic_re.search(component) is not None
+
+
+class GlobPattern(object):
+    """A compiled glob pattern.
+
+    Matching is done one path component at a time, by keeping track of the
+    set of pattern components that the next path component could match (a
+    *state*).  A state is just a frozenset of indices into :attr:`parts`,
+    where an index equal to ``len(parts)`` means that the pattern has been
+    matched.
+
+    :param pattern: a glob pattern (leading slashes are ignored)
+
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.dirs_only = pattern.endswith('/')
+        components = [c for c in pattern.split('/') if c and c != '.']
+        prefix = []
+        while components and not has_magic(components[0]):
+            prefix.append(components.pop(0))
+        #: The leading components of the pattern that contain no wildcards
+        self.prefix = u'/'.join(prefix)
+        #: The remaining components, as literal strings, compiled regular
+        #: expressions, or :data:`RECURSE` for ``**``
+        self.parts = parts = []
+        for component in components:
+            if component == '**':
+                if not parts or parts[-1] is not RECURSE:
+                    parts.append(RECURSE)
+            elif has_magic(component):
+                parts.append(compile_wildcard(component))
+            else:
+                parts.append(component)
+        self.recursive = RECURSE in parts
+        self._end = len(parts)
+        self._start = self._closure((0,))
+
+    def __repr__(self):
+        return "GlobPattern(%r)" % (self.pattern,)
+
+    def _closure(self, indices):
+        #  A '**' may match no directories at all, so a state that is waiting
+        #  on one is also waiting on the component after it.
+        parts = self.parts
+        end = self._end
+        state = set()
+        for i in indices:
+            state.add(i)
+            while i < end and parts[i] is RECURSE:
+                i += 1
+                state.add(i)
+        return frozenset(state)
+
+    def start(self):
+        """Get the state for the directory the pattern is relative to (after
+        the prefix has been resolved).
+        """
+        return self._start
+
+    def advance(self, state, name):
+        """Get the state for an entry called `name`, in a directory with the
+        given state.  An empty state means that neither the entry nor anything
+        beneath it can match the pattern.
+        """
+        parts = self.parts
+        end = self._end
+        indices = []
+        for i in state:
+            if i == end:
+                continue
+            part = parts[i]
+            if part is RECURSE:
+                indices.append(i)
+            elif isinstance(part, basestring):
+                if part == name:
+                    indices.append(i + 1)
+            elif part.match(name):
+                indices.append(i + 1)
+        if not indices:
+            return frozenset()
+        return self._closure(indices)
+
+    def is_match(self, state):
+        """Check if an entry with the given state matches the pattern."""
+        return self._end in state
+
+    def can_descend(self, state):
+        """Check if anything beneath a directory with the given state could
+        match the pattern.
+        """
+        end = self._end
+        for i in state:
+            if i != end:
+                return True
+        return False
+
+    def literal_names(self, state):
+        """Get the names of the only entries in a directory with the given
+        state that could match, or None if that would require a listing.
+        """
+        parts = self.parts
+        names = []
+        for i in state:
+            if i == self._end:
+                continue
+            part = parts[i]
+            if not isinstance(part, basestring):
+                return None
+            names.append(part)
+        return names
+
+    def match(self, path):
+        """Check if a path, relative to the prefix, matches the pattern.
+
+        This ignores :attr:`dirs_only`, since it can't tell a file from a
+        directory.
+        """
+        state = self._start
+        for name in path.split('/'):
+            if not name:
+                continue
+            state = self.advance(state, name)
+            if not state:
+                return False
+        return self.is_match(state)
+
+
+def iglob(fs, pattern, path="/", ignore_errors=False):
+    """Generator yielding the paths in a filesystem that match a glob pattern.
+
+    :param fs: the filesystem to search
+    :param pattern: a glob pattern, or a :class:`GlobPattern`
+    :param path: the directory the pattern is relative to
+    :param ignore_errors: ignore any errors reading directories
+
+    """
+    if not isinstance(pattern, GlobPattern):
+        pattern = GlobPattern(pattern)
+    root = abspath(normpath(pathjoin(path, pattern.prefix)))
+    dirs_only = pattern.dirs_only
+
+    if not pattern.parts:
+        if dirs_only:
+            if fs.isdir(root):
+                yield root
+        elif fs.exists(root):
+            yield root
+        return
+    if not fs.isdir(root):
+        return
+
+    def listdir(dir_path, state):
+        names = pattern.literal_names(state)
+        if names is None:
+            return fs.ilistdirinfo(dir_path)
+        #  Only these names could match, so check for them rather than list
+        #  the whole directory.
+        entries = []
+        for name in names:
+            entry_path = pathcombine(dir_path, name)
+            if fs.isdir(entry_path):
+                entries.append((name, {"is_dir": True}))
+            elif fs.exists(entry_path):
+                entries.append((name, {"is_dir": False}))
+        return entries
+
+    dirs = [(root, pattern.start())]
+    dirs_append = dirs.append
+    dirs_pop = dirs.pop
+    advance = pattern.advance
+    is_match = pattern.is_match
+    can_descend = pattern.can_descend
+    while dirs:
+        dir_path, state = dirs_pop()
+        try:
+            for name, info in listdir(dir_path, state):
+                entry_state = advance(state, name)
+                if not entry_state:
+                    continue
+                entry_path = pathcombine(dir_path, name)
+                try:
+                    is_dir = info["is_dir"]
+                except KeyError:
+                    is_dir = fs.isdir(entry_path)
+                if is_match(entry_state) and (is_dir or not dirs_only):
+                    yield entry_path
+                if is_dir and can_descend(entry_state):
+                    dirs_append((entry_path, entry_state))
+        except ResourceNotFoundError:
+            # Could happen if another thread / process deletes something whilst we are searching
+            pass
+        except FSError:
+            if not ignore_errors:
+                raise
+
+
+def glob(fs, pattern, path="/", ignore_errors=False):
+    """Get a list of the paths in a filesystem that match a glob pattern.
+
+    See :func:`iglob` for the arguments.
+
+    """
+    return list(iglob(fs, pattern, path, ignore_errors))
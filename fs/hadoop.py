@@ -13,12 +13,10 @@ API (http://hadoop.apache.org/docs/r1.0.4/webhdfs.html) and it's required you
 enable WebHDFS for this filesystem to be usable.
 """
 
-import fnmatch
 import getpass
 import io
 import json
 import os
-import re
 
 import pywebhdfs.webhdfs
 import pywebhdfs.errors
@@ -26,7 +24,8 @@ import pywebhdfs.errors
 import fs.errors
 from fs.base import FS
 from fs.filelike import FileLikeBase
-from fs.path import isprefix, normpath, pathcombine, recursepath
+from fs.remote import RemoteFileBuffer
+from fs.path import isprefix, normpath, pathcombine, recursepath, wildcard_matcher
 
 #
 #  _   _           _                   _____ ____
@@ -166,8 +165,32 @@ class HadoopFS(FS):
             # Truncate file
             self.client.create_file(self._base(path), "", overwrite=True)
 
+        elif RemoteFileBuffer._can_read_ranges(self, mode, 0):
+            # Only read the ranges of the file that are actually used
+            size = self._status(self._base(path), safe=False)["size"]
+            return RemoteFileBuffer(self, path, mode, size=size)
+
         return _HadoopFileLike(self._base(path), self.client, self.buffersize)
 
+    @hdfs_errors
+    def read_range(self, path, offset, length):
+        """Read part of a file.
+
+        :param path: a path in the filesystem
+        :param offset: position in the file to start reading from
+        :param length: maximum number of bytes to read
+
+        :returns: string with at most `length` bytes of the file contents
+        """
+
+        if length <= 0:
+            return ""
+        try:
+            return self.client.read_file(self._base(path), offset=offset,
+                                         length=length)
+        except pywebhdfs.errors.FileNotFound:
+            raise fs.errors.ResourceNotFoundError
+
     def isfile(self, path):
         """Check if a path references a file.
 
@@ -239,9 +262,8 @@ class HadoopFS(FS):
                 not a directory
         """
 
-        if wildcard is not None and not callable(wildcard):
-            wildcard_re = re.compile(fnmatch.translate(wildcard))
-            wildcard = lambda fn: bool(wildcard_re.match(fn))
+        if wildcard is not None:
+            wildcard = wildcard_matcher(wildcard)
 
         if dirs_only and files_only:
             raise ValueError("dirs_only and files_only cannot both be True")
@@ -7,11 +7,12 @@ fs.httpfs
 
 from fs.base import FS
 from fs.path import normpath
-from fs.errors import ResourceNotFoundError, UnsupportedError
+from fs.errors import ResourceNotFoundError, UnsupportedError, OperationFailedError
 from fs.filelike import FileWrapper
+from fs.remote import RemoteFileBuffer
 from fs import iotools
 
-from urllib2 import urlopen, URLError
+from urllib2 import urlopen, Request, URLError, HTTPError
 from datetime import datetime
 
 
@@ -48,6 +49,18 @@ class HTTPFS(FS):
             raise UnsupportedError('write')
 
         url = self._make_url(path)
+        if mode != 'r-':
+            # If the server supports it, only fetch the ranges that are read
+            info = self._head(path)
+            if info is not None and info.get('accept-ranges') == 'bytes' \
+                    and info.get('content-length') is not None:
+                size = int(info['content-length'])
+                # Ranges must all come from the version of the file seen here
+                etag = info.get('etag')
+                if etag is None or etag.startswith('W/'):
+                    etag = info.get('last-modified')
+                return RemoteFileBuffer(self, path, mode, size=size, etag=etag)
+
         try:
             f = urlopen(url)
         except URLError, e:
@@ -57,6 +70,56 @@ class HTTPFS(FS):
 
         return FileWrapper(f)
 
+    def _head(self, path):
+        """Get the headers for a file, or None if the server won't send them
+        without the contents."""
+        req = Request(self._make_url(path))
+        req.get_method = lambda: 'HEAD'
+        try:
+            f = urlopen(req)
+        except HTTPError, e:
+            if e.code in (405, 501):
+                return None
+            raise ResourceNotFoundError(path, details=e)
+        except (URLError, OSError), e:
+            raise ResourceNotFoundError(path, details=e)
+        try:
+            return f.info()
+        finally:
+            f.close()
+
+    def read_range(self, path, offset, length, etag=None):
+        """Read at most `length` bytes of a file, starting at `offset`.
+
+        If `etag` (an ETag or Last-Modified value) is given, it is sent as
+        If-Range, and the read fails if the file has changed since.
+        """
+        if length <= 0:
+            return b''
+        req = Request(self._make_url(path))
+        req.add_header('Range', 'bytes=%d-%d' % (offset, offset + length - 1))
+        if etag is not None:
+            req.add_header('If-Range', etag)
+        try:
+            f = urlopen(req)
+        except HTTPError, e:
+            # Requested range starts beyond the end of the file
+            if e.code == 416:
+                return b''
+            raise ResourceNotFoundError(path, details=e)
+        except (URLError, OSError), e:
+            raise ResourceNotFoundError(path, details=e)
+        try:
+            if f.getcode() != 206:
+                if etag is not None:
+                    msg = "File changed while being read: %(path)s"
+                    raise OperationFailedError('read_range', path=path, msg=msg)
+                # The server sent the whole file, skip to the range we want
+                f.read(offset)
+            return f.read(length)
+        finally:
+            f.close()
+
     def exists(self, path):
         return self.isfile(path)
 
@@ -86,7 +86,7 @@ class RawWrapper(object):
         return self._f.read()
 
     def readinto(self, b):
-        if self.is_io:
+        if self.is_io or hasattr(self._f, 'readinto'):
             return self._f.readinto(b)
         data = self._f.read(len(b))
         bytes_read = len(data)
@@ -188,6 +188,67 @@ def make_bytes_io(data, encoding=None, errors=None):
     return io.BytesIO(data)
 
 
+def copy_file_data(src_file, dst_file, chunk_size=64 * 1024, progress_callback=None):
+    """Copy the remaining data from one binary file to another.
+
+    If `src_file` supports readinto(), every chunk is read in to the same
+    preallocated buffer rather than creating a new string for each one, and
+    is passed to `dst_file.write()` as a buffer object if it accepts one
+    (so `dst_file` mustn't hold on to the object it is given).
+
+    :param src_file: file object to read from
+    :param dst_file: file object to write to
+    :param chunk_size: size of the chunks to copy
+    :param progress_callback: called with the number of bytes copied so far
+    :returns: the number of bytes copied
+
+    """
+    write = dst_file.write
+    bytes_copied = 0
+    readinto = getattr(src_file, 'readinto', None)
+    if readinto is None:
+        read = src_file.read
+        chunk = read(chunk_size)
+        while chunk:
+            write(chunk)
+            bytes_copied += len(chunk)
+            if progress_callback is not None:
+                progress_callback(bytes_copied)
+            chunk = read(chunk_size)
+        return bytes_copied
+
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    #  Most destinations accept a buffer object, so the chunk needn't be
+    #  copied in to a new string; fall back to strings for any that don't
+    write_buffer = True
+    while True:
+        bytes_read = readinto(buf)
+        if not bytes_read:
+            break
+        if write_buffer:
+            try:
+                write(_buffer_slice(buf, view, bytes_read))
+            except TypeError:
+                write_buffer = False
+        if not write_buffer:
+            write(view[:bytes_read].tobytes())
+        bytes_copied += bytes_read
+        if progress_callback is not None:
+            progress_callback(bytes_copied)
+    return bytes_copied
+
+
+if six.PY3:
+    def _buffer_slice(buf, view, size):
+        return view[:size]
+else:
+    def _buffer_slice(buf, view, size):
+        #  A buffer rather than a memoryview, as str() on a memoryview
+        #  doesn't give its contents in Python 2
+        return buffer(buf, 0, size)
+
+
 def copy_file_to_fs(f, fs, path, encoding=None, errors=None, progress_callback=None, chunk_size=64 * 1024):
     """Copy an open file to a path on an FS"""
     if progress_callback is None:
@@ -195,19 +256,27 @@ def copy_file_to_fs(f, fs, path, encoding=None, errors=None, progress_callback=N
     read = f.read
     chunk = read(chunk_size)
     if isinstance(chunk, six.text_type):
-        f = fs.open(path, 'wt', encoding=encoding, errors=errors)
+        dst_file = fs.open(path, 'wt', encoding=encoding, errors=errors)
     else:
-        f = fs.open(path, 'wb')
-    write = f.write
+        dst_file = fs.open(path, 'wb')
+    write = dst_file.write
     bytes_written = 0
     try:
-        while chunk:
+        if chunk and not isinstance(chunk, six.text_type):
+            #  Binary data, so the rest can be copied through one buffer
             write(chunk)
-            bytes_written += len(chunk)
+            first = bytes_written = len(chunk)
             progress_callback(bytes_written)
-            chunk = read(chunk_size)
+            bytes_written += copy_file_data(f, dst_file, chunk_size,
+                                            lambda n: progress_callback(first + n))
+        else:
+            while chunk:
+                write(chunk)
+                bytes_written += len(chunk)
+                progress_callback(bytes_written)
+                chunk = read(chunk_size)
     finally:
-        f.close()
+        dst_file.close()
     return bytes_written
 
 
@@ -129,6 +129,12 @@ class MemoryFile(object):
             size = -1
         return self.mem_file.read(size)
 
+    @seek_and_lock
+    def readinto(self, b):
+        if 'r' not in self.mode and '+' not in self.mode:
+            raise IOError("File not open for reading")
+        return self.mem_file.readinto(b)
+
     @seek_and_lock
     def seek(self, *args, **kwargs):
         return self.mem_file.seek(*args, **kwargs)
@@ -168,6 +174,33 @@ class MemoryFile(object):
         return False
 
 
+class _MemoryBuffer(StringIO):
+    """The contents of a file in a MemoryFS.
+
+    The value of the buffer is kept between modifications, so that reading
+    a whole file (or mapping it with getmmap) doesn't copy it every time.
+
+    """
+
+    def __init__(self, data=None, mode=None):
+        super(_MemoryBuffer, self).__init__(data, mode)
+        self._value = data
+
+    def getvalue(self):
+        value = self._value
+        if value is None:
+            value = self._value = self.wrapped_file.getvalue()
+        return value
+
+    def _write(self, string, flushing=False):
+        self._value = None
+        return super(_MemoryBuffer, self)._write(string, flushing)
+
+    def _truncate(self, size):
+        self._value = None
+        return super(_MemoryBuffer, self)._truncate(size)
+
+
 class DirEntry(object):
 
     def sync(f):
@@ -201,10 +234,9 @@ class DirEntry(object):
 
         self.xattrs = {}
 
-        self.lock = None
+        self.lock = threading.RLock()
         if self.type == 'file':
-            self.mem_file = StringIO()
-            self.lock = threading.RLock()
+            self.mem_file = _MemoryBuffer()
 
     def get_value(self):
         self.lock.acquire()
@@ -239,19 +271,20 @@ class DirEntry(object):
 
     def __setstate__(self, state):
         self.__dict__.update(state)
-        if self.type == 'file':
-            self.lock = threading.RLock()
-        else:
-            self.lock = None
+        self.lock = threading.RLock()
         if self.mem_file is not None:
-            data = self.mem_file
-            self.mem_file = StringIO()
-            self.mem_file.write(data)
+            self.mem_file = _MemoryBuffer(self.mem_file)
 
 
 class MemoryFS(FS):
     """An in-memory filesystem.
 
+    Every file and directory entry has its own lock, rather than the whole
+    tree sharing the FS lock.  Paths are resolved by lock-coupling (each
+    directory's lock is held only until the next entry down is locked), and
+    an operation then locks just the entries it reads or modifies, so threads
+    working in different directories don't contend with each other.
+
     """
 
     _meta = {'thread_safe': True,
@@ -269,8 +302,8 @@ class MemoryFS(FS):
     def _make_dir_entry(self, *args, **kwargs):
         return self.dir_entry_factory(*args, **kwargs)
 
-    def __init__(self, file_factory=None):
-        super(MemoryFS, self).__init__(thread_synchronize=_thread_synchronize_default)
+    def __init__(self, file_factory=None, thread_synchronize=_thread_synchronize_default):
+        super(MemoryFS, self).__init__(thread_synchronize=thread_synchronize)
 
         self.dir_entry_factory = DirEntry
         self.file_factory = file_factory or MemoryFile
@@ -288,27 +321,81 @@ class MemoryFS(FS):
     def __unicode__(self):
         return "<MemoryFS>"
 
-    @synchronize
-    def _get_dir_entry(self, dirpath):
-        dirpath = normpath(dirpath)
-        current_dir = self.root
-        for path_component in iteratepath(dirpath):
-            if current_dir.contents is None:
-                return None
-            dir_entry = current_dir.contents.get(path_component, None)
-            if dir_entry is None:
+    #  Entries are always locked from the top of the tree downwards, and no
+    #  lock is held while resolving another path from the root, so that
+    #  threads can't deadlock against each other.
+
+    def _lock_components(self, components, start=None):
+        """Find an entry by lock-coupling and return it with its lock held.
+
+        If `start` is given, `components` are relative to that entry, which
+        the caller has already locked (and which remains locked).  Returns
+        None, with no additional locks held, if there is no such entry.
+
+        """
+        if start is None:
+            current = self.root
+            current.lock.acquire()
+        else:
+            current = start
+        for component in components:
+            if current.contents is None:
+                entry = None
+            else:
+                entry = current.contents.get(component, None)
+            if entry is not None:
+                entry.lock.acquire()
+            if current is not start:
+                current.lock.release()
+            if entry is None:
                 return None
-            current_dir = dir_entry
-        return current_dir
+            current = entry
+        return current
+
+    def _lock_dir_entry(self, path):
+        """Find the entry for a path and return it with its lock held."""
+        return self._lock_components(iteratepath(path))
+
+    def _lock_dir_entries(self, path1, path2):
+        """Lock the entries for two paths.
+
+        The deepest common ancestor of the paths is held while both entries
+        are found, so no other thread can lock them in the opposite order.
+        Returns the two entries (either of which may be None) and a list of
+        the entries that were locked.
+
+        """
+        components1 = iteratepath(path1)
+        components2 = iteratepath(path2)
+        common = 0
+        for c1, c2 in zip(components1, components2):
+            if c1 != c2:
+                break
+            common += 1
+        ancestor = self._lock_components(components1[:common])
+        if ancestor is None:
+            return None, None, []
+        locked = [ancestor]
+        entries = []
+        for components in (components1[common:], components2[common:]):
+            entry = self._lock_components(components, start=ancestor)
+            if entry is not None and entry is not ancestor:
+                locked.append(entry)
+            entries.append(entry)
+        return entries[0], entries[1], locked
+
+    def _get_dir_entry(self, dirpath):
+        dir_entry = self._lock_dir_entry(dirpath)
+        if dir_entry is not None:
+            dir_entry.lock.release()
+        return dir_entry
 
-    @synchronize
     def _dir_entry(self, path):
         dir_entry = self._get_dir_entry(path)
         if dir_entry is None:
             raise ResourceNotFoundError(path)
         return dir_entry
 
-    @synchronize
     def desc(self, path):
         if self.isdir(path):
             return "Memory dir"
@@ -317,7 +404,6 @@ class MemoryFS(FS):
         else:
             return "No description available"
 
-    @synchronize
     def isdir(self, path):
         path = normpath(path)
         if path in ('', '/'):
@@ -327,7 +413,6 @@ class MemoryFS(FS):
             return False
         return dir_item.isdir()
 
-    @synchronize
     def isfile(self, path):
         path = normpath(path)
         if path in ('', '/'):
@@ -337,14 +422,12 @@ class MemoryFS(FS):
             return False
         return dir_item.isfile()
 
-    @synchronize
     def exists(self, path):
         path = normpath(path)
         if path in ('', '/'):
             return True
         return self._get_dir_entry(path) is not None
 
-    @synchronize
     def makedir(self, dirname, recursive=False, allow_recreate=False):
         if not dirname and not allow_recreate:
             raise PathError(dirname)
@@ -356,175 +439,177 @@ class MemoryFS(FS):
         dirpath, dirname = pathsplit(dirname.rstrip('/'))
 
         if recursive:
-            parent_dir = self._get_dir_entry(dirpath)
-            if parent_dir is not None:
-                if parent_dir.isfile():
-                    raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
-                else:
-                    if not allow_recreate:
-                        if dirname in parent_dir.contents:
-                            raise DestinationExistsError(dirname, msg="Can not create a directory that already exists (try allow_recreate=True): %(path)s")
-
-            current_dir = self.root
-            for path_component in iteratepath(dirpath)[:-1]:
-                dir_item = current_dir.contents.get(path_component, None)
-                if dir_item is None:
-                    break
-                if not dir_item.isdir():
-                    raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
-                current_dir = dir_item
-
-            current_dir = self.root
+            parent_dir = self.root
+            parent_dir.lock.acquire()
             for path_component in iteratepath(dirpath):
-                dir_item = current_dir.contents.get(path_component, None)
+                dir_item = parent_dir.contents.get(path_component, None)
                 if dir_item is None:
-                    new_dir = self._make_dir_entry("dir", path_component)
-                    current_dir.contents[path_component] = new_dir
-                    current_dir = new_dir
-                else:
-                    current_dir = dir_item
-
-            parent_dir = current_dir
-
+                    dir_item = self._make_dir_entry("dir", path_component)
+                    parent_dir.contents[path_component] = dir_item
+                elif not dir_item.isdir():
+                    parent_dir.lock.release()
+                    raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
+                dir_item.lock.acquire()
+                parent_dir.lock.release()
+                parent_dir = dir_item
         else:
-            parent_dir = self._get_dir_entry(dirpath)
+            parent_dir = self._lock_dir_entry(dirpath)
             if parent_dir is None:
                 raise ParentDirectoryMissingError(dirname, msg="Could not make dir, as parent dir does not exist: %(path)s")
 
-        dir_item = parent_dir.contents.get(dirname, None)
-        if dir_item is not None:
-            if dir_item.isdir():
-                if not allow_recreate:
-                    raise DestinationExistsError(dirname)
-            else:
+        try:
+            if not parent_dir.isdir():
                 raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
+            dir_item = parent_dir.contents.get(dirname, None)
+            if dir_item is not None:
+                if dir_item.isdir():
+                    if not allow_recreate:
+                        raise DestinationExistsError(dirname)
+                else:
+                    raise ResourceInvalidError(dirname, msg="Can not create a directory, because path references a file: %(path)s")
+            else:
+                parent_dir.contents[dirname] = self._make_dir_entry("dir", dirname)
+        finally:
+            parent_dir.lock.release()
 
-        if dir_item is None:
-            parent_dir.contents[dirname] = self._make_dir_entry("dir", dirname)
-
-
-    #@synchronize
     #def _orphan_files(self, file_dir_entry):
     #    for f in file_dir_entry.open_files[:]:
     #        f.close()
 
-
-    @synchronize
     @iotools.filelike_to_stream
     def open(self, path, mode='r', buffering=-1, encoding=None, errors=None, newline=None, line_buffering=False, **kwargs):
         path = normpath(path)
         filepath, filename = pathsplit(path)
-        parent_dir_entry = self._get_dir_entry(filepath)
+        parent_dir_entry = self._lock_dir_entry(filepath)
 
-        if parent_dir_entry is None or not parent_dir_entry.isdir():
+        if parent_dir_entry is None:
             raise ResourceNotFoundError(path)
 
-        if 'r' in mode or 'a' in mode:
-            if filename not in parent_dir_entry.contents:
+        try:
+            if not parent_dir_entry.isdir():
                 raise ResourceNotFoundError(path)
 
-            file_dir_entry = parent_dir_entry.contents[filename]
-            if file_dir_entry.isdir():
-                raise ResourceInvalidError(path)
+            if 'r' in mode or 'a' in mode:
+                if filename not in parent_dir_entry.contents:
+                    raise ResourceNotFoundError(path)
 
-            file_dir_entry.accessed_time = datetime.datetime.now()
+                file_dir_entry = parent_dir_entry.contents[filename]
+                if file_dir_entry.isdir():
+                    raise ResourceInvalidError(path)
 
-            mem_file = self.file_factory(path, self, file_dir_entry.mem_file, mode, file_dir_entry.lock)
-            file_dir_entry.open_files.append(mem_file)
-            return mem_file
+            elif 'w' in mode:
+                if filename not in parent_dir_entry.contents:
+                    file_dir_entry = self._make_dir_entry("file", filename)
+                    parent_dir_entry.contents[filename] = file_dir_entry
+                else:
+                    file_dir_entry = parent_dir_entry.contents[filename]
 
-        elif 'w' in mode:
-            if filename not in parent_dir_entry.contents:
-                file_dir_entry = self._make_dir_entry("file", filename)
-                parent_dir_entry.contents[filename] = file_dir_entry
             else:
-                file_dir_entry = parent_dir_entry.contents[filename]
-
-            file_dir_entry.accessed_time = datetime.datetime.now()
+                return None
 
-            mem_file = self.file_factory(path, self, file_dir_entry.mem_file, mode, file_dir_entry.lock)
-            file_dir_entry.open_files.append(mem_file)
+            with file_dir_entry.lock:
+                file_dir_entry.accessed_time = datetime.datetime.now()
+                mem_file = self.file_factory(path, self, file_dir_entry.mem_file, mode, file_dir_entry.lock)
+                file_dir_entry.open_files.append(mem_file)
             return mem_file
+        finally:
+            parent_dir_entry.lock.release()
 
-        if parent_dir_entry is None:
-            raise ResourceNotFoundError(path)
-
-    @synchronize
     def remove(self, path):
-        dir_entry = self._get_dir_entry(path)
+        path = normpath(path)
+        pathname, filename = pathsplit(path)
+        if not filename:
+            raise ResourceInvalidError(path, msg="That's a directory, not a file: %(path)s")
 
-        if dir_entry is None:
+        parent_dir = self._lock_dir_entry(pathname)
+        if parent_dir is None:
             raise ResourceNotFoundError(path)
+        try:
+            dir_entry = None
+            if parent_dir.isdir():
+                dir_entry = parent_dir.contents.get(filename, None)
+            if dir_entry is None:
+                raise ResourceNotFoundError(path)
+            if dir_entry.isdir():
+                raise ResourceInvalidError(path, msg="That's a directory, not a file: %(path)s")
+            del parent_dir.contents[filename]
+        finally:
+            parent_dir.lock.release()
 
-        if dir_entry.isdir():
-            raise ResourceInvalidError(path, msg="That's a directory, not a file: %(path)s")
-
+    def _remove_dir_entry(self, path, force=False):
+        """Remove a directory, returning False if it isn't empty."""
         pathname, dirname = pathsplit(path)
-        parent_dir = self._get_dir_entry(pathname)
-        del parent_dir.contents[dirname]
+        parent_dir = self._lock_dir_entry(pathname)
+        if parent_dir is None:
+            raise ResourceNotFoundError(path)
+        try:
+            dir_entry = None
+            if parent_dir.isdir():
+                dir_entry = parent_dir.contents.get(dirname, None)
+            if dir_entry is None:
+                raise ResourceNotFoundError(path)
+            if not dir_entry.isdir():
+                raise ResourceInvalidError(path, msg="Can't remove resource, its not a directory: %(path)s" )
+            with dir_entry.lock:
+                if dir_entry.contents and not force:
+                    return False
+                del parent_dir.contents[dirname]
+            return True
+        finally:
+            parent_dir.lock.release()
 
-    @synchronize
     def removedir(self, path, recursive=False, force=False):
         path = normpath(path)
         if path in ('', '/'):
             raise RemoveRootError(path)
-        dir_entry = self._get_dir_entry(path)
 
-        if dir_entry is None:
-            raise ResourceNotFoundError(path)
-        if not dir_entry.isdir():
-            raise ResourceInvalidError(path, msg="Can't remove resource, its not a directory: %(path)s" )
-
-        if dir_entry.contents and not force:
+        if not self._remove_dir_entry(path, force=force):
             raise DirectoryNotEmptyError(path)
 
         if recursive:
-            rpathname = path
-            while rpathname:
-                rpathname, dirname = pathsplit(rpathname)
-                parent_dir = self._get_dir_entry(rpathname)
-                if not dirname:
-                    raise RemoveRootError(path)
-                del parent_dir.contents[dirname]
-                # stop recursing if the directory has other contents
-                if parent_dir.contents:
+            # remove parent directories until one has other contents
+            rpathname = pathsplit(path)[0]
+            while rpathname not in ('', '/'):
+                try:
+                    if not self._remove_dir_entry(rpathname):
+                        break
+                except (ResourceNotFoundError, ResourceInvalidError):
                     break
-        else:
-            pathname, dirname = pathsplit(path)
-            parent_dir = self._get_dir_entry(pathname)
-            if not dirname:
-                raise RemoveRootError(path)
-            del parent_dir.contents[dirname]
+                rpathname = pathsplit(rpathname)[0]
 
-    @synchronize
     def rename(self, src, dst):
         src = normpath(src)
         dst = normpath(dst)
         src_dir, src_name = pathsplit(src)
-        src_entry = self._get_dir_entry(src)
-        if src_entry is None:
-            raise ResourceNotFoundError(src)
-        open_files = src_entry.open_files[:]
-        for f in open_files:
-            f.flush()
-            f.path = dst
+        dst_dir, dst_name = pathsplit(dst)
+        src_dir_entry, dst_dir_entry, locked = self._lock_dir_entries(src_dir, dst_dir)
+        try:
+            src_entry = None
+            if src_dir_entry is not None and src_dir_entry.isdir():
+                src_entry = src_dir_entry.contents.get(src_name, None)
+            if src_entry is None:
+                raise ResourceNotFoundError(src)
+            if dst_dir_entry is not None and dst_dir_entry.isdir():
+                if dst_name in dst_dir_entry.contents:
+                    raise DestinationExistsError(dst)
+            else:
+                raise ParentDirectoryMissingError(dst)
 
-        dst_dir,dst_name = pathsplit(dst)
-        dst_entry = self._get_dir_entry(dst)
-        if dst_entry is not None:
-            raise DestinationExistsError(dst)
+            with src_entry.lock:
+                open_files = src_entry.open_files[:]
+                for f in open_files:
+                    f.flush()
+                    f.path = dst
+
+            src_xattrs = src_dir_entry.xattrs.copy()
+            dst_dir_entry.contents[dst_name] = src_entry
+            src_entry.name = dst_name
+            dst_dir_entry.xattrs.update(src_xattrs)
+            del src_dir_entry.contents[src_name]
+        finally:
+            for dir_entry in reversed(locked):
+                dir_entry.lock.release()
 
-        src_dir_entry = self._get_dir_entry(src_dir)
-        src_xattrs = src_dir_entry.xattrs.copy()
-        dst_dir_entry = self._get_dir_entry(dst_dir)
-        if dst_dir_entry is None:
-            raise ParentDirectoryMissingError(dst)
-        dst_dir_entry.contents[dst_name] = src_dir_entry.contents[src_name]
-        dst_dir_entry.contents[dst_name].name = dst_name
-        dst_dir_entry.xattrs.update(src_xattrs)
-        del src_dir_entry.contents[src_name]
-
-    @synchronize
     def settimes(self, path, accessed_time=None, modified_time=None):
         now = datetime.datetime.now()
         if accessed_time is None:
@@ -532,60 +617,70 @@ class MemoryFS(FS):
         if modified_time is None:
             modified_time = now
 
-        dir_entry = self._get_dir_entry(path)
+        dir_entry = self._lock_dir_entry(path)
         if dir_entry is not None:
-            dir_entry.accessed_time = accessed_time
-            dir_entry.modified_time = modified_time
+            try:
+                dir_entry.accessed_time = accessed_time
+                dir_entry.modified_time = modified_time
+            finally:
+                dir_entry.lock.release()
             return True
         return False
 
-    @synchronize
     def _on_close_memory_file(self, open_file, path):
-        dir_entry = self._get_dir_entry(path)
+        dir_entry = self._lock_dir_entry(path)
         if dir_entry is not None:
-            dir_entry.open_files.remove(open_file)
-
+            try:
+                if open_file in dir_entry.open_files:
+                    dir_entry.open_files.remove(open_file)
+            finally:
+                dir_entry.lock.release()
 
-    @synchronize
     def _on_modify_memory_file(self, path):
-        dir_entry = self._get_dir_entry(path)
+        dir_entry = self._lock_dir_entry(path)
         if dir_entry is not None:
-            dir_entry.modified_time = datetime.datetime.now()
+            try:
+                dir_entry.modified_time = datetime.datetime.now()
+            finally:
+                dir_entry.lock.release()
 
-    @synchronize
     def listdir(self, path="/", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
-        dir_entry = self._get_dir_entry(path)
+        dir_entry = self._lock_dir_entry(path)
         if dir_entry is None:
             raise ResourceNotFoundError(path)
-        if dir_entry.isfile():
-            raise ResourceInvalidError(path, msg="not a directory: %(path)s")
-        paths = dir_entry.contents.keys()
+        try:
+            if dir_entry.isfile():
+                raise ResourceInvalidError(path, msg="not a directory: %(path)s")
+            paths = dir_entry.contents.keys()
+        finally:
+            dir_entry.lock.release()
         for (i,p) in enumerate(paths):
             if not isinstance(p,unicode):
                 paths[i] = unicode(p)
         return self._listdir_helper(path, paths, wildcard, full, absolute, dirs_only, files_only)
 
-    @synchronize
     def getinfo(self, path):
-        dir_entry = self._get_dir_entry(path)
+        dir_entry = self._lock_dir_entry(path)
 
         if dir_entry is None:
             raise ResourceNotFoundError(path)
 
-        info = {}
-        info['created_time'] = dir_entry.created_time
-        info['modified_time'] = dir_entry.modified_time
-        info['accessed_time'] = dir_entry.accessed_time
+        try:
+            info = {}
+            info['created_time'] = dir_entry.created_time
+            info['modified_time'] = dir_entry.modified_time
+            info['accessed_time'] = dir_entry.accessed_time
 
-        if dir_entry.isdir():
-            info['st_mode'] = 0755 | stat.S_IFDIR
-        else:
-            info['size'] = len(dir_entry.data or b(''))
-            info['st_mode'] = 0666 | stat.S_IFREG
+            if dir_entry.isdir():
+                info['st_mode'] = 0755 | stat.S_IFDIR
+            else:
+                info['size'] = len(dir_entry.data or b(''))
+                info['st_mode'] = 0666 | stat.S_IFREG
+        finally:
+            dir_entry.lock.release()
 
         return info
 
-    @synchronize
     def copydir(self, src, dst, overwrite=False, ignore_errors=False, chunk_size=1024*64):
         src_dir_entry = self._get_dir_entry(src)
         if src_dir_entry is None:
@@ -596,7 +691,6 @@ class MemoryFS(FS):
         if dst_dir_entry is not None:
             dst_dir_entry.xattrs.update(src_xattrs)
 
-    @synchronize
     def movedir(self, src, dst, overwrite=False, ignore_errors=False, chunk_size=1024*64):
         src_dir_entry = self._get_dir_entry(src)
         if src_dir_entry is None:
@@ -607,7 +701,6 @@ class MemoryFS(FS):
         if dst_dir_entry is not None:
             dst_dir_entry.xattrs.update(src_xattrs)
 
-    @synchronize
     def copy(self, src, dst, overwrite=False, chunk_size=1024*64):
         src_dir_entry = self._get_dir_entry(src)
         if src_dir_entry is None:
@@ -618,7 +711,6 @@ class MemoryFS(FS):
         if dst_dir_entry is not None:
             dst_dir_entry.xattrs.update(src_xattrs)
 
-    @synchronize
     def move(self, src, dst, overwrite=False, chunk_size=1024*64):
         src_dir_entry = self._get_dir_entry(src)
         if src_dir_entry is None:
@@ -629,66 +721,92 @@ class MemoryFS(FS):
         if dst_dir_entry is not None:
             dst_dir_entry.xattrs.update(src_xattrs)
 
-    @synchronize
     def getcontents(self, path, mode="rb", encoding=None, errors=None, newline=None):
-        dir_entry = self._get_dir_entry(path)
+        dir_entry = self._lock_dir_entry(path)
         if dir_entry is None:
             raise ResourceNotFoundError(path)
-        if not dir_entry.isfile():
-            raise ResourceInvalidError(path, msg="not a file: %(path)s")
-        data = dir_entry.data or b('')
+        try:
+            if not dir_entry.isfile():
+                raise ResourceInvalidError(path, msg="not a file: %(path)s")
+            data = dir_entry.data or b('')
+        finally:
+            dir_entry.lock.release()
         if 'b' not in mode:
             return iotools.decode_binary(data, encoding=encoding, errors=errors, newline=newline)
         return data
 
-    @synchronize
+    def getmmap(self, path, read_only=False, copy=False):
+        """Returns a memoryview of the contents of a file.
+
+        MemoryFS files can't be mapped with the mmap module, so a view of
+        the current contents of the file is returned instead.  With
+        `read_only` this is a read-only view that shares memory with the
+        file's buffer.  With `copy` it's a writable view of a private copy
+        of the data.  A writable mapping that changes the file isn't
+        supported.
+
+        """
+        dir_entry = self._lock_dir_entry(path)
+        if dir_entry is None:
+            raise ResourceNotFoundError(path)
+        try:
+            if not dir_entry.isfile():
+                raise ResourceInvalidError(path, msg="not a file: %(path)s")
+            data = dir_entry.data or b('')
+        finally:
+            dir_entry.lock.release()
+        if read_only:
+            return memoryview(data)
+        if copy:
+            return memoryview(bytearray(data))
+        raise NoMMapError(path, msg="MemoryFS files can only be mapped read-only or as a copy: %(path)s")
+
     def setcontents(self, path, data=b'', encoding=None, errors=None, chunk_size=1024*64):
         if isinstance(data, six.binary_type):
-            if not self.exists(path):
-                self.open(path, 'wb').close()
-            dir_entry = self._get_dir_entry(path)
-            if not dir_entry.isfile():
-                raise ResourceInvalidError('Not a directory %(path)s', path)
-            new_mem_file = StringIO()
-            new_mem_file.write(data)
-            dir_entry.mem_file = new_mem_file
+            path = normpath(path)
+            filepath, filename = pathsplit(path)
+            parent_dir_entry = self._lock_dir_entry(filepath)
+            if parent_dir_entry is None:
+                raise ResourceNotFoundError(path)
+            try:
+                if not parent_dir_entry.isdir():
+                    raise ResourceNotFoundError(path)
+                dir_entry = parent_dir_entry.contents.get(filename, None)
+                if dir_entry is None:
+                    dir_entry = self._make_dir_entry("file", filename)
+                    parent_dir_entry.contents[filename] = dir_entry
+                if not dir_entry.isfile():
+                    raise ResourceInvalidError('Not a directory %(path)s', path)
+                new_mem_file = _MemoryBuffer(data)
+                with dir_entry.lock:
+                    dir_entry.mem_file = new_mem_file
+            finally:
+                parent_dir_entry.lock.release()
             return len(data)
 
         return super(MemoryFS, self).setcontents(path, data=data, encoding=encoding, errors=errors, chunk_size=chunk_size)
 
-        # if isinstance(data, six.text_type):
-        #     return super(MemoryFS, self).setcontents(path, data, encoding=encoding, errors=errors, chunk_size=chunk_size)
-        # if not self.exists(path):
-        #     self.open(path, 'wb').close()
-
-        # dir_entry = self._get_dir_entry(path)
-        # if not dir_entry.isfile():
-        #     raise ResourceInvalidError('Not a directory %(path)s', path)
-        # new_mem_file = StringIO()
-        # new_mem_file.write(data)
-        # dir_entry.mem_file = new_mem_file
-
-    @synchronize
     def setxattr(self, path, key, value):
         dir_entry = self._dir_entry(path)
         key = unicode(key)
-        dir_entry.xattrs[key] = value
+        with dir_entry.lock:
+            dir_entry.xattrs[key] = value
 
-    @synchronize
     def getxattr(self, path, key, default=None):
         key = unicode(key)
         dir_entry = self._dir_entry(path)
-        return dir_entry.xattrs.get(key, default)
+        with dir_entry.lock:
+            return dir_entry.xattrs.get(key, default)
 
-    @synchronize
     def delxattr(self, path, key):
         dir_entry = self._dir_entry(path)
-        try:
-            del dir_entry.xattrs[key]
-        except KeyError:
-            pass
+        with dir_entry.lock:
+            try:
+                del dir_entry.xattrs[key]
+            except KeyError:
+                pass
 
-    @synchronize
     def listxattrs(self, path):
         dir_entry = self._dir_entry(path)
-        return dir_entry.xattrs.keys()
+        with dir_entry.lock:
+            return dir_entry.xattrs.keys()
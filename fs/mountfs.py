@@ -113,7 +113,7 @@ class MountFS(FS):
                 tail_path = path[len(head_path):]
 
         if type(object) is MountFS.DirMount:
-            return object.fs, head_path, tail_path
+            return object.fs, head_path, NormalizedPath(tail_path)
 
         if type(object) is MountFS.FileMount:
             return self, "/", path
@@ -153,7 +153,7 @@ class MountFS(FS):
                 raise NoPathURLError(path=path)
         return fs.getpathurl(delegate_path, allow_none=allow_none)
 
-    @synchronize
+    @synchronize_read
     def desc(self, path):
         fs, _mount_path, delegate_path = self._delegate(path)
         if fs is self:
@@ -163,7 +163,7 @@ class MountFS(FS):
                 return "Mounted file"
         return "Mounted dir, maps to path %s on %s" % (abspath(delegate_path) or '/', str(fs))
 
-    @synchronize
+    @synchronize_read
     def isdir(self, path):
         fs, _mount_path, delegate_path = self._delegate(path)
         if fs is None:
@@ -176,7 +176,7 @@ class MountFS(FS):
             return not isinstance(obj, MountFS.FileMount)
         return fs.isdir(delegate_path)
 
-    @synchronize
+    @synchronize_read
     def isfile(self, path):
         fs, _mount_path, delegate_path = self._delegate(path)
         if fs is None:
@@ -186,7 +186,7 @@ class MountFS(FS):
             return isinstance(obj, MountFS.FileMount)
         return fs.isfile(delegate_path)
 
-    @synchronize
+    @synchronize_read
     def exists(self, path):
         if path in ("/", ""):
             return True
@@ -197,7 +197,7 @@ class MountFS(FS):
             return True
         return fs.exists(delegate_path)
 
-    @synchronize
+    @synchronize_read
     def listdir(self, path="/", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
         fs, _mount_path, delegate_path = self._delegate(path)
 
@@ -241,7 +241,7 @@ class MountFS(FS):
 
             return paths
 
-    @synchronize
+    @synchronize_read
     def ilistdir(self, path="/", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
         fs, _mount_path, delegate_path = self._delegate(path)
 
@@ -377,7 +377,7 @@ class MountFS(FS):
         fs2, _mount_path2, delegate_path2 = self._delegate(dst)
         if fs1 is fs2 and fs1 is not self:
             fs1.move(delegate_path1,delegate_path2,**kwds)
-        else:
+        elif not self._copy_direct(fs1,delegate_path1,fs2,delegate_path2,kwds.get("overwrite",False),move=True):
             super(MountFS,self).move(src,dst,**kwds)
 
     @synchronize
@@ -395,9 +395,20 @@ class MountFS(FS):
         fs2, _mount_path2, delegate_path2 = self._delegate(dst)
         if fs1 is fs2 and fs1 is not self:
             fs1.copy(delegate_path1,delegate_path2,**kwds)
-        else:
+        elif not self._copy_direct(fs1,delegate_path1,fs2,delegate_path2,kwds.get("overwrite",False)):
             super(MountFS,self).copy(src,dst,**kwds)
 
+    def _copy_direct(self,fs1,path1,fs2,path2,overwrite,move=False):
+        """Copy (or move) between two mounted filesystems without reading the
+        file contents, if the destination filesystem supports it."""
+        for mounted_fs in (fs1,fs2):
+            if mounted_fs is None or mounted_fs is self:
+                return False
+        from fs.utils import copyfile_direct, movefile_direct
+        if move:
+            return movefile_direct(fs1,path1,fs2,path2,overwrite=overwrite)
+        return copyfile_direct(fs1,path1,fs2,path2,overwrite=overwrite)
+
     @synchronize
     def copydir(self,src,dst,**kwds):
         fs1, _mount_path1, delegate_path1 = self._delegate(src)
@@ -460,7 +471,7 @@ class MountFS(FS):
             raise UnsupportedError("settimes")
         fs.settimes(delegate_path, accessed_time, modified_time)
 
-    @synchronize
+    @synchronize_read
     def getinfo(self, path):
         path = normpath(path)
 
@@ -477,7 +488,31 @@ class MountFS(FS):
             return {}
         return fs.getinfo(delegate_path)
 
-    @synchronize
+    @synchronize_read
+    def getinfo_many(self, paths, ignore_errors=False):
+        paths = list(paths)
+        infos = [None] * len(paths)
+        #  Batch up the paths that are delegated to each mounted filesystem
+        batches = {}
+        for (i, path) in enumerate(paths):
+            fs, _mount_path, delegate_path = self._delegate(path)
+            if fs is None or fs is self:
+                try:
+                    info = self.getinfo(path)
+                except FSError:
+                    if not ignore_errors:
+                        raise
+                    info = {}
+                infos[i] = (path, info)
+            else:
+                batches.setdefault(id(fs), (fs, []))[1].append((i, delegate_path))
+        for fs, batch in batches.itervalues():
+            fs_infos = fs.getinfo_many([p for (_i, p) in batch], ignore_errors=ignore_errors)
+            for ((i, _p), (_dp, info)) in zip(batch, fs_infos):
+                infos[i] = (paths[i], info)
+        return infos
+
+    @synchronize_read
     def getsize(self, path):
         path = normpath(path)
         fs, _mount_path, delegate_path = self._delegate(path)
@@ -498,7 +533,7 @@ class MountFS(FS):
 
         return fs.getinfo(delegate_path).get("size", None)
 
-    @synchronize
+    @synchronize_read
     def getxattr(self,path,name,default=None):
         path = normpath(path)
         fs, _mount_path, delegate_path = self._delegate(path)
@@ -530,7 +565,7 @@ class MountFS(FS):
             return True
         return fs.delxattr(delegate_path, name)
 
-    @synchronize
+    @synchronize_read
     def listxattrs(self,path):
         path = normpath(path)
         fs, _mount_path, delegate_path = self._delegate(path)
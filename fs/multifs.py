@@ -62,7 +62,7 @@ you can always access them directly.
 
 """
 
-from fs.base import FS, synchronize
+from fs.base import FS, synchronize, synchronize_read
 from fs.path import *
 from fs.errors import *
 from fs import _thread_synchronize_default
@@ -83,13 +83,14 @@ class MultiFS(FS):
               'case_insensitive_paths' : False
               }
 
-    def __init__(self, auto_close=True):
+    def __init__(self, auto_close=True, thread_synchronize=_thread_synchronize_default):
         """
 
         :param auto_close: If True the child filesystems will be closed when the MultiFS is closed
+        :param thread_synchronize: If True a lock will be used to make the MultiFS thread-safe, or "rw" to let reads run concurrently
 
         """
-        super(MultiFS, self).__init__(thread_synchronize=_thread_synchronize_default)
+        super(MultiFS, self).__init__(thread_synchronize=thread_synchronize)
 
         self.auto_close = auto_close
         self.fs_sequence = []
@@ -97,13 +98,13 @@ class MultiFS(FS):
         self.fs_priorities = {}
         self.writefs = None
 
-    @synchronize
+    @synchronize_read
     def __str__(self):
         return "<MultiFS: %s>" % ", ".join(str(fs) for fs in self.fs_sequence)
 
     __repr__ = __str__
 
-    @synchronize
+    @synchronize_read
     def __unicode__(self):
         return u"<MultiFS: %s>" % ", ".join(unicode(fs) for fs in self.fs_sequence)
 
@@ -187,11 +188,11 @@ class MultiFS(FS):
         del self.fs_lookup[name]
         self._priority_sort()
 
-    @synchronize
+    @synchronize_read
     def __getitem__(self, name):
         return self.fs_lookup[name]
 
-    @synchronize
+    @synchronize_read
     def __iter__(self):
         return iter(self.fs_sequence[:])
 
@@ -201,7 +202,7 @@ class MultiFS(FS):
                 return fs
         return None
 
-    @synchronize
+    @synchronize_read
     def which(self, path, mode='r'):
         """Retrieves the filesystem that a given path would delegate to.
         Returns a tuple of the filesystem's name and the filesystem object itself.
@@ -218,7 +219,7 @@ class MultiFS(FS):
                         return fs_name, fs
         raise ResourceNotFoundError(path, msg="Path does not map to any filesystem: %(path)s")
 
-    @synchronize
+    @synchronize_read
     def getsyspath(self, path, allow_none=False):
         fs = self._delegate_search(path)
         if fs is not None:
@@ -227,7 +228,7 @@ class MultiFS(FS):
             return None
         raise ResourceNotFoundError(path)
 
-    @synchronize
+    @synchronize_read
     def desc(self, path):
         if not self.exists(path):
             raise ResourceNotFoundError(path)
@@ -249,25 +250,25 @@ class MultiFS(FS):
                 return fs_file
         raise ResourceNotFoundError(path)
 
-    @synchronize
+    @synchronize_read
     def exists(self, path):
         return self._delegate_search(path) is not None
 
-    @synchronize
+    @synchronize_read
     def isdir(self, path):
         fs = self._delegate_search(path)
         if fs is not None:
             return fs.isdir(path)
         return False
 
-    @synchronize
+    @synchronize_read
     def isfile(self, path):
         fs = self._delegate_search(path)
         if fs is not None:
             return fs.isfile(path)
         return False
 
-    @synchronize
+    @synchronize_read
     def listdir(self, path="./", *args, **kwargs):
         paths = []
         for fs in self:
@@ -309,7 +310,7 @@ class MultiFS(FS):
             raise OperationFailedError('settimes', path=path, msg="No writeable FS set")
         self.writefs.settimes(path, accessed_time, modified_time)
 
-    @synchronize
+    @synchronize_read
     def getinfo(self, path):
         for fs in self:
             if fs.exists(path):
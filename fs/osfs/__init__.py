@@ -10,6 +10,12 @@ For example, to print all the files and directories in the OS root::
     >>> home_fs = OSFS('/')
     >>> print home_fs.listdir()
 
+Directory listings use :func:`os.scandir` (Python 3.5 and later) or the
+`scandir <https://pypi.python.org/pypi/scandir>`_ package if it is
+installed (``pip install fs[scandir]``).  Without either, listings fall back
+to :func:`os.listdir` and a ``stat()`` call for each entry, which gives the
+same results but is slower for large directories.
+
 """
 
 
@@ -31,6 +37,17 @@ from fs import _thread_synchronize_default
 from fs.osfs.xattrs import OSFSXAttrMixin
 from fs.osfs.watch import OSFSWatchMixin
 
+#  Prefer scandir(), which gets the entry type from readdir() rather than
+#  needing a stat() call per entry.  It's in the stdlib from Python 3.5, and
+#  available as the 'scandir' module for earlier versions.
+try:
+    from os import scandir as _scandir
+except ImportError:
+    try:
+        from scandir import scandir as _scandir
+    except ImportError:
+        _scandir = None
+
 
 @convert_os_errors
 def _os_stat(path):
@@ -70,6 +87,241 @@ def _os_makedirs(name, mode=0777):
     os.mkdir(name, mode)
 
 
+class _ListdirEntry(object):
+    """Stand-in for the entries yielded by scandir(), built from os.listdir().
+
+    This is used when no scandir() implementation is available.  It offers
+    the same interface, but has to stat() the entry to determine its type.
+    """
+
+    def __init__(self, dir_path, name):
+        self.name = name
+        self.path = os.path.join(dir_path, name)
+        self._stat = None
+
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def is_dir(self):
+        return _isdir(self.path)
+
+    def is_file(self):
+        return _isfile(self.path)
+
+
+def _listdir_entries(sys_path):
+    """Get an iterator of directory entries for the given system path."""
+    if _scandir is not None:
+        return _scandir(sys_path)
+    return (_ListdirEntry(sys_path, name) for name in os.listdir(sys_path))
+
+
+#  Info keys which are derived from a stat() field
+_STAT_TIMES = {'created_time': 'st_ctime',
+               'accessed_time': 'st_atime',
+               'modified_time': 'st_mtime'}
+
+#  Maps the type of a stat() result on to its 'st_*' fields, and the keys of
+#  _STAT_TIMES that it can provide
+_stat_fields_cache = {}
+
+
+def _stat_fields(stats):
+    """Get the 'st_*' fields and time keys available from a stat() result."""
+    try:
+        return _stat_fields_cache[type(stats)]
+    except KeyError:
+        fields = [k for k in dir(stats) if k.startswith('st_')]
+        times = [k for (k, attr) in _STAT_TIMES.iteritems() if attr in fields]
+        _stat_fields_cache[type(stats)] = (fields, times)
+        return (fields, times)
+
+
+class _StatInfo(dict):
+    """Info dict built from the result of a stat() call.
+
+    This is a real dict holding the 'st_*' fields of the stat result and
+    'size', but the 'created_time', 'accessed_time' and 'modified_time'
+    datetimes are only built when they're looked up.
+
+    When created from a directory entry it initially holds just 'is_dir',
+    answered from the entry itself, and the entry is only stat'ed when some
+    other key is needed, so walking a directory tree doesn't need to stat
+    every file.
+
+    Lookups and the mapping methods (keys, items, iteration, len, copy,
+    comparison, pickling) all see every key.  C code that reads the dict's
+    storage directly, such as dict(info) or {}.update(info) on Python 2,
+    only sees the keys that have been computed so far; use info.copy() to
+    get a complete plain dict.
+    """
+
+    __slots__ = ('_stats', '_entry', '_pending')
+
+    def __init__(self, stats=None, entry=None):
+        dict.__init__(self)
+        self._stats = None
+        self._entry = entry
+        #  Time keys not yet computed, or None if not stat'ed yet
+        self._pending = None
+        if entry is not None:
+            dict.__setitem__(self, 'is_dir', entry.is_dir())
+        if stats is not None:
+            self._setstats(stats)
+
+    def _setstats(self, stats):
+        (fields, times) = _stat_fields(stats)
+        for k in fields:
+            dict.__setitem__(self, k, getattr(stats, k))
+        dict.__setitem__(self, 'size', stats.st_size)
+        self._stats = stats
+        self._pending = set(times)
+
+    def _load(self):
+        """Stat the directory entry, if that hasn't been done yet."""
+        if self._pending is None:
+            try:
+                stats = self._entry.stat()
+            except OSError:
+                #  e.g. a broken symlink, or removed since it was listed
+                self._pending = set()
+            else:
+                self._setstats(stats)
+        return self._pending
+
+    def _materialize(self):
+        """Compute every key that hasn't been looked up yet."""
+        for key in list(self._load()):
+            self[key]
+
+    def __missing__(self, key):
+        pending = self._load()
+        if key in pending:
+            #  TODO: 'created_time' doesn't actually mean creation time on unix
+            value = datetime.datetime.fromtimestamp(getattr(self._stats, _STAT_TIMES[key]))
+            pending.discard(key)
+            dict.__setitem__(self, key, value)
+            return value
+        if dict.__contains__(self, key):
+            #  Filled in by stat'ing the entry
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            return True
+        #  Stat'ing the entry may fill in the key
+        return key in self._load() or dict.__contains__(self, key)
+
+    has_key = __contains__
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        self._load().discard(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        pending = self._load()
+        if key in pending:
+            pending.discard(key)
+        else:
+            dict.__delitem__(self, key)
+
+    def keys(self):
+        self._materialize()
+        return dict.keys(self)
+
+    def values(self):
+        self._materialize()
+        return dict.values(self)
+
+    def items(self):
+        self._materialize()
+        return dict.items(self)
+
+    def iterkeys(self):
+        self._materialize()
+        return dict.iterkeys(self)
+
+    def itervalues(self):
+        self._materialize()
+        return dict.itervalues(self)
+
+    def iteritems(self):
+        self._materialize()
+        return dict.iteritems(self)
+
+    def __iter__(self):
+        self._materialize()
+        return dict.__iter__(self)
+
+    def viewkeys(self):
+        self._materialize()
+        return dict.viewkeys(self)
+
+    def viewvalues(self):
+        self._materialize()
+        return dict.viewvalues(self)
+
+    def viewitems(self):
+        self._materialize()
+        return dict.viewitems(self)
+
+    def __len__(self):
+        self._materialize()
+        return dict.__len__(self)
+
+    def __repr__(self):
+        self._materialize()
+        return dict.__repr__(self)
+
+    def copy(self):
+        self._materialize()
+        return dict.copy(self)
+
+    def pop(self, key, *default):
+        self._materialize()
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self._materialize()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        self._materialize()
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwds):
+        self._materialize()
+        dict.update(self, *args, **kwds)
+
+    def clear(self):
+        self._load().clear()
+        dict.clear(self)
+
+    def __eq__(self, other):
+        self._materialize()
+        if isinstance(other, _StatInfo):
+            other._materialize()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        #  Pickles as a plain dict
+        return (dict, (self.copy(),))
+
+
 class OSFS(OSFSXAttrMixin, OSFSWatchMixin, FS):
     """Expose the underlying operating-system filesystem as an FS object.
 
@@ -246,12 +498,67 @@ class OSFS(OSFSXAttrMixin, OSFSWatchMixin, FS):
 
     @convert_os_errors
     def listdir(self, path="./", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
+        if dirs_only or files_only:
+            #  Use the directory entries to avoid a stat per entry
+            return [nm for (nm, entry) in self._iterentries(path, wildcard, full, absolute, dirs_only, files_only)]
         _decode_path = self._decode_path
         sys_path = self.getsyspath(path)
         listing = os.listdir(sys_path)
         paths = [_decode_path(p) for p in listing]
         return self._listdir_helper(path, paths, wildcard, full, absolute, dirs_only, files_only)
 
+    @convert_os_errors
+    def listdirinfo(self, path="./", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
+        return list(self.ilistdirinfo(path, wildcard, full, absolute, dirs_only, files_only))
+
+    @convert_os_errors
+    def ilistdirinfo(self, path="./", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
+        entries = self._iterentries(path, wildcard, full, absolute, dirs_only, files_only)
+        return self._iterinfo(entries)
+
+    @convert_os_errors
+    def _iterinfo(self, entries):
+        #  A generator, so errors raised while reading the directory are
+        #  converted as they happen
+        for (nm, entry) in entries:
+            yield (nm, _StatInfo(entry=entry))
+
+    def _iterentries(self, path, wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
+        """Get an iterator of (name, entry) pairs for the given directory.
+
+        This applies the same filtering as _listdir_helper(), but uses the
+        entry type reported by the OS rather than an isdir() call per entry.
+        The directory is opened before this method returns, so that errors
+        are raised to the caller immediately.
+        """
+        if dirs_only and files_only:
+            raise ValueError("dirs_only and files_only can not both be True")
+        path = normpath(path)
+        entries = _listdir_entries(self.getsyspath(path))
+        if wildcard is not None:
+            wildcard = wildcard_matcher(wildcard)
+        if full:
+            prefix = path
+        elif absolute:
+            prefix = abspath(path)
+        else:
+            prefix = None
+        return self._filterentries(entries, prefix, wildcard, dirs_only, files_only)
+
+    def _filterentries(self, entries, prefix, wildcard, dirs_only, files_only):
+        _decode_path = self._decode_path
+        for entry in entries:
+            nm = _decode_path(entry.name)
+            if wildcard is not None and not wildcard(nm):
+                continue
+            if dirs_only and not entry.is_dir():
+                continue
+            if files_only and not entry.is_file():
+                continue
+            if prefix is not None:
+                nm = pathcombine(prefix, nm)
+            yield (nm, entry)
+
     @convert_os_errors
     def makedir(self, path, recursive=False, allow_recreate=False):
         sys_path = self.getsyspath(path)
@@ -335,42 +642,12 @@ class OSFS(OSFSXAttrMixin, OSFSWatchMixin, FS):
 
     @convert_os_errors
     def getinfo(self, path):
-        stats = self._stat(path)
-        info = dict((k, getattr(stats, k)) for k in dir(stats) if k.startswith('st_'))
-        info['size'] = info['st_size']
-        #  TODO: this doesn't actually mean 'creation time' on unix
-        fromtimestamp = datetime.datetime.fromtimestamp
-        ct = info.get('st_ctime', None)
-        if ct is not None:
-            info['created_time'] = fromtimestamp(ct)
-        at = info.get('st_atime', None)
-        if at is not None:
-            info['accessed_time'] = fromtimestamp(at)
-        mt = info.get('st_mtime', None)
-        if mt is not None:
-            info['modified_time'] = fromtimestamp(mt)
-        return info
+        return _StatInfo(self._stat(path))
 
     @convert_os_errors
     def getinfokeys(self, path, *keys):
-        info = {}
-        stats = self._stat(path)
-        fromtimestamp = datetime.datetime.fromtimestamp
-        for key in keys:
-            try:
-                if key == 'size':
-                    info[key] = stats.st_size
-                elif key == 'modified_time':
-                    info[key] = fromtimestamp(stats.st_mtime)
-                elif key == 'created_time':
-                    info[key] = fromtimestamp(stats.st_ctime)
-                elif key == 'accessed_time':
-                    info[key] = fromtimestamp(stats.st_atime)
-                else:
-                    info[key] = getattr(stats, key)
-            except AttributeError:
-                continue
-        return info
+        info = _StatInfo(self._stat(path))
+        return dict((k, info[k]) for k in keys if k in info)
 
 
     @convert_os_errors
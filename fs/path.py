@@ -12,11 +12,61 @@ by forward slashes and with an optional leading slash).
 
 import re
 import os
+import fnmatch as _fnmatch
+import six
+try:
+    import threading as _threading
+except ImportError:
+    import dummy_threading as _threading
+try:
+    from collections import OrderedDict as _OrderedDict
+except ImportError:
+    _OrderedDict = None
 
 
 _requires_normalization = re.compile(r'(^|/)\.\.?($|/)|//').search
 
 
+class NormalizedPath(six.text_type):
+    """A unicode path that is known to be normalized.
+
+    :func:`normpath` returns instances of this class unchanged, so a path that
+    has been normalized once can be passed down through several layers of
+    wrappers (e.g. MountFS and SubFS) without being normalized again.  Only
+    wrap paths that really are in the form returned by normpath.
+
+    """
+    __slots__ = ()
+
+
+#  Number of paths memoized by normpath once enable_normpath_cache is called
+NORMPATH_CACHE_SIZE = 4096
+
+_normpath_cache = None
+_normpath_cache_size = NORMPATH_CACHE_SIZE
+
+
+def enable_normpath_cache(size=None):
+    """Memoize the results of :func:`normpath`.
+
+    Normalized paths are returned as :class:`NormalizedPath` instances, so
+    abspath, relpath and further calls to normpath on them are cheap.  When
+    more than `size` paths have been memoized, the memo is emptied.
+
+    :param size: maximum number of memoized paths (defaults to NORMPATH_CACHE_SIZE)
+
+    """
+    global _normpath_cache, _normpath_cache_size
+    _normpath_cache_size = size or NORMPATH_CACHE_SIZE
+    _normpath_cache = {}
+
+
+def disable_normpath_cache():
+    """Stop memoizing the results of :func:`normpath`."""
+    global _normpath_cache
+    _normpath_cache = None
+
+
 def normpath(path):
     """Normalizes a path to be in the format expected by FS objects.
 
@@ -37,6 +87,23 @@ def normpath(path):
 
     """
 
+    if type(path) is NormalizedPath:
+        return path
+    cache = _normpath_cache
+    if cache is None or not isinstance(path, six.text_type):
+        return _normpath(path)
+    try:
+        return cache[path]
+    except KeyError:
+        pass
+    normalized = NormalizedPath(_normpath(path))
+    if len(cache) >= _normpath_cache_size:
+        cache.clear()
+    cache[path] = normalized
+    return normalized
+
+
+def _normpath(path):
     if path in ('', '/'):
         return path
 
@@ -133,6 +200,8 @@ def abspath(path):
 
     """
     if not path.startswith('/'):
+        if type(path) is NormalizedPath:
+            return NormalizedPath(u'/' + path)
         return u'/' + path
     return path
 
@@ -149,6 +218,10 @@ def relpath(path):
     'a/b'
 
     """
+    if type(path) is NormalizedPath:
+        if path.startswith('/'):
+            return NormalizedPath(path[1:])
+        return path
     return path.lstrip('/')
 
 
@@ -422,6 +495,19 @@ def relativefrom(base, path):
     return u'/'.join([u'..'] * (len(base) - common) + path[common:])
 
 
+_NO_VALUE = object()
+
+
+class _PathMapNode(object):
+    """A node in the trie used by PathMap."""
+
+    __slots__ = ('value', 'children')
+
+    def __init__(self, value=_NO_VALUE):
+        self.value = value
+        self.children = None
+
+
 class PathMap(object):
     """Dict-like object with paths for keys.
 
@@ -447,125 +533,187 @@ class PathMap(object):
     Under the hood, a PathMap is a trie-like structure where each level is
     indexed by path name component.  This allows lookups to be performed in
     O(number of path components) while permitting efficient prefix-based
-    operations.
+    operations.  The nodes of the trie are small objects with ``__slots__``,
+    and a node only gets a dict of children if it has any, so that a map with
+    millions of entries (most of which are leaves) stays compact.  Use
+    :meth:`update` to add many entries at once.
     """
 
     def __init__(self):
-        self._map = {}
+        self._root = _PathMapNode()
 
-    def __getitem__(self, path):
-        """Get the value stored under the given path."""
-        m = self._map
+    def __getstate__(self):
+        return {'items': self.items()}
+
+    def __setstate__(self, state):
+        self._root = _PathMapNode()
+        self.update(state['items'])
+
+    def _find(self, path):
+        """Get the node for the given path, or None if there isn't one."""
+        node = self._root
+        try:
+            for name in iteratepath(path):
+                node = node.children[name]
+        except (KeyError, TypeError):
+            #  TypeError: the node has no children
+            return None
+        return node
+
+    def _find_parents(self, path):
+        """Get the node for the given path, and a list of (node, name) pairs
+        for each of its ancestors.  The node is None if there isn't one.
+        """
+        parents = []
+        node = self._root
         for name in iteratepath(path):
+            children = node.children
+            if children is None:
+                return None, parents
+            parents.append((node, name))
+            node = children.get(name)
+            if node is None:
+                return None, parents
+        return node, parents
+
+    def _make(self, components):
+        """Get the node for a list of path components, creating it if needed."""
+        node = self._root
+        for name in components:
             try:
-                m = m[name]
+                node = node.children[name]
             except KeyError:
-                raise KeyError(path)
+                child = node.children[name] = _PathMapNode()
+                node = child
+            except TypeError:
+                #  The node has no children yet
+                child = _PathMapNode()
+                node.children = {name: child}
+                node = child
+        return node
+
+    def _prune(self, node, parents):
+        """Remove a node, and then its ancestors, while they hold nothing."""
+        while parents and node.value is _NO_VALUE and not node.children:
+            node, name = parents.pop()
+            del node.children[name]
+            if not node.children:
+                node.children = None
+
+    def _remove(self, path):
+        """Remove the value stored under the given path and return it."""
+        node, parents = self._find_parents(path)
+        if node is None:
+            return _NO_VALUE
+        value = node.value
+        if value is not _NO_VALUE:
+            node.value = _NO_VALUE
+            self._prune(node, parents)
+        return value
+
+    def __getitem__(self, path):
+        """Get the value stored under the given path."""
+        node = self._root
         try:
-            return m[""]
-        except KeyError:
+            for name in iteratepath(path):
+                node = node.children[name]
+        except (KeyError, TypeError):
+            raise KeyError(path)
+        value = node.value
+        if value is _NO_VALUE:
             raise KeyError(path)
+        return value
 
     def __contains__(self, path):
         """Check whether the given path has a value stored in the map."""
-        try:
-            self[path]
-        except KeyError:
-            return False
-        else:
-            return True
+        node = self._find(path)
+        return node is not None and node.value is not _NO_VALUE
 
     def __setitem__(self, path, value):
         """Set the value stored under the given path."""
-        m = self._map
-        for name in iteratepath(path):
-            try:
-                m = m[name]
-            except KeyError:
-                m = m.setdefault(name, {})
-        m[""] = value
+        components = iteratepath(path)
+        if not components:
+            self._root.value = value
+            return
+        name = components.pop()
+        node = self._make(components)
+        try:
+            node.children[name].value = value
+        except KeyError:
+            node.children[name] = _PathMapNode(value)
+        except TypeError:
+            #  The node has no children yet
+            node.children = {name: _PathMapNode(value)}
 
     def __delitem__(self, path):
         """Delete the value stored under the given path."""
-        ms = [[self._map, None]]
-        for name in iteratepath(path):
-            try:
-                ms.append([ms[-1][0][name], None])
-            except KeyError:
-                raise KeyError(path)
-            else:
-                ms[-2][1] = name
-        try:
-            del ms[-1][0][""]
-        except KeyError:
+        if self._remove(path) is _NO_VALUE:
             raise KeyError(path)
-        else:
-            while len(ms) > 1 and not ms[-1][0]:
-                del ms[-1]
-                del ms[-1][0][ms[-1][1]]
 
     def get(self, path, default=None):
         """Get the value stored under the given path, or the given default."""
-        try:
-            return self[path]
-        except KeyError:
+        node = self._find(path)
+        if node is None or node.value is _NO_VALUE:
             return default
+        return node.value
 
     def pop(self, path, default=None):
         """Pop the value stored under the given path, or the given default."""
-        ms = [[self._map, None]]
-        for name in iteratepath(path):
-            try:
-                ms.append([ms[-1][0][name], None])
-            except KeyError:
-                return default
-            else:
-                ms[-2][1] = name
-        try:
-            val = ms[-1][0].pop("")
-        except KeyError:
-            val = default
-        else:
-            while len(ms) > 1 and not ms[-1][0]:
-                del ms[-1]
-                del ms[-1][0][ms[-1][1]]
-        return val
+        value = self._remove(path)
+        if value is _NO_VALUE:
+            return default
+        return value
 
     def setdefault(self, path, value):
-        m = self._map
-        for name in iteratepath(path):
-            try:
-                m = m[name]
-            except KeyError:
-                m = m.setdefault(name, {})
-        return m.setdefault("", value)
+        node = self._make(iteratepath(path))
+        if node.value is _NO_VALUE:
+            node.value = value
+        return node.value
+
+    def update(self, items):
+        """Set the values for several paths.
+
+        `items` may be a mapping (including another PathMap) or an iterable
+        of (path, value) pairs.  Consecutive paths in the same directory, such
+        as those produced by walking a filesystem, share a single lookup of
+        the directory's node.
+        """
+        if hasattr(items, "iteritems"):
+            items = items.iteritems()
+        elif hasattr(items, "items"):
+            items = items.items()
+        last_components = None
+        dir_node = None
+        for path, value in items:
+            components = iteratepath(path)
+            if not components:
+                self._root.value = value
+                continue
+            name = components.pop()
+            if components != last_components:
+                dir_node = self._make(components)
+                last_components = components
+            children = dir_node.children
+            if children is None:
+                children = dir_node.children = {}
+            node = children.get(name)
+            if node is None:
+                node = children[name] = _PathMapNode()
+            node.value = value
 
     def clear(self, root="/"):
         """Clear all entries beginning with the given root path."""
-        m = self._map
-        for name in iteratepath(root):
-            try:
-                m = m[name]
-            except KeyError:
-                return
-        m.clear()
-
-    def iterkeys(self, root="/", m=None):
+        node, parents = self._find_parents(root)
+        if node is None:
+            return
+        node.value = _NO_VALUE
+        node.children = None
+        self._prune(node, parents)
+
+    def iterkeys(self, root="/"):
         """Iterate over all keys beginning with the given root path."""
-        if m is None:
-            m = self._map
-            for name in iteratepath(root):
-                try:
-                    m = m[name]
-                except KeyError:
-                    return
-        for (nm, subm) in m.iteritems():
-            if not nm:
-                yield abspath(root)
-            else:
-                k = pathcombine(root, nm)
-                for subk in self.iterkeys(k, subm):
-                    yield subk
+        for (path, _value) in self.iteritems(root):
+            yield path
 
     def __iter__(self):
         return self.iterkeys()
@@ -573,44 +721,41 @@ class PathMap(object):
     def keys(self,root="/"):
         return list(self.iterkeys(root))
 
-    def itervalues(self, root="/", m=None):
+    def itervalues(self, root="/"):
         """Iterate over all values whose keys begin with the given root path."""
-        root = normpath(root)
-        if m is None:
-            m = self._map
-            for name in iteratepath(root):
-                try:
-                    m = m[name]
-                except KeyError:
-                    return
-        for (nm, subm) in m.iteritems():
-            if not nm:
-                yield subm
-            else:
-                k = pathcombine(root, nm)
-                for subv in self.itervalues(k, subm):
-                    yield subv
+        node = self._find(root)
+        if node is None:
+            return
+        stack = [node]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            node = pop()
+            if node.value is not _NO_VALUE:
+                yield node.value
+            if node.children:
+                for child in node.children.itervalues():
+                    push(child)
 
     def values(self, root="/"):
         return list(self.itervalues(root))
 
-    def iteritems(self, root="/", m=None):
+    def iteritems(self, root="/"):
         """Iterate over all (key,value) pairs beginning with the given root."""
-        root = normpath(root)
-        if m is None:
-            m = self._map
-            for name in iteratepath(root):
-                try:
-                    m = m[name]
-                except KeyError:
-                    return
-        for (nm, subm) in m.iteritems():
-            if not nm:
-                yield (abspath(normpath(root)), subm)
-            else:
-                k = pathcombine(root, nm)
-                for (subk, subv) in self.iteritems(k, subm):
-                    yield (subk, subv)
+        root = abspath(normpath(root))
+        node = self._find(root)
+        if node is None:
+            return
+        stack = [(root, node)]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            path, node = pop()
+            if node.value is not _NO_VALUE:
+                yield (path, node.value)
+            if node.children:
+                for (name, child) in node.children.iteritems():
+                    push((pathcombine(path, name), child))
 
     def items(self, root="/"):
         return list(self.iteritems(root))
@@ -621,15 +766,11 @@ class PathMap(object):
         This is basically the equivalent of listdir() for a PathMap - it yields
         the next level of name components beneath the given path.
         """
-        m = self._map
-        for name in iteratepath(root):
-            try:
-                m = m[name]
-            except KeyError:
-                return
-        for (nm, subm) in m.iteritems():
-            if nm and subm:
-                yield nm
+        node = self._find(root)
+        if node is None or not node.children:
+            return
+        for name in node.children.keys():
+            yield name
 
     def names(self, root="/"):
         return list(self.iternames(root))
@@ -650,6 +791,98 @@ def iswildcard(path):
     assert path is not None
     return not _wild_chars.isdisjoint(path)
 
+
+#  Maximum number of compiled wildcards kept by compile_wildcard
+WILDCARD_CACHE_SIZE = 256
+
+if _OrderedDict is not None:
+    _wildcard_cache = _OrderedDict()
+else:
+    _wildcard_cache = {}
+_wildcard_cache_lock = _threading.Lock()
+
+
+def _cached_wildcard(key, translate):
+    with _wildcard_cache_lock:
+        try:
+            compiled = _wildcard_cache.pop(key)
+        except KeyError:
+            pass
+        else:
+            _wildcard_cache[key] = compiled
+            return compiled
+    compiled = re.compile(translate())
+    with _wildcard_cache_lock:
+        _wildcard_cache[key] = compiled
+        if len(_wildcard_cache) > WILDCARD_CACHE_SIZE:
+            if _OrderedDict is not None:
+                _wildcard_cache.popitem(last=False)
+            else:
+                _wildcard_cache.clear()
+    return compiled
+
+
+def compile_wildcard(wildcard):
+    """Get a compiled regular expression for a wildcard (e.g. ``*.txt``).
+
+    Wildcards have the same syntax as the :mod:`fnmatch` module, and are always
+    case-sensitive.  The most recently used wildcards are cached, so there is
+    no need to keep the result around.
+
+    >>> compile_wildcard('*.txt').match('notes.txt') is not None
+    True
+
+    """
+    return _cached_wildcard(wildcard, lambda: _fnmatch.translate(wildcard))
+
+
+def compile_wildcards(wildcards):
+    """Get a single compiled regular expression that matches a name if any of
+    the given wildcards do.
+
+    >>> compile_wildcards(['*.pyc', '.svn']).match('.svn') is not None
+    True
+
+    """
+    wildcards = tuple(wildcards)
+    if len(wildcards) == 1:
+        return compile_wildcard(wildcards[0])
+    def translate():
+        if not wildcards:
+            return '(?!)'
+        return '|'.join('(?:%s)' % _fnmatch.translate(wildcard) for wildcard in wildcards)
+    return _cached_wildcard(wildcards, translate)
+
+
+def wildcard_matcher(wildcard, normcase=False):
+    """Get a callable that takes a name and returns a true value if it
+    matches a wildcard.
+
+    :param wildcard: a wildcard string, a list of wildcard strings (which match
+        if any of them match), a callable (which is returned unchanged), or None
+        (which matches everything)
+    :param normcase: if True, names and wildcards are passed through
+        :func:`os.path.normcase` before matching, as :func:`fnmatch.fnmatch`
+        does (so matching is case-insensitive on Windows)
+
+    """
+    if wildcard is None:
+        return lambda name: True
+    if callable(wildcard):
+        return wildcard
+    normcase = normcase and os.path.normcase('A') != 'A'
+    if isinstance(wildcard, (list, tuple, set, frozenset)):
+        if normcase:
+            wildcard = [os.path.normcase(w) for w in wildcard]
+        match = compile_wildcards(wildcard).match
+    else:
+        if normcase:
+            wildcard = os.path.normcase(wildcard)
+        match = compile_wildcard(wildcard).match
+    if normcase:
+        return lambda name: match(os.path.normcase(name))
+    return match
+
 if __name__ == "__main__":
     print recursepath('a/b/c')
 
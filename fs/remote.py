@@ -11,6 +11,8 @@ FS subclasses interfacing with a remote filesystem.  These include:
   * RemoteFileBuffer:  a file-like object that locally buffers the contents of
                        a remote file, writing them back on flush() or close().
 
+  * BufferBudget:  a limit on the memory shared by a group of RemoteFileBuffers.
+
   * ConnectionManagerFS:  a WrapFS subclass that tracks the connection state
                           of a remote FS, and allows client code to wait for
                           a connection to be re-established.
@@ -18,13 +20,26 @@ FS subclasses interfacing with a remote filesystem.  These include:
   * CacheFS:  a WrapFS subclass that caches file and directory meta-data in
               memory, to speed access to a remote FS.
 
+  * BlockCache:  a cache of blocks of file contents kept in a local FS, which
+                 CacheFS can use to avoid reading the same data repeatedly.
+
+  * SqliteCacheStore:  a database in which CacheFS can keep the meta-data it
+                       caches, so that it is not lost when the process exits.
+
 """
 
 from __future__ import with_statement
 
+import sys
 import time
+import hashlib
+import sqlite3
+import bisect
+import tempfile
+import itertools
 import stat as statinfo
 from errno import EINVAL
+from collections import OrderedDict
 
 import fs.utils
 from fs.base import threading, FS
@@ -33,15 +48,48 @@ from fs.wrapfs.lazyfs import LazyFS
 from fs.path import *
 from fs.errors import *
 from fs.local_functools import wraps
-from fs.filelike import StringIO, SpooledTemporaryFile, FileWrapper
+from fs.filelike import StringIO, SpooledTemporaryFile, FileWrapper, FileLikeBase
+from fs.threadpool import ThreadPool, Task
 from fs import SEEK_SET, SEEK_CUR, SEEK_END
 
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
 
 _SENTINAL = object()
 
 from six import PY3, b
 
 
+class BufferBudget(object):
+    """A limit on the memory used by a group of RemoteFileBuffers.
+
+    RemoteFileBuffer instances reserve memory from their budget as their
+    in-memory buffers grow, and move their buffers to temporary files on
+    disk when the budget has been used up.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, nbytes):
+        """Reserve nbytes of memory, returning False if not available."""
+        with self._lock:
+            if self.used + nbytes > self.max_bytes:
+                return False
+            self.used += nbytes
+            return True
+
+    def release(self, nbytes):
+        """Release nbytes of previously reserved memory."""
+        with self._lock:
+            self.used -= nbytes
+
+
 class RemoteFileBuffer(FileWrapper):
     """File-like object providing buffer for local file operations.
 
@@ -64,18 +112,48 @@ class RemoteFileBuffer(FileWrapper):
             self._put_remote_file(path,file)
 
     The contents of the remote file are read into the buffer on-demand.
+
+    Each buffer is kept in memory until it grows beyond max_size_in_memory,
+    or until the memory shared by all buffers would exceed buffer_budget,
+    after which it is moved to a temporary file in spool_dir.  If the size
+    of the remote file is known to be too big to keep in memory, the buffer
+    starts out on disk.
+
+    If the owning FS provides a read_range(path,offset,length) method and
+    the size of the remote file is given, files opened read-only are
+    buffered sparsely: only the ranges of the file that are actually read
+    are fetched from the remote, so seeking around a large file doesn't
+    require downloading all of it.  While reads remain sequential the
+    amount of data fetched ahead of the read position is doubled on each
+    fetch, from min_read_ahead up to max_read_ahead.  Once more than
+    release_threshold bytes have been read sequentially, the ranges that
+    have already been read are dropped from the buffer.  If an 'etag' for
+    the version of the file is also given, it is passed on to each call as
+    read_range(path,offset,length,etag=etag), and the FS should fail the
+    read if the file no longer matches it, so that ranges from different
+    versions of the file are never mixed together.
     """
 
-    max_size_in_memory = 1024 * 8
+    max_size_in_memory = 1024 * 1024
+    buffer_budget = BufferBudget(1024 * 1024 * 64)
+    spool_dir = None
+
+    release_threshold = 1024 * 1024 * 32
 
-    def __init__(self, fs, path, mode, rfile=None, write_on_flush=True):
+    min_read_ahead = 1024 * 64
+    max_read_ahead = 1024 * 1024 * 8
+
+    def __init__(self, fs, path, mode, rfile=None, write_on_flush=True, size=None,
+                 etag=None):
         """RemoteFileBuffer constructor.
 
         The owning filesystem, path and mode must be provided.  If the
         optional argument 'rfile' is provided, it must be a read()-able
-        object or a string containing the initial file contents.
+        object or a string containing the initial file contents.  If the
+        optional arguments 'size' and 'etag' are provided, they must be the
+        size and version of the remote file; see the class docstring for how
+        they are used.
         """
-        wrapped_file = SpooledTemporaryFile(max_size=self.max_size_in_memory)
         self.fs = fs
         self.path = path
         self.write_on_flush = write_on_flush
@@ -83,12 +161,26 @@ class RemoteFileBuffer(FileWrapper):
         self._readlen = 0  # How many bytes already loaded from rfile
         self._rfile = None  # Reference to remote file object
         self._eof = False  # Reached end of rfile?
+        self._ranges = None  # Sorted (start,end) ranges loaded in range mode
+        self._reserved = 0  # Memory reserved from buffer_budget
+        self._etag = etag  # Version of the file that ranges are read from
         if getattr(fs, "_lock", None) is not None:
             self._lock = fs._lock.__class__()
         else:
             self._lock = threading.RLock()
 
-        if "r" in mode or "+" in mode or "a" in mode:
+        if self._can_read_ranges(fs, mode, size):
+            # Sparse buffer, filled in by fs.read_range() as it is read
+            wrapped_file = tempfile.TemporaryFile(dir=self.spool_dir)
+            self._ranges = []
+            self._size = size
+            self._read_ahead = self.min_read_ahead
+            self._read_end = 0  # Where the last read finished
+            self._eof = True
+            if rfile is not None and hasattr(rfile,"close"):
+                rfile.close()
+        elif "r" in mode or "+" in mode or "a" in mode:
+            wrapped_file = self._make_spool(size)
             if rfile is None:
                 # File was just created, force to write anything
                 self._changed = True
@@ -100,6 +192,7 @@ class RemoteFileBuffer(FileWrapper):
 
             self._rfile = rfile
         else:
+            wrapped_file = self._make_spool()
             # Do not use remote file object
             self._eof = True
             self._rfile = None
@@ -121,6 +214,45 @@ class RemoteFileBuffer(FileWrapper):
                 except FSError:
                     pass
 
+    def _make_spool(self, size=None):
+        """Make the temporary file used to buffer the remote file."""
+        spool = SpooledTemporaryFile(max_size=self.max_size_in_memory,
+                                     dir=self.spool_dir)
+        rollover = getattr(spool.wrapped_file, "rollover", None)
+        if rollover is not None and size is not None:
+            if size > self.max_size_in_memory:
+                rollover()
+        return spool
+
+    def _account_memory(self):
+        """Match the memory reserved to the buffer's size, or move it to disk."""
+        spool = self.wrapped_file.wrapped_file
+        if getattr(spool, "_rolled", True):
+            self._release_memory()
+            return
+        #  The buffer may have been truncated or written in the middle,
+        #  so measure its actual size rather than the file position.
+        memfile = spool._file
+        pos = memfile.tell()
+        memfile.seek(0, SEEK_END)
+        size = memfile.tell()
+        memfile.seek(pos)
+        needed = size - self._reserved
+        if needed > 0:
+            if self.buffer_budget.reserve(needed):
+                self._reserved += needed
+            else:
+                spool.rollover()
+                self._release_memory()
+        elif needed < 0:
+            self.buffer_budget.release(-needed)
+            self._reserved = size
+
+    def _release_memory(self):
+        if self._reserved:
+            self.buffer_budget.release(self._reserved)
+            self._reserved = 0
+
     def _write(self,data,flushing=False):
         with self._lock:
             #  Do we need to discard info from the buffer?
@@ -132,6 +264,7 @@ class RemoteFileBuffer(FileWrapper):
                     self._readlen += toread
             self._changed = True
             self.wrapped_file.write(data)
+            self._account_memory()
 
     def _read_remote(self, length=None):
         """Read data from the remote file into the local buffer."""
@@ -162,6 +295,7 @@ class RemoteFileBuffer(FileWrapper):
         if self._eof and self._rfile is not None:
             self._rfile.close()
         self._readlen += bytes_read
+        self._account_memory()
 
     def _fillbuffer(self, length=None):
         """Fill the local buffer, leaving file position unchanged.
@@ -189,10 +323,114 @@ class RemoteFileBuffer(FileWrapper):
                 self._read_remote(toload)
                 self.wrapped_file.seek(curpos)
 
+    @staticmethod
+    def _can_read_ranges(fs, mode, size):
+        """Check whether a file can be buffered using fs.read_range()."""
+        if size is None or getattr(fs, "read_range", None) is None:
+            return False
+        return "r" in mode and not ("w" in mode or "a" in mode or "+" in mode)
+
+    def _fetch_ranges(self, start, end):
+        """Make sure bytes start to end are loaded into the sparse buffer."""
+        gaps = []
+        pos = start
+        i = max(bisect.bisect_right(self._ranges, (start + 1,)) - 1, 0)
+        for (rstart, rend) in self._ranges[i:]:
+            if rstart >= end:
+                break
+            if rend <= pos:
+                continue
+            if rstart > pos:
+                gaps.append((pos, rstart))
+            pos = rend
+        if pos < end:
+            gaps.append((pos, end))
+        for (gstart, gend) in gaps:
+            if self._etag is None:
+                data = self.fs.read_range(self.path, gstart, gend - gstart)
+            else:
+                data = self.fs.read_range(self.path, gstart, gend - gstart,
+                                          etag=self._etag)
+            if data:
+                self.wrapped_file.seek(gstart)
+                self.wrapped_file.write(data)
+                self._add_range(gstart, gstart + len(data))
+            if len(data) < gend - gstart:
+                #  The remote file is shorter than we were told
+                self._size = gstart + len(data)
+                break
+
+    def _has_range(self, start, end):
+        """Check whether bytes start to end are in the sparse buffer."""
+        i = bisect.bisect_right(self._ranges, (start + 1,)) - 1
+        return i >= 0 and self._ranges[i][1] >= end
+
+    def _add_range(self, start, end):
+        """Record that bytes start to end are in the sparse buffer."""
+        i = bisect.bisect_left(self._ranges, (start, end))
+        if i > 0 and self._ranges[i - 1][1] >= start:
+            i -= 1
+            start = self._ranges[i][0]
+        j = i
+        while j < len(self._ranges) and self._ranges[j][0] <= end:
+            end = max(end, self._ranges[j][1])
+            j += 1
+        self._ranges[i:j] = [(start, end)]
+
+    def _release_ranges(self, pos):
+        """Drop the loaded ranges that end before pos from the buffer.
+
+        The ranges that are kept are copied into a new temporary file, so
+        that the disk space used by the dropped ranges is freed.
+        """
+        old_file = self.wrapped_file
+        new_file = tempfile.TemporaryFile(dir=self.spool_dir)
+        i = max(bisect.bisect_right(self._ranges, (pos + 1,)) - 1, 0)
+        ranges = [(max(start, pos), end) for (start, end) in self._ranges[i:]
+                  if end > pos]
+        for (start, end) in ranges:
+            old_file.seek(start)
+            new_file.seek(start)
+            while start < end:
+                data = old_file.read(min(end - start, 1024 * 256))
+                new_file.write(data)
+                start += len(data)
+        self.wrapped_file = new_file
+        self._ranges = ranges
+        old_file.close()
+        new_file.seek(pos)
+
+    def _read_ranges(self, length=None):
+        pos = self.wrapped_file.tell()
+        if pos >= self._size:
+            return None
+        if length is None:
+            end = self._size
+        else:
+            end = min(pos + length, self._size)
+        if pos == self._read_end and self._ranges:
+            if pos - self._ranges[0][0] > self.release_threshold:
+                self._release_ranges(pos)
+        if not self._has_range(pos, end):
+            if pos == self._read_end:
+                read_ahead = self._read_ahead
+                self._read_ahead = min(read_ahead * 2, self.max_read_ahead)
+            else:
+                read_ahead = self._read_ahead = self.min_read_ahead
+            self._fetch_ranges(pos, min(max(end, pos + read_ahead), self._size))
+        self.wrapped_file.seek(pos)
+        data = self.wrapped_file.read(min(end, self._size) - pos)
+        self._read_end = pos + len(data)
+        if not data:
+            data = None
+        return data
+
     def _read(self, length=None):
         if length is not None and length < 0:
             length = None
         with self._lock:
+            if self._ranges is not None:
+                return self._read_ranges(length)
             self._fillbuffer(length)
             data = self.wrapped_file.read(length if length != None else -1)
             if not data:
@@ -201,7 +439,12 @@ class RemoteFileBuffer(FileWrapper):
 
     def _seek(self,offset,whence=SEEK_SET):
         with self._lock:
-            if not self._eof:
+            if self._ranges is not None:
+                # Data is only fetched when it is read
+                if whence == SEEK_END:
+                    offset = self._size + offset
+                    whence = SEEK_SET
+            elif not self._eof:
                 # Count absolute position of seeking
                 if whence == SEEK_SET:
                     abspos = offset
@@ -238,6 +481,7 @@ class RemoteFileBuffer(FileWrapper):
 
             self.wrapped_file.truncate(size)
             self._changed = True
+            self._account_memory()
 
             self.flush()
             if self._rfile is not None:
@@ -271,6 +515,7 @@ class RemoteFileBuffer(FileWrapper):
                 if self._rfile is not None:
                     self._rfile.close()
                 super(RemoteFileBuffer,self).close()
+                self._release_memory()
 
 
 class ConnectionManagerFS(LazyFS):
@@ -405,12 +650,13 @@ wrap_fs_methods(_ConnectionManagerFS_method_wrapper,ConnectionManagerFS)
 
 class CachedInfo(object):
     """Info objects stored in cache for CacheFS."""
-    __slots__ = ("timestamp","info","has_full_info","has_full_children")
+    __slots__ = ("timestamp","info","has_full_info","has_full_children","referenced")
     def __init__(self,info={},has_full_info=True,has_full_children=False):
         self.timestamp = time.time()
         self.info = info
         self.has_full_info = has_full_info
         self.has_full_children = has_full_children
+        self.referenced = False
     def clone(self):
         new_ci = self.__class__()
         new_ci.update_from(self)
@@ -430,12 +676,320 @@ class CachedInfo(object):
         return cls(info,has_full_info=False)
 
 
+class BlockCache(object):
+    """Cache of file contents, in fixed-size blocks stored in a local FS.
+
+    Blocks are identified by the path of the file, a validator for its
+    contents (such as its etag, or its size and modification time) and the
+    block number, so blocks of an older version of a file are never returned
+    once its validator changes; they just age out of the cache.  When the
+    blocks take up more than 'max_bytes', the least recently used ones are
+    removed.
+
+    The index of blocks is kept in memory, so any files already in the local
+    FS are ignored.  A BlockCache should only be used by a single CacheFS.
+    """
+
+    def __init__(self,fs=None,block_size=1024*1024,max_bytes=256*1024*1024):
+        """BlockCache constructor.
+
+        :param fs: the FS to store blocks in; defaults to a new TempFS, which
+            is closed along with the cache
+        :param block_size: the number of bytes in each block
+        :param max_bytes: the maximum total size of the cached blocks, or
+            None for no limit
+        """
+        self.owns_fs = fs is None
+        if fs is None:
+            from fs.tempfs import TempFS
+            fs = TempFS()
+        self.fs = fs
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self._blocks = OrderedDict()
+        self._paths = PathMap()
+        self._bytes = 0
+        self._names = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._blocks)
+
+    @property
+    def size(self):
+        """The total size of the cached blocks, in bytes."""
+        return self._bytes
+
+    def close(self):
+        if self.owns_fs:
+            self.fs.close()
+
+    def get(self,path,validator,index):
+        """Get the data for a block, or None if it isn't in the cache."""
+        key = (abspath(normpath(path)),validator,index)
+        with self._lock:
+            try:
+                entry = self._blocks.pop(key)
+            except KeyError:
+                return None
+            self._blocks[key] = entry
+        try:
+            return self.fs.getcontents(entry[0],"rb")
+        except ResourceNotFoundError:
+            #  Evicted while we were reading it
+            return None
+
+    def put(self,path,validator,index,data):
+        """Store the data for a block."""
+        path = abspath(normpath(path))
+        key = (path,validator,index)
+        #  Each block gets a new file, so that a file is never rewritten
+        #  while another thread might be reading it.
+        digest = hashlib.md5(path.encode("utf8")).hexdigest()
+        name = "%s.%d.%d" % (digest,index,self._names.next())
+        self.fs.setcontents(name,data)
+        to_remove = []
+        with self._lock:
+            if key in self._blocks:
+                to_remove.append(name)
+            else:
+                self._blocks[key] = (name,len(data))
+                self._bytes += len(data)
+                self._paths.setdefault(path,set()).add(key)
+                while self.max_bytes is not None and self._bytes > self.max_bytes and len(self._blocks) > 1:
+                    (old_key,_entry) = self._blocks.popitem(last=False)
+                    to_remove.append(self.__forget(old_key,_entry))
+        for name in to_remove:
+            try:
+                self.fs.remove(name)
+            except ResourceNotFoundError:
+                pass
+
+    def invalidate(self,path="/"):
+        """Remove the blocks for path, and for any files beneath it."""
+        to_remove = []
+        with self._lock:
+            for keys in self._paths.values(path):
+                for key in list(keys):
+                    to_remove.append(self.__forget(key,self._blocks.pop(key)))
+        for name in to_remove:
+            try:
+                self.fs.remove(name)
+            except ResourceNotFoundError:
+                pass
+
+    def __forget(self,key,entry):
+        self._bytes -= entry[1]
+        keys = self._paths[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._paths[key[0]]
+        return entry[0]
+
+
+class SqliteCacheStore(object):
+    """Persistent store for the meta-data cached by CacheFSMixin.
+
+    Info for each path is stored in an SQLite database together with the
+    time it was fetched, so it is subject to the usual cache timeouts when
+    it is loaded again.  Entries for several filesystems can share a
+    database; each filesystem stores its entries under its own namespace.
+
+    Changes are written to the database in batches, so call close() (or
+    close the CacheFS using the store) to be sure they have been saved.
+    """
+
+    #  Number of pending changes that causes them to be written out
+    flush_size = 100
+    #  Number of seconds after which pending changes are written out
+    flush_interval = 1.0
+
+    def __init__(self,filename):
+        """SqliteCacheStore constructor.
+
+        :param filename: the database file, which is created if it doesn't
+            exist
+        """
+        self.filename = filename
+        self._db = sqlite3.connect(filename,check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS cached_info ("
+                         " namespace TEXT, path TEXT, timestamp REAL, info BLOB,"
+                         " PRIMARY KEY (namespace, path))")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._puts = {}
+        self._deletes = []
+        self._last_flush = time.time()
+
+    def get(self,namespace,path):
+        """Get (timestamp, info) for a path, or None if it isn't stored."""
+        key = (namespace,path)
+        with self._lock:
+            try:
+                return self._puts[key]
+            except KeyError:
+                pass
+            for (dns,dpath,recursive) in self._deletes:
+                if dns == namespace and (dpath == path or (recursive and isprefix(dpath,path))):
+                    return None
+            row = self._db.execute("SELECT timestamp, info FROM cached_info"
+                                   " WHERE namespace = ? AND path = ?",key).fetchone()
+        if row is None:
+            return None
+        return (row[0],pickle.loads(bytes(row[1])))
+
+    def put(self,namespace,path,timestamp,info):
+        """Store the info for a path, fetched at the given time."""
+        with self._lock:
+            self._puts[(namespace,path)] = (timestamp,info)
+            self._maybe_flush()
+
+    def delete(self,namespace,path,recursive=True):
+        """Delete the info for a path, and (if recursive is True) for all
+        paths beneath it."""
+        with self._lock:
+            if recursive:
+                for key in self._puts.keys():
+                    if key[0] == namespace and isprefix(path,key[1]):
+                        del self._puts[key]
+            else:
+                self._puts.pop((namespace,path),None)
+            self._deletes.append((namespace,path,recursive))
+            self._maybe_flush()
+
+    def flush(self):
+        """Write any pending changes to the database."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._flush()
+                self._db.close()
+                self._db = None
+
+    def _maybe_flush(self):
+        if len(self._puts) + len(self._deletes) >= self.flush_size or \
+           time.time() - self._last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self):
+        db = self._db
+        for (namespace,path,recursive) in self._deletes:
+            if recursive:
+                #  Everything beneath path sorts between path+"/" and path+"0"
+                prefix = path.rstrip("/")
+                db.execute("DELETE FROM cached_info WHERE namespace = ? AND"
+                           " (path = ? OR (path >= ? AND path < ?))",
+                           (namespace,path,prefix + "/",prefix + "0"))
+            else:
+                db.execute("DELETE FROM cached_info WHERE namespace = ? AND path = ?",
+                           (namespace,path))
+        rows = [(namespace,path,timestamp,sqlite3.Binary(pickle.dumps(info,2)))
+                for ((namespace,path),(timestamp,info)) in self._puts.iteritems()]
+        db.executemany("INSERT OR REPLACE INTO cached_info"
+                       " (namespace, path, timestamp, info) VALUES (?, ?, ?, ?)",rows)
+        db.commit()
+        self._puts.clear()
+        del self._deletes[:]
+        self._last_flush = time.time()
+
+
+def _content_validator(info):
+    """Get a value that changes whenever the contents of a file do.
+
+    Returns None if the info has neither an etag nor a modification time,
+    in which case there's no way to tell that cached contents are stale.
+    """
+    etag = info.get("etag")
+    if etag is not None:
+        return etag
+    modified_time = info.get("modified_time")
+    if modified_time is None:
+        return None
+    return (info.get("size"),modified_time)
+
+
+class _BlockCacheFile(FileLikeBase):
+    """Read-only file that fetches its contents block by block through a
+    BlockCache, only opening the remote file when a block isn't cached."""
+
+    def __init__(self,cache,path,size,validator,opener,mode="rb"):
+        super(_BlockCacheFile,self).__init__()
+        self.cache = cache
+        self.path = path
+        self.size = size
+        self.validator = validator
+        self.mode = mode
+        self._opener = opener
+        self._remote_file = None
+        self._pos = 0
+
+    def close(self):
+        if not self.closed:
+            super(_BlockCacheFile,self).close()
+            if self._remote_file is not None:
+                self._remote_file.close()
+                self._remote_file = None
+
+    def _fetch(self,index):
+        block_size = self.cache.block_size
+        f = self._remote_file
+        if f is None:
+            f = self._remote_file = self._opener()
+        f.seek(index * block_size)
+        chunks = []
+        remaining = block_size
+        while remaining > 0:
+            data = f.read(remaining)
+            if not data:
+                break
+            chunks.append(data)
+            remaining -= len(data)
+        data = b("").join(chunks)
+        self.cache.put(self.path,self.validator,index,data)
+        return data
+
+    def _read(self,sizehint=-1):
+        if self._pos >= self.size:
+            return None
+        (index,offset) = divmod(self._pos,self.cache.block_size)
+        data = self.cache.get(self.path,self.validator,index)
+        if data is None:
+            data = self._fetch(index)
+        if sizehint is not None and sizehint > 0:
+            data = data[offset:offset+sizehint]
+        elif offset:
+            data = data[offset:]
+        if not data:
+            #  The remote file is shorter than it was when it was opened
+            self._pos = self.size
+            return None
+        self._pos += len(data)
+        return data
+
+    def _seek(self,offset,whence):
+        if whence == 0:
+            pos = offset
+        elif whence == 1:
+            pos = self._pos + offset
+        else:
+            pos = self.size + offset
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self._pos = pos
+
+    def _tell(self):
+        return self._pos
+
+
 class CacheFSMixin(FS):
     """Simple FS mixin to cache meta-data of a remote filesystems.
 
     This FS mixin implements a simplistic cache that can help speed up
-    access to a remote filesystem.  File and directory meta-data is cached
-    but the actual file contents are not.
+    access to a remote filesystem.  File and directory meta-data is cached,
+    and file contents can be cached too by giving a BlockCache.
 
     If you want to add caching to an existing FS object, use the CacheFS
     class instead; it's an easy-to-use wrapper rather than a mixin.
@@ -456,20 +1010,66 @@ class CacheFSMixin(FS):
         timeout in seconds.  The default timeout is 1 second.  To prevent
         cache entries from ever timing out, set it to None.
 
+        The optional keyword argument 'cache_soft_timeout' specifies a shorter
+        timeout, after which cached meta-data is still used but is refreshed
+        in the background, so that popular paths don't periodically block on
+        the remote filesystem.  The default is None, to not refresh entries.
+        The optional keyword argument 'refresh_workers' gives the number of
+        threads used to refresh entries, and defaults to 2.
+
         The optional keyword argument 'max_cache_size' specifies the maximum
         number of entries to keep in the cache.  To allow the cache to grow
         without bound, set it to None.  The default is 1000.
+
+        The optional keyword argument 'max_cache_bytes' limits the approximate
+        amount of memory used by the cache entries.  The default is None,
+        for no limit.
+
+        When the cache is full, entries are evicted in least-recently-used
+        order (approximated with the CLOCK algorithm, so that a cache hit
+        doesn't need to take a lock).
+
+        If several threads miss the cache for the same path at once, only
+        one of them calls getinfo() or listdirinfo() on the remote FS, and
+        the others wait for its result (or exception).
+
+        The optional keyword argument 'content_cache' gives a BlockCache in
+        which to cache the contents of files opened for reading.  Cached
+        contents are used for as long as the file's cached meta-data says
+        it hasn't changed.  The default is None, to not cache contents.
+
+        The optional keyword argument 'persistent_cache' gives a store such
+        as SqliteCacheStore in which cached info is also saved, and from
+        which it is loaded when it isn't in memory.  Entries are stored
+        under the key given by 'persistent_cache_key', which defaults to
+        unicode(self), so it should identify the remote filesystem.
         """
         self.cache_timeout = kwds.pop("cache_timeout",1)
+        self.cache_soft_timeout = kwds.pop("cache_soft_timeout",None)
+        self.refresh_workers = kwds.pop("refresh_workers",2)
         self.max_cache_size = kwds.pop("max_cache_size",1000)
+        self.max_cache_bytes = kwds.pop("max_cache_bytes",None)
+        self.content_cache = kwds.pop("content_cache",None)
+        self.persistent_cache = kwds.pop("persistent_cache",None)
+        self.persistent_cache_key = kwds.pop("persistent_cache_key",None)
+        self.__init_cache()
+        super(CacheFSMixin,self).__init__(*args,**kwds)
+
+    def __init_cache(self):
         self.__cache = PathMap()
-        self.__cache_size = 0
+        #  Maps each cached path to its size, in the order of the CLOCK
+        self.__cache_clock = OrderedDict()
+        self.__cache_bytes = 0
         self.__cache_lock = threading.RLock()
-        super(CacheFSMixin,self).__init__(*args,**kwds)
+        self.__refresh_pool = None
+        self.__refreshing = set()
+        #  Maps (method name, path, args) to the Task fetching its result
+        self.__in_flight = {}
 
     def clear_cache(self,path=""):
         with self.__cache_lock:
-            self.__cache.clear(path)
+            self.__clear_cached_info(path)
+        self.__invalidate_contents(path)
         try:
             scc = super(CacheFSMixin,self).clear_cache
         except AttributeError:
@@ -477,68 +1077,243 @@ class CacheFSMixin(FS):
         else:
             scc()
 
+    def close(self):
+        super(CacheFSMixin,self).close()
+        with self.__cache_lock:
+            if self.__refresh_pool is not None:
+                self.__refresh_pool.close()
+        if self.content_cache is not None:
+            self.content_cache.close()
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+
     def __getstate__(self):
         state = super(CacheFSMixin,self).__getstate__()
+        #  The content cache and store are local to this process, so they
+        #  aren't pickled
+        state["content_cache"] = None
+        state["persistent_cache"] = None
         state.pop("_CacheFSMixin__cache",None)
-        state.pop("_CacheFSMixin__cache_size",None)
+        state.pop("_CacheFSMixin__cache_clock",None)
+        state.pop("_CacheFSMixin__cache_bytes",None)
         state.pop("_CacheFSMixin__cache_lock",None)
+        state.pop("_CacheFSMixin__refresh_pool",None)
+        state.pop("_CacheFSMixin__refreshing",None)
+        state.pop("_CacheFSMixin__in_flight",None)
         return state
 
     def __setstate__(self,state):
         super(CacheFSMixin,self).__setstate__(state)
-        self.__cache = PathMap()
-        self.__cache_size = 0
-        self.__cache_lock = threading.RLock()
+        self.__init_cache()
 
     def __get_cached_info(self,path,default=_SENTINAL):
         try:
-            info = self.__cache[path]
+            try:
+                info = self.__cache[path]
+            except KeyError:
+                info = self.__load_cached_info(path)
             if self.cache_timeout is not None:
                 now = time.time()
                 if info.timestamp < (now - self.cache_timeout):
                     with self.__cache_lock:
                         self.__expire_from_cache(path)
                         raise KeyError
+            if self.cache_soft_timeout is not None and info.has_full_info:
+                if info.timestamp < (time.time() - self.cache_soft_timeout):
+                    self.__refresh_in_background(path,info)
+            info.referenced = True
             return info
         except KeyError:
             if default is not _SENTINAL:
                 return default
             raise
 
-    def __set_cached_info(self,path,new_ci,old_ci=None):
+    def __store_key(self):
+        if self.persistent_cache_key is None:
+            self.persistent_cache_key = unicode(self)
+        return self.persistent_cache_key
+
+    def __load_cached_info(self,path):
+        """Load info for path from the persistent store into the cache."""
+        if self.persistent_cache is None:
+            raise KeyError(path)
+        path = abspath(normpath(path))
+        stored = self.persistent_cache.get(self.__store_key(),path)
+        if stored is None:
+            raise KeyError(path)
+        (timestamp,info) = stored
+        if self.cache_timeout is not None and timestamp < (time.time() - self.cache_timeout):
+            self.persistent_cache.delete(self.__store_key(),path,recursive=False)
+            raise KeyError(path)
+        ci = CachedInfo(info)
+        ci.timestamp = timestamp
+        self.__set_cached_info(path,ci,persist=False)
+        return self.__cache.get(path,ci)
+
+    def __single_flight(self,key,func,*args,**kwds):
+        """Call func, unless another thread is already doing so for the
+        same key, in which case wait for and share its result."""
+        with self.__cache_lock:
+            task = self.__in_flight.get(key)
+            owner = task is None
+            if owner:
+                task = self.__in_flight[key] = Task(func,args,kwds)
+        if owner:
+            try:
+                task.run()
+            finally:
+                with self.__cache_lock:
+                    del self.__in_flight[key]
+        return task.result()
+
+    def __refresh_in_background(self,path,ci):
+        """Fetch fresh info for a cached path in a worker thread."""
+        path = abspath(normpath(path))
+        with self.__cache_lock:
+            if path in self.__refreshing:
+                return
+            if self.__refresh_pool is None:
+                self.__refresh_pool = ThreadPool(self.refresh_workers)
+            self.__refreshing.add(path)
+            try:
+                self.__refresh_pool.submit(self.__refresh_cached_info,path,ci)
+            except ValueError:
+                #  The pool has been closed
+                self.__refreshing.discard(path)
+
+    def __refresh_cached_info(self,path,ci):
+        try:
+            try:
+                info = super(CacheFSMixin,self).getinfo(path)
+            except ResourceNotFoundError:
+                with self.__cache_lock:
+                    if self.__cache.get(path) is ci:
+                        self.__expire_from_cache(path)
+            except FSError:
+                #  Keep using the cached info until it times out
+                pass
+            else:
+                #  Only update the entry if nothing else has replaced it
+                #  while we were fetching the new info.
+                new_ci = CachedInfo(info)
+                with self.__cache_lock:
+                    if self.__cache.get(path) is not ci:
+                        return
+                    ci.update_from(new_ci)
+                    self.__resize_cached_info(path,ci)
+                self.__persist_cached_info(path,new_ci)
+        finally:
+            with self.__cache_lock:
+                self.__refreshing.discard(path)
+
+    def __set_cached_info(self,path,new_ci,old_ci=None,persist=True):
         was_room = True
+        path = abspath(normpath(path))
         with self.__cache_lock:
-            #  Free up some room in the cache
-            if self.max_cache_size is not None and old_ci is None:
-                while self.__cache_size >= self.max_cache_size:
-                    try:
-                        to_del = iter(self.__cache).next()
-                    except StopIteration:
-                        break
-                    else:
-                        was_room = False
-                        self.__expire_from_cache(to_del)
             #  Atomically add to the cache.
             #  If there's a race, newest information wins
             ci = self.__cache.setdefault(path,new_ci)
             if ci is new_ci:
-                self.__cache_size += 1
+                size = _cached_info_size(path,new_ci)
+                self.__cache_clock[path] = size
+                self.__cache_bytes += size
+                was_room = self.__make_room(path)
             else:
                 if old_ci is None or ci is old_ci:
                     if ci.timestamp < new_ci.timestamp:
                         ci.update_from(new_ci)
+                        was_room = self.__resize_cached_info(path,ci)
+                    else:
+                        persist = False
+                else:
+                    persist = False
+        if persist:
+            self.__persist_cached_info(path,new_ci)
         return was_room
 
+    def __resize_cached_info(self,path,ci):
+        """Account for a change in the size of an entry already in the cache."""
+        size = _cached_info_size(path,ci)
+        self.__cache_bytes += size - self.__cache_clock.get(path,0)
+        self.__cache_clock[path] = size
+        return self.__make_room(path)
+
+    def __persist_cached_info(self,path,ci):
+        if self.persistent_cache is not None and ci.has_full_info:
+            self.persistent_cache.put(self.__store_key(),path,ci.timestamp,ci.info)
+
+    def __unpersist_cached_info(self,path,recursive=True):
+        if self.persistent_cache is not None:
+            self.persistent_cache.delete(self.__store_key(),abspath(normpath(path)),recursive)
+
+    def __replace_cached_info(self,path,ci):
+        """Store new info for a path, replacing anything cached under it."""
+        with self.__cache_lock:
+            self.__clear_cached_info(path)
+            self.__set_cached_info(path,ci)
+
+    def __make_room(self,keep):
+        """Evict entries until the cache is within its limits.
+
+        Entries are taken from the front of the clock; one that has been
+        used since it was last considered gets moved to the back instead.
+        The entry for the path `keep` is never evicted.
+        """
+        was_room = True
+        clock = self.__cache_clock
+        max_size = self.max_cache_size
+        max_bytes = self.max_cache_bytes
+        while (max_size is not None and len(clock) > max_size) or \
+              (max_bytes is not None and self.__cache_bytes > max_bytes):
+            if len(clock) == 1:
+                break
+            (path,size) = clock.popitem(last=False)
+            ci = self.__cache.get(path)
+            if path == keep or (ci is not None and ci.referenced):
+                if ci is not None:
+                    ci.referenced = False
+                clock[path] = size
+            else:
+                was_room = False
+                self.__cache_bytes -= size
+                self.__cache.pop(path)
+                self.__parent_incomplete(path)
+        return was_room
+
+    def __parent_incomplete(self,path):
+        """Note that the parent of path no longer has all its children cached."""
+        if path not in ("","/"):
+            pci = self.__cache.get(dirname(path))
+            if pci is not None:
+                pci.has_full_children = False
+
     def __expire_from_cache(self,path):
-        del self.__cache[path]
-        self.__cache_size -= 1
-        for ancestor in recursepath(path):
-            try:
-                self.__cache[ancestor].has_full_children = False
-            except KeyError:
-                pass
+        path = abspath(normpath(path))
+        if self.__cache.pop(path) is not None:
+            self.__cache_bytes -= self.__cache_clock.pop(path,0)
+            self.__parent_incomplete(path)
+        self.__unpersist_cached_info(path,recursive=False)
+
+    def __copy_cached_info(self,src,dst):
+        """Copy the cached info for src and everything beneath it to dst."""
+        src = abspath(normpath(src))
+        #  If src isn't cached, dst won't be either
+        self.__parent_incomplete(abspath(normpath(dst)))
+        for (subpath,ci) in self.__cache.items(src):
+            dpath = pathjoin(dst,relpath(subpath[len(src):]))
+            self.__expire_from_cache(dpath)
+            self.__set_cached_info(dpath,ci.clone())
+
+    def __clear_cached_info(self,path):
+        """Remove path and everything beneath it from the cache."""
+        clock = self.__cache_clock
+        for cpath in self.__cache.iterkeys(path):
+            self.__cache_bytes -= clock.pop(cpath,0)
+        self.__cache.clear(path)
+        self.__unpersist_cached_info(path)
 
     def open(self, path, mode='r', buffering=-1, encoding=None, errors=None, newline=None, line_buffering=False, **kwargs):
+        writing = "w" in mode or "a" in mode or "+" in mode
         #  Try to validate the entry using the cached info
         try:
             ci = self.__get_cached_info(path)
@@ -553,18 +1328,41 @@ class CacheFSMixin(FS):
             else:
                 if not fs.utils.isdir(super(CacheFSMixin, self), ppath, pci.info):
                     raise ResourceInvalidError(path)
-                if pci.has_full_children:
+                if pci.has_full_children and "w" not in mode and "a" not in mode:
                     raise ResourceNotFoundError(path)
         else:
             if not fs.utils.isfile(super(CacheFSMixin, self), path, ci.info):
                 raise ResourceInvalidError(path)
+        if self.content_cache is not None:
+            if writing:
+                self.__invalidate_contents(path)
+            elif "t" not in mode and encoding is None and not kwargs:
+                f = self.__open_cached_contents(path, mode)
+                if f is not None:
+                    return f
         f = super(CacheFSMixin, self).open(path, mode=mode, buffering=buffering, encoding=encoding, errors=errors, newline=newline, line_buffering=line_buffering, **kwargs)
-        if "w" in mode or "a" in mode or "+" in mode:
+        if writing:
             with self.__cache_lock:
-                self.__cache.clear(path)
+                self.__clear_cached_info(path)
+                #  The file may be new, and isn't in the cache
+                self.__parent_incomplete(abspath(normpath(path)))
             f = self._CacheInvalidatingFile(self, path, f, mode)
         return f
 
+    def __invalidate_contents(self, path):
+        if self.content_cache is not None:
+            self.content_cache.invalidate(path)
+
+    def __open_cached_contents(self, path, mode):
+        info = self.getinfo(path)
+        if "size" not in info or not fs.utils.isfile(super(CacheFSMixin, self), path, info):
+            return None
+        validator = _content_validator(info)
+        if validator is None:
+            return None
+        opener = lambda: super(CacheFSMixin, self).open(path, "rb")
+        return _BlockCacheFile(self.content_cache, path, info["size"], validator, opener, mode)
+
     class _CacheInvalidatingFile(FileWrapper):
         def __init__(self, owner, path, wrapped_file, mode=None):
             self.path = path
@@ -573,12 +1371,12 @@ class CacheFSMixin(FS):
             self.owner = owner
         def _write(self, string, flushing=False):
             with self.owner._CacheFSMixin__cache_lock:
-                self.owner._CacheFSMixin__cache.clear(self.path)
+                self.owner._CacheFSMixin__clear_cached_info(self.path)
             sup = super(CacheFSMixin._CacheInvalidatingFile, self)
             return sup._write(string, flushing=flushing)
         def _truncate(self, size):
             with self.owner._CacheFSMixin__cache_lock:
-                self.owner._CacheFSMixin__cache.clear(self.path)
+                self.owner._CacheFSMixin__clear_cached_info(self.path)
             sup = super(CacheFSMixin._CacheInvalidatingFile, self)
             return sup._truncate(size)
 
@@ -627,10 +1425,42 @@ class CacheFSMixin(FS):
                 raise KeyError
             info = ci.info
         except KeyError:
-            info = super(CacheFSMixin, self).getinfo(path)
-            self.__set_cached_info(path, CachedInfo(info))
+            path = abspath(normpath(path))
+            if path != "/":
+                #  If the parent has been fully listed, the path doesn't exist
+                pci = self.__get_cached_info(dirname(path), None)
+                if pci is not None and pci.has_full_children and path not in self.__cache:
+                    raise ResourceNotFoundError(path)
+            key = ("getinfo", path)
+            info = self.__single_flight(key, self.__fetch_info, path)
         return info
 
+    def __fetch_info(self, path):
+        info = super(CacheFSMixin, self).getinfo(path)
+        self.__set_cached_info(path, CachedInfo(info))
+        return info
+
+    def getinfo_many(self, paths, ignore_errors=False):
+        #  Answer what we can from the cache, and fetch the rest in one batch
+        paths = list(paths)
+        infos = [None] * len(paths)
+        missing = []
+        for (i, path) in enumerate(paths):
+            try:
+                ci = self.__get_cached_info(path)
+                if not ci.has_full_info:
+                    raise KeyError
+                infos[i] = (path, ci.info)
+            except KeyError:
+                missing.append(i)
+        if missing:
+            fetched = super(CacheFSMixin, self).getinfo_many([paths[i] for i in missing], ignore_errors=ignore_errors)
+            for (i, (path, info)) in zip(missing, fetched):
+                if info:
+                    self.__set_cached_info(path, CachedInfo(info))
+                infos[i] = (paths[i], info)
+        return infos
+
     def listdir(self,path="",*args,**kwds):
         return list(nm for (nm, _info) in self.listdirinfo(path,*args,**kwds))
 
@@ -639,6 +1469,15 @@ class CacheFSMixin(FS):
             yield nm
 
     def listdirinfo(self,path="",*args,**kwds):
+        key = ("listdirinfo",abspath(normpath(path)),args,tuple(sorted(kwds.items())))
+        try:
+            hash(key)
+        except TypeError:
+            #  e.g. a list of wildcards; don't bother sharing the result
+            return self.__fetch_listdirinfo(path,*args,**kwds)
+        return list(self.__single_flight(key,self.__fetch_listdirinfo,path,*args,**kwds))
+
+    def __fetch_listdirinfo(self,path,*args,**kwds):
         items = super(CacheFSMixin,self).listdirinfo(path,*args,**kwds)
         with self.__cache_lock:
             names = set()
@@ -652,7 +1491,7 @@ class CacheFSMixin(FS):
                 if nm not in names:
                     to_del.append(nm)
             for nm in to_del:
-                self.__cache.clear(pathjoin(path,nm))
+                self.__clear_cached_info(pathjoin(path,nm))
             #try:
             #    pci = self.__cache[path]
             #except KeyError:
@@ -661,6 +1500,76 @@ class CacheFSMixin(FS):
             #pci.has_full_children = True
         return items
 
+    def prefetch(self,path="/",depth=None,include_files=True,workers=4):
+        """Fill the cache with info for everything beneath a directory.
+
+        The directory tree is listed breadth-first, with up to `workers`
+        directories being listed at the same time.  If `include_files` is
+        True, each directory is marked as having all its children in the
+        cache, so that paths which don't exist can be detected without
+        asking the remote filesystem (for as long as the entries last).
+
+        :param path: the directory to start from
+        :param depth: the number of levels of directories to list, or None
+            to list the whole tree
+        :param include_files: if False, only cache the info for directories
+        :param workers: the number of directories to list concurrently
+
+        :returns: the number of directories listed
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        level = [abspath(normpath(path))]
+        listed = 0
+        with ThreadPool(workers) as pool:
+            while level and (depth is None or depth > 0):
+                next_level = []
+                for subdirs in pool.imap(lambda p: self.__prefetch_dir(p,include_files),level):
+                    next_level.extend(subdirs)
+                listed += len(level)
+                level = next_level
+                if depth is not None:
+                    depth -= 1
+        return listed
+
+    def __prefetch_dir(self,path,include_files):
+        """List a directory into the cache, and return its sub-directories."""
+        sup = super(CacheFSMixin,self)
+        try:
+            items = sup.listdirinfo(path)
+        except ResourceNotFoundError:
+            return []
+        #  Work out which entries are directories before taking the lock,
+        #  in case that needs to ask the remote filesystem
+        entries = []
+        subdirs = []
+        for (nm,info) in items:
+            cpath = pathcombine(path,basename(nm))
+            if fs.utils.isdir(sup,cpath,info):
+                subdirs.append(cpath)
+            elif not include_files:
+                cpath = None
+            entries.append((basename(nm),cpath,info))
+        with self.__cache_lock:
+            names = set(nm for (nm,_cpath,_info) in entries)
+            for nm in self.__cache.names(path):
+                if nm not in names:
+                    self.__clear_cached_info(pathcombine(path,nm))
+            for (nm,cpath,info) in entries:
+                if cpath is not None:
+                    self.__set_cached_info(cpath,CachedInfo(info))
+            if include_files:
+                #  Only mark the directory as complete if caching its
+                #  children didn't evict any of the others
+                if all(pathcombine(path,nm) in self.__cache for nm in names):
+                    pci = self.__cache.get(path)
+                    if pci is None:
+                        self.__set_cached_info(path,CachedInfo.new_dir_stub())
+                        pci = self.__cache.get(path)
+                    if pci is not None:
+                        pci.has_full_children = True
+        return subdirs
+
     def ilistdirinfo(self,path="",*args,**kwds):
         items = super(CacheFSMixin,self).ilistdirinfo(path,*args,**kwds)
         for (nm,info) in items:
@@ -675,70 +1584,91 @@ class CacheFSMixin(FS):
     def setcontents(self, path, data=b'', encoding=None, errors=None, chunk_size=64*1024):
         supsc = super(CacheFSMixin, self).setcontents
         res = supsc(path, data, encoding=None, errors=None, chunk_size=chunk_size)
-        with self.__cache_lock:
-            self.__cache.clear(path)
-            self.__cache[path] = CachedInfo.new_file_stub()
+        self.__replace_cached_info(path, CachedInfo.new_file_stub())
+        self.__invalidate_contents(path)
         return res
 
     def createfile(self, path, wipe=False):
         super(CacheFSMixin,self).createfile(path, wipe=wipe)
-        with self.__cache_lock:
-            self.__cache.clear(path)
-            self.__cache[path] = CachedInfo.new_file_stub()
+        self.__replace_cached_info(path, CachedInfo.new_file_stub())
+        self.__invalidate_contents(path)
 
     def makedir(self,path,*args,**kwds):
         super(CacheFSMixin,self).makedir(path,*args,**kwds)
         with self.__cache_lock:
-            self.__cache.clear(path)
-            self.__cache[path] = CachedInfo.new_dir_stub()
+            #  A recursive makedir may have created the parents too
+            for ancestor in recursepath(path)[1:-1]:
+                if ancestor not in self.__cache:
+                    self.__parent_incomplete(ancestor)
+            self.__replace_cached_info(path, CachedInfo.new_dir_stub())
 
     def remove(self,path):
         super(CacheFSMixin,self).remove(path)
         with self.__cache_lock:
-            self.__cache.clear(path)
+            self.__clear_cached_info(path)
+        self.__invalidate_contents(path)
 
     def removedir(self,path,**kwds):
         super(CacheFSMixin,self).removedir(path,**kwds)
         with self.__cache_lock:
-            self.__cache.clear(path)
+            self.__clear_cached_info(path)
+        self.__invalidate_contents(path)
 
     def rename(self,src,dst):
         super(CacheFSMixin,self).rename(src,dst)
         with self.__cache_lock:
-            for (subpath,ci) in self.__cache.items(src):
-                self.__cache[pathjoin(dst,subpath)] = ci.clone()
-            self.__cache.clear(src)
+            self.__copy_cached_info(src,dst)
+            self.__clear_cached_info(src)
+        self.__invalidate_contents(src)
+        self.__invalidate_contents(dst)
 
     def copy(self,src,dst,**kwds):
         super(CacheFSMixin,self).copy(src,dst,**kwds)
         with self.__cache_lock:
-            for (subpath,ci) in self.__cache.items(src):
-                self.__cache[pathjoin(dst,subpath)] = ci.clone()
+            self.__copy_cached_info(src,dst)
+        self.__invalidate_contents(dst)
 
     def copydir(self,src,dst,**kwds):
         super(CacheFSMixin,self).copydir(src,dst,**kwds)
         with self.__cache_lock:
-            for (subpath,ci) in self.__cache.items(src):
-                self.__cache[pathjoin(dst,subpath)] = ci.clone()
+            self.__copy_cached_info(src,dst)
+        self.__invalidate_contents(dst)
 
     def move(self,src,dst,**kwds):
         super(CacheFSMixin,self).move(src,dst,**kwds)
         with self.__cache_lock:
-            for (subpath,ci) in self.__cache.items(src):
-                self.__cache[pathjoin(dst,subpath)] = ci.clone()
-            self.__cache.clear(src)
+            self.__copy_cached_info(src,dst)
+            self.__clear_cached_info(src)
+        self.__invalidate_contents(src)
+        self.__invalidate_contents(dst)
 
     def movedir(self,src,dst,**kwds):
         super(CacheFSMixin,self).movedir(src,dst,**kwds)
         with self.__cache_lock:
-            for (subpath,ci) in self.__cache.items(src):
-                self.__cache[pathjoin(dst,subpath)] = ci.clone()
-            self.__cache.clear(src)
+            self.__copy_cached_info(src,dst)
+            self.__clear_cached_info(src)
+        self.__invalidate_contents(src)
+        self.__invalidate_contents(dst)
 
     def settimes(self,path,*args,**kwds):
         super(CacheFSMixin,self).settimes(path,*args,**kwds)
         with self.__cache_lock:
-            self.__cache.pop(path,None)
+            self.__expire_from_cache(path)
+
+
+#  Rough number of bytes used by each key/value pair of a cached info dict,
+#  and by the trie node, clock entry and CachedInfo for each path.
+_CACHED_INFO_ITEM_SIZE = 80
+_CACHED_INFO_OVERHEAD = 300
+
+def _cached_info_size(path,ci):
+    """Estimate the memory used by an entry in the CacheFSMixin cache."""
+    info = ci.info
+    #  Take len() first, as it fills in any keys of a lazily built info dict
+    #  (such as OSFS's) and so changes its size
+    num_items = len(info)
+    return (_CACHED_INFO_OVERHEAD + sys.getsizeof(path) + sys.getsizeof(info) +
+            _CACHED_INFO_ITEM_SIZE * num_items)
 
 
 class CacheFS(CacheFSMixin,WrapFS):
@@ -12,20 +12,26 @@ interface for objects stored in Amazon Simple Storage Service (S3).
 """
 
 import os
+import array
+import bisect
 import datetime
 import tempfile
-from fnmatch import fnmatch
 import stat as statinfo
 
 import boto.s3.connection
+from boto.s3.key import Key
 from boto.s3.prefix import Prefix
+from boto.s3.multipart import MultiPartUpload
 from boto.exception import S3ResponseError
 
 from fs.base import *
 from fs.path import *
 from fs.errors import *
 from fs.remote import *
-from fs.filelike import LimitBytesFile
+from fs.filelike import LimitBytesFile, FileLikeBase
+from fs.filelike import NotSeekableError, NotTruncatableError
+from fs.threadpool import ThreadPool
+from fs.globbing import GlobPattern
 from fs import iotools
 
 import six
@@ -56,7 +62,8 @@ class S3FS(FS):
 
     Local temporary files are used when opening files from this filesystem,
     and any changes are only pushed back into S3 when the files are closed
-    or flushed.
+    or flushed.  Files opened in mode "w" are the exception: their contents
+    are streamed into S3 using a multipart upload as they are written.
     """
 
     _meta = { 'thread_safe' : True,
@@ -76,7 +83,7 @@ class S3FS(FS):
         PATH_MAX = None
         NAME_MAX = None
 
-    def __init__(self, bucket, prefix="", aws_access_key=None, aws_secret_key=None, separator="/", thread_synchronize=True, key_sync_timeout=1):
+    def __init__(self, bucket, prefix="", aws_access_key=None, aws_secret_key=None, separator="/", thread_synchronize=True, key_sync_timeout=1, upload_part_size=8*1024*1024, upload_workers=4, download_part_size=8*1024*1024, download_workers=8, info_workers=8, inventory=False, inventory_refresh=None):
         """Constructor for S3FS objects.
 
         S3FS objects require the name of the S3 bucket in which to store
@@ -95,8 +102,38 @@ class S3FS(FS):
 
         By default the path separator is "/", but this can be overridden
         by specifying the keyword 'separator' in the constructor.
+
+        Files bigger than 'upload_part_size' bytes are uploaded in parts
+        of that size (at least 5MB, as required by S3), using a pool of
+        'upload_workers' threads.  At most one part per thread is held in
+        memory while waiting to be uploaded.  Likewise, getcontents() and
+        download() fetch files bigger than 'download_part_size' as ranges
+        of that size, using a pool of 'download_workers' threads, and
+        getinfo_many() makes its requests from a pool of 'info_workers'
+        threads that is kept for the life of the filesystem.
+
+        If 'inventory' is True, the names, sizes and etags of all keys under
+        the prefix are listed once and kept in memory, and exists(), isdir(),
+        isfile(), getinfo() and listdir() are answered from that inventory
+        instead of making requests to S3.  The inventory is updated by writes
+        made through this object; to see changes made by other programs, call
+        refresh_inventory() or set 'inventory_refresh' to the number of
+        seconds after which it is reloaded automatically.
         """
         self._bucket_name = bucket
+        self._upload_part_size = max(upload_part_size,5*1024*1024)
+        self._upload_workers = upload_workers
+        self._download_part_size = download_part_size
+        self._download_workers = download_workers
+        self._info_workers = info_workers
+        self._info_pool = None
+        self._info_pool_lock = threading.Lock()
+        self._inventory_enabled = inventory
+        self._inventory_refresh = inventory_refresh
+        self._inventory = None
+        self._inventory_log = None
+        self._inventory_lock = threading.Lock()
+        self._inventory_refresh_lock = threading.RLock()
         self._access_keys = (aws_access_key,aws_secret_key)
         self._separator = separator
         self._key_sync_timeout = key_sync_timeout
@@ -160,11 +197,77 @@ class S3FS(FS):
     def __getstate__(self):
         state = super(S3FS,self).__getstate__()
         del state['_tlocal']
+        del state['_inventory_lock']
+        del state['_inventory_refresh_lock']
+        del state['_info_pool_lock']
+        state['_info_pool'] = None
+        state['_inventory'] = None
+        state['_inventory_log'] = None
         return state
 
     def __setstate__(self,state):
         super(S3FS,self).__setstate__(state)
         self._tlocal = thread_local()
+        self._inventory_lock = threading.Lock()
+        self._inventory_refresh_lock = threading.RLock()
+        self._info_pool_lock = threading.Lock()
+
+    def close(self):
+        with self._info_pool_lock:
+            if self._info_pool is not None:
+                self._info_pool.close()
+                self._info_pool = None
+        super(S3FS,self).close()
+
+    def refresh_inventory(self):
+        """Reload the inventory of keys under this filesystem's prefix."""
+        with self._inventory_refresh_lock:
+            #  Writes made while the keys are being listed may or may not be
+            #  included in the listing, so they are logged and replayed.
+            with self._inventory_lock:
+                self._inventory_log = []
+            try:
+                keys = ((k.name,k.size,k.etag)
+                        for k in self._s3bukt.list(prefix=self._prefix))
+                inventory = _S3Inventory(keys)
+            except:
+                with self._inventory_lock:
+                    self._inventory_log = None
+                raise
+            with self._inventory_lock:
+                for (method,args) in self._inventory_log:
+                    getattr(inventory,method)(*args)
+                self._inventory_log = None
+                self._inventory = inventory
+
+    def _get_inventory(self):
+        """Get the inventory of keys, or None if it is not being used."""
+        if not self._inventory_enabled:
+            return None
+        inventory = self._inventory
+        refresh = self._inventory_refresh
+        if inventory is None or (refresh is not None and
+                                 inventory.loaded + refresh < time.time()):
+            with self._inventory_refresh_lock:
+                if inventory is self._inventory:
+                    self.refresh_inventory()
+                inventory = self._inventory
+        return inventory
+
+    def _update_inventory(self,method,*args):
+        with self._inventory_lock:
+            if self._inventory is not None:
+                getattr(self._inventory,method)(*args)
+            if self._inventory_log is not None:
+                self._inventory_log.append((method,args))
+
+    def _inventory_put(self,k):
+        if self._inventory_enabled:
+            self._update_inventory("put",k.name,k.size,k.etag)
+
+    def _inventory_delete(self,*s3paths):
+        if self._inventory_enabled:
+            self._update_inventory("delete",*s3paths)
 
     def __repr__(self):
         args = (self.__class__.__name__,self._bucket_name,self._prefix)
@@ -205,6 +308,7 @@ class S3FS(FS):
         program, meaning the content will never be as specified in the given
         key.  This is the reason for the timeout argument to the construtcor.
         """
+        self._inventory_put(k)
         timeout = self._key_sync_timeout
         if timeout is None:
             return k
@@ -276,7 +380,24 @@ class S3FS(FS):
         s3path = self._s3path(path)
         if isinstance(data, six.text_type):
             data = data.encode(encoding=encoding, errors=errors)
-        self._sync_set_contents(s3path, data)
+        if hasattr(data,"md5"):
+            self._sync_set_contents(s3path, data)
+        elif isinstance(data,basestring) and len(data) <= self._upload_part_size:
+            self._sync_set_contents(s3path, data)
+        else:
+            f = _S3UploadFile(self,s3path,"wb")
+            try:
+                if isinstance(data,basestring):
+                    f.write(data)
+                else:
+                    chunk = data.read(self._upload_part_size)
+                    while chunk:
+                        f.write(chunk)
+                        chunk = data.read(self._upload_part_size)
+            except:
+                f.abort()
+                raise
+            f.close()
 
     @iotools.filelike_to_stream
     def open(self, path, mode='r', buffering=-1, encoding=None, errors=None, newline=None, line_buffering=False, **kwargs):
@@ -285,10 +406,19 @@ class S3FS(FS):
         This method downloads the file contents into a local temporary file
         so that it can be worked on efficiently.  Any changes made to the
         file are only sent back to S3 when the file is flushed or closed.
+        Files opened read-only are downloaded in ranges as they are read,
+        and files opened write-only are uploaded in parts as they are written.
         """
         if self.isdir(path):
             raise ResourceInvalidError(path)
         s3path = self._s3path(path)
+        inventory = self._get_inventory()
+        if inventory is not None and mode != "r-" and \
+           RemoteFileBuffer._can_read_ranges(self,mode,0):
+            k = inventory.getkey(s3path)
+            if k is None:
+                raise ResourceNotFoundError(path)
+            return RemoteFileBuffer(self,path,mode,size=k.size,etag=k.etag)
         # Truncate the file if requested
         if "w" in mode:
             k = self._sync_set_contents(s3path,"")
@@ -301,6 +431,12 @@ class S3FS(FS):
             if not self.isdir(dirname(path)):
                 raise ParentDirectoryMissingError(path)
             k = self._sync_set_contents(s3path,"")
+        #  For write-only access, stream the new contents into S3
+        if "w" in mode and "+" not in mode:
+            return _S3UploadFile(self,s3path,mode)
+        #  For read-only access, fetch only the ranges that are read
+        if mode != "r-" and RemoteFileBuffer._can_read_ranges(self,mode,k.size):
+            return RemoteFileBuffer(self,path,mode,size=k.size,etag=k.etag)
         #  Make sure nothing tries to read past end of socket data
         f = LimitBytesFile(k.size,k,"r")
         #  For streaming reads, return the key object directly
@@ -308,7 +444,89 @@ class S3FS(FS):
             return f
         #  For everything else, use a RemoteFileBuffer.
         #  This will take care of closing the socket when it's done.
-        return RemoteFileBuffer(self,path,mode,f)
+        return RemoteFileBuffer(self,path,mode,f,size=k.size)
+
+    def read_range(self, path, offset, length, etag=None):
+        """Read at most 'length' bytes of a file, starting at 'offset'.
+
+        If 'etag' is given, the read fails if the key no longer has that etag.
+        """
+        return self._get_range(path, offset, length, etag)
+
+    def _get_range(self, path, offset, length, etag=None):
+        """Read part of a file, optionally checking that its etag matches."""
+        if length <= 0:
+            return b""
+        k = self._s3bukt.new_key(self._s3path(path))
+        headers = {"Range": "bytes=%d-%d" % (offset, offset + length - 1)}
+        if etag is not None:
+            headers["If-Match"] = etag
+        try:
+            return k.get_contents_as_string(headers=headers)
+        except S3ResponseError, e:
+            if e.status == 404:
+                raise ResourceNotFoundError(path)
+            #  Requested range starts beyond the end of the file
+            if e.status == 416:
+                return b""
+            if e.status == 412:
+                msg = "File changed while being read: %(path)s"
+                raise OperationFailedError("download", path=path, msg=msg)
+            raise
+
+    def _iter_download(self, path):
+        """Iterator over the contents of a file, fetched in parallel.
+
+        The file is split into ranges of download_part_size bytes, which are
+        fetched by a pool of threads and yielded in order.  At most two
+        ranges per thread are held in memory at any one time.
+        """
+        k = self._s3bukt.get_key(self._s3path(path))
+        if k is None:
+            if self.isdir(path):
+                raise ResourceInvalidError(path)
+            raise ResourceNotFoundError(path)
+        size = k.size
+        part_size = self._download_part_size
+        offsets = xrange(0, size, part_size)
+        def fetch(offset):
+            return self._get_range(path, offset, min(part_size, size - offset), k.etag)
+        if len(offsets) < 2 or self._download_workers < 2:
+            for offset in offsets:
+                yield fetch(offset)
+            return
+        with ThreadPool(min(self._download_workers, len(offsets))) as pool:
+            for data in pool.imap(fetch, offsets):
+                yield data
+
+    def download(self, path, f):
+        """Write the contents of a file into the file-like object 'f'.
+
+        Big files are downloaded as several ranges in parallel, which is
+        much faster than reading them as a single stream.
+        """
+        for data in self._iter_download(path):
+            f.write(data)
+
+    def getcontents(self, path, mode="rb", encoding=None, errors=None, newline=None):
+        if "r" not in mode:
+            raise ValueError("mode must contain 'r' to be readable")
+        contents = b"".join(self._iter_download(path))
+        if "b" not in mode:
+            return iotools.decode_binary(contents, encoding=encoding,
+                                         errors=errors, newline=newline)
+        return contents
+
+    def getcontents_into(self, path, buffer):
+        view = memoryview(buffer)
+        bytes_read = 0
+        for data in self._iter_download(path):
+            count = min(len(data), len(view) - bytes_read)
+            view[bytes_read:bytes_read + count] = data[:count]
+            bytes_read += count
+            if bytes_read == len(view):
+                break
+        return bytes_read
 
     def exists(self,path):
         """Check whether a path exists."""
@@ -317,6 +535,10 @@ class S3FS(FS):
         # The root directory always exists
         if self._prefix.startswith(s3path):
             return True
+        inventory = self._get_inventory()
+        if inventory is not None:
+            return inventory.getsize(s3path) is not None or \
+                   inventory.has_prefix(s3pathD)
         ks = self._s3bukt.list(prefix=s3path,delimiter=self._separator)
         for k in ks:
             # A regular file
@@ -333,6 +555,9 @@ class S3FS(FS):
         # Root is always a directory
         if s3path == "/" or s3path == self._prefix:
             return True
+        inventory = self._get_inventory()
+        if inventory is not None:
+            return inventory.has_prefix(s3path)
         # Use a list request so that we return true if there are any files
         # in that directory.  This avoids requiring a special file for the
         # the directory itself, which other tools may not create.
@@ -350,6 +575,9 @@ class S3FS(FS):
         # Root is never a file
         if self._prefix.startswith(s3path):
             return False
+        inventory = self._get_inventory()
+        if inventory is not None:
+            return inventory.getsize(s3path) is not None
         k = self._s3bukt.get_key(s3path)
         if k is not None:
             return True
@@ -392,7 +620,12 @@ class S3FS(FS):
         if s3path == "/":
             s3path = ""
         isDir = False
-        for k in self._s3bukt.list(prefix=s3path,delimiter=self._separator):
+        inventory = self._get_inventory()
+        if inventory is not None:
+            ks = self._iter_inventory_keys(inventory,s3path)
+        else:
+            ks = self._s3bukt.list(prefix=s3path,delimiter=self._separator)
+        for k in ks:
             if not isDir:
                 isDir = True
             # Skip over the entry for the directory itself, if it exists
@@ -410,6 +643,16 @@ class S3FS(FS):
                     raise ResourceInvalidError(path,msg=msg)
                 raise ResourceNotFoundError(path)
 
+    def _iter_inventory_keys(self,inventory,s3path):
+        """Iterator over keys in a directory, like a delimited list()."""
+        for (name,size,etag) in inventory.iter_children(s3path,self._separator):
+            if size is None:
+                yield Prefix(bucket=self._s3bukt,name=name)
+            else:
+                k = Key(self._s3bukt,name)
+                (k.size,k.etag) = (size,etag)
+                yield k
+
     def _key_is_dir(self, k):
         if isinstance(k,Prefix):
             return True
@@ -432,10 +675,8 @@ class S3FS(FS):
         elif files_only:
             keys = ((nm,k) for (nm,k) in keys if not self._key_is_dir(k))
         if wildcard is not None:
-            if callable(wildcard):
-                keys = ((nm,k) for (nm,k) in keys if wildcard(nm))
-            else:
-                keys = ((nm,k) for (nm,k) in keys if fnmatch(nm,wildcard))
+            wildcard = wildcard_matcher(wildcard,normcase=True)
+            keys = ((nm,k) for (nm,k) in keys if wildcard(nm))
         if full:
             return ((relpath(pathjoin(path, nm)),k) for (nm,k) in keys)
         elif absolute:
@@ -492,7 +733,11 @@ class S3FS(FS):
     def remove(self,path):
         """Remove the file at the given path."""
         s3path = self._s3path(path)
-        ks = self._s3bukt.list(prefix=s3path,delimiter=self._separator)
+        inventory = self._get_inventory()
+        if inventory is not None:
+            ks = self._iter_inventory_keys(inventory,s3path)
+        else:
+            ks = self._s3bukt.list(prefix=s3path,delimiter=self._separator)
         for k in ks:
             if _eq_utf8(k.name,s3path):
                 break
@@ -502,6 +747,7 @@ class S3FS(FS):
         else:
             raise ResourceNotFoundError(path)
         self._s3bukt.delete_key(s3path)
+        self._inventory_delete(s3path)
         k = self._s3bukt.get_key(s3path)
         while k:
             k = self._s3bukt.get_key(s3path)
@@ -521,12 +767,17 @@ class S3FS(FS):
             ks = self._s3bukt.list(prefix=s3path,delimiter=self._separator)
         # Fail if the directory is not empty, or remove them if forced
         found = False
-        for k in ks:
-            found = True
-            if not _eq_utf8(k.name,s3path):
-                if not force:
-                    raise DirectoryNotEmptyError(path)
-                self._s3bukt.delete_key(k.name)
+        deleted = []
+        try:
+            for k in ks:
+                found = True
+                if not _eq_utf8(k.name,s3path):
+                    if not force:
+                        raise DirectoryNotEmptyError(path)
+                    self._s3bukt.delete_key(k.name)
+                    deleted.append(k.name)
+        finally:
+            self._inventory_delete(*deleted)
         if not found:
             if self.isfile(path):
                 msg = "removedir() called on a regular file: %(path)s"
@@ -534,8 +785,9 @@ class S3FS(FS):
             if path not in ("","/"):
                 raise ResourceNotFoundError(path)
         self._s3bukt.delete_key(s3path)
-        if recursive and path not in ("","/"):
-            pdir = dirname(path)
+        self._inventory_delete(s3path)
+        pdir = dirname(path)
+        if recursive and normpath(pdir) not in ("","/"):
             try:
                 self.removedir(pdir,recursive=True,force=False)
             except DirectoryNotEmptyError:
@@ -551,8 +803,15 @@ class S3FS(FS):
 
     def getinfo(self,path):
         s3path = self._s3path(path)
+        inventory = self._get_inventory()
         if path in ("","/"):
             k = Prefix(bucket=self._s3bukt,name="/")
+        elif inventory is not None:
+            k = inventory.getkey(s3path)
+            if k is None:
+                if not inventory.has_prefix(s3path + self._separator):
+                    raise ResourceNotFoundError(path)
+                k = Prefix(bucket=self._s3bukt,name=s3path + self._separator)
         else:
             k = self._s3bukt.get_key(s3path)
             if k is None:
@@ -564,6 +823,29 @@ class S3FS(FS):
                     raise ResourceNotFoundError(path)
         return self._get_key_info(k,path)
 
+    def getinfo_many(self,paths,ignore_errors=False):
+        """Get the info for several paths, using concurrent requests.
+
+        Each path needs at least one request to S3, so the lookups are spread
+        over a pool of 'info_workers' threads (each of which has its own
+        connection) rather than being made one after another.
+        """
+        paths = list(paths)
+        if len(paths) < 2 or self._info_workers < 2:
+            return super(S3FS,self).getinfo_many(paths,ignore_errors=ignore_errors)
+        def getinfo(path):
+            try:
+                return self.getinfo(path)
+            except FSError:
+                if not ignore_errors:
+                    raise
+                return {}
+        with self._info_pool_lock:
+            if self._info_pool is None:
+                self._info_pool = ThreadPool(self._info_workers)
+            pool = self._info_pool
+        return zip(paths,pool.imap(getinfo,paths))
+
     def _get_key_info(self,key,name=None):
         info = {}
         if name is not None:
@@ -581,7 +863,7 @@ class S3FS(FS):
             if isinstance(etag,unicode):
                etag = etag.encode("utf8")
             info['etag'] = etag.strip('"').strip("'")
-        if hasattr(key,"last_modified"):
+        if getattr(key,"last_modified",None) is not None:
             # TODO: does S3 use any other formats?
             fmt = "%a, %d %b %Y %H:%M:%S %Z"
             try:
@@ -604,6 +886,35 @@ class S3FS(FS):
         thrown if the destination exists
         chunk_size -- Size of chunks to use in copy (ignored by S3)
         """
+        self._copy_key(self,src,dst,overwrite=overwrite)
+
+    def can_copy_from(self,src_fs):
+        """S3 can copy keys between buckets (and prefixes) on one account."""
+        return isinstance(src_fs,S3FS) and src_fs._access_keys == self._access_keys
+
+    def copy_from(self,src_fs,src,dst,overwrite=False):
+        """Copy a file from another S3FS, using a server-side copy."""
+        if not self.can_copy_from(src_fs):
+            raise UnsupportedError("copy from another filesystem")
+        self._copy_key(src_fs,src,dst,overwrite=overwrite)
+
+    def move_from(self,src_fs,src,dst,overwrite=False):
+        """Move a file from another S3FS, using a server-side copy."""
+        if not self.can_move_from(src_fs):
+            raise UnsupportedError("move from another filesystem")
+        s3path_dst = self._copy_key(src_fs,src,dst,overwrite=overwrite)
+        s3path_src = src_fs._s3path(src)
+        #  Both paths may name the same key; don't delete the only copy.
+        if (src_fs._bucket_name,s3path_src) != (self._bucket_name,s3path_dst):
+            src_fs._s3bukt.delete_key(s3path_src)
+            src_fs._inventory_delete(s3path_src)
+
+    def _copy_key(self,src_fs,src,dst,overwrite=False):
+        """Copy the key for 'src' in src_fs to 'dst' in this filesystem.
+
+        Returns the name of the destination key.  If that is the source key
+        itself, nothing is copied.
+        """
         s3path_dst = self._s3path(dst)
         s3path_dstD = s3path_dst + self._separator
         #  Check for various preconditions.
@@ -628,9 +939,13 @@ class S3FS(FS):
             msg = "Destination directory does not exist: %(path)s"
             raise ParentDirectoryMissingError(dst,msg=msg)
         # OK, now we can copy the file.
-        s3path_src = self._s3path(src)
+        s3path_src = src_fs._s3path(src)
+        if (src_fs._bucket_name,s3path_src) == (self._bucket_name,s3path_dst):
+            if not src_fs.isfile(src):
+                raise ResourceNotFoundError(src)
+            return s3path_dst
         try:
-            self._s3bukt.copy_key(s3path_dst,self._bucket_name,s3path_src)
+            self._s3bukt.copy_key(s3path_dst,src_fs._bucket_name,s3path_src)
         except S3ResponseError, e:
             if "404 Not Found" in str(e):
                 msg = "Source is not a file: %(path)s"
@@ -641,23 +956,31 @@ class S3FS(FS):
             while k is None:
                 k = self._s3bukt.get_key(s3path_dst)
             self._sync_key(k)
+        return s3path_dst
 
     def move(self,src,dst,overwrite=False,chunk_size=16384):
         """Move a file from one location to another."""
-        self.copy(src,dst,overwrite=overwrite)
-        self._s3bukt.delete_key(self._s3path(src))
+        s3path_dst = self._copy_key(self,src,dst,overwrite=overwrite)
+        s3path_src = self._s3path(src)
+        if s3path_src != s3path_dst:
+            self._s3bukt.delete_key(s3path_src)
+            self._inventory_delete(s3path_src)
 
     def walkfiles(self,
               path="/",
               wildcard=None,
               dir_wildcard=None,
               search="breadth",
-              ignore_errors=False ):
+              ignore_errors=False,
+              workers=None ):
+        #  A flat listing of the prefix beats a concurrent walk, so 'workers'
+        #  is only used when we have to fall back to the default impl.
         if search != "breadth" or dir_wildcard is not None:
-            args = (wildcard,dir_wildcard,search,ignore_errors)
+            args = (wildcard,dir_wildcard,search,ignore_errors,workers)
             for item in super(S3FS,self).walkfiles(path,*args):
                 yield item
         else:
+            wildcard = wildcard_matcher(wildcard,normcase=True)
             prefix = self._s3path(path)
             for k in self._s3bukt.list(prefix=prefix):
                 name = relpath(self._uns3path(k.name,prefix))
@@ -665,13 +988,8 @@ class S3FS(FS):
                     if not isinstance(name,unicode):
                         name = name.decode("utf8")
                     if not k.name.endswith(self._separator):
-                        if wildcard is not None:
-                            if callable(wildcard):
-                                if not wildcard(basename(name)):
-                                    continue
-                            else:
-                                if not fnmatch(basename(name),wildcard):
-                                    continue
+                        if not wildcard(basename(name)):
+                            continue
                         yield pathjoin(path,name)
 
 
@@ -686,19 +1004,15 @@ class S3FS(FS):
             for item in super(S3FS,self).walkfiles(path,*args):
                 yield (item,self.getinfo(item))
         else:
+            wildcard = wildcard_matcher(wildcard,normcase=True)
             prefix = self._s3path(path)
             for k in self._s3bukt.list(prefix=prefix):
                 name = relpath(self._uns3path(k.name,prefix))
                 if name != "":
                     if not isinstance(name,unicode):
                         name = name.decode("utf8")
-                    if wildcard is not None:
-                        if callable(wildcard):
-                            if not wildcard(basename(name)):
-                                continue
-                        else:
-                            if not fnmatch(basename(name),wildcard):
-                                continue
+                    if not wildcard(basename(name)):
+                        continue
                     yield (pathjoin(path,name),self._get_key_info(k,name))
 
 
@@ -713,6 +1027,7 @@ class S3FS(FS):
             for item in super(S3FS,self).walkfiles(path,*args):
                 yield (item,self.getinfo(item))
         else:
+            wildcard = wildcard_matcher(wildcard,normcase=True)
             prefix = self._s3path(path)
             for k in self._s3bukt.list(prefix=prefix):
                 name = relpath(self._uns3path(k.name,prefix))
@@ -720,15 +1035,356 @@ class S3FS(FS):
                     if not isinstance(name,unicode):
                         name = name.decode("utf8")
                     if not k.name.endswith(self._separator):
-                        if wildcard is not None:
-                            if callable(wildcard):
-                                if not wildcard(basename(name)):
-                                    continue
-                            else:
-                                if not fnmatch(basename(name),wildcard):
-                                    continue
+                        if not wildcard(basename(name)):
+                            continue
                         yield (pathjoin(path,name),self._get_key_info(k,name))
 
+    def iglob(self,pattern,path="/",ignore_errors=False):
+        #  A '**' would mean listing every directory beneath the pattern's
+        #  prefix, so make a single flat listing of the keys under it instead.
+        if not isinstance(pattern,GlobPattern):
+            pattern = GlobPattern(pattern)
+        if not pattern.recursive:
+            return super(S3FS,self).iglob(pattern,path,ignore_errors)
+        return self._iglob_keys(pattern,path,ignore_errors)
+
+    def _iglob_keys(self,pattern,path,ignore_errors=False):
+        """Match a recursive glob pattern against a flat listing of keys."""
+        root = abspath(normpath(pathjoin(path,pattern.prefix)))
+        s3path = self._s3path(root) + self._separator
+        if s3path == "/":
+            s3path = ""
+        start = pattern.start()
+        seen_dirs = set()
+        try:
+            for k in self._s3bukt.list(prefix=s3path):
+                name = self._uns3path(k.name,s3path)
+                if not isinstance(name,unicode):
+                    name = name.decode("utf8")
+                components = name.split(self._separator)
+                # Keys ending with the separator are directory markers
+                is_dir = components[-1] == ""
+                if is_dir:
+                    components.pop()
+                if not components:
+                    continue
+                last = len(components) - 1
+                state = start
+                entry_path = root
+                for i,component in enumerate(components):
+                    state = pattern.advance(state,component)
+                    if not state:
+                        break
+                    entry_path = pathcombine(entry_path,component)
+                    if i < last or is_dir:
+                        # Directories are implied by the keys beneath them
+                        if entry_path in seen_dirs:
+                            continue
+                        seen_dirs.add(entry_path)
+                        if pattern.is_match(state):
+                            yield entry_path
+                    elif pattern.is_match(state) and not pattern.dirs_only:
+                        yield entry_path
+        except (FSError,S3ResponseError):
+            if not ignore_errors:
+                raise
+
+
+
+class _S3Inventory(object):
+    """Sorted index of the keys under an S3FS prefix.
+
+    Key names are kept in a sorted list, with their sizes and etags in
+    parallel arrays, so that lookups are binary searches on the names.
+    Changes are collected in a small sorted overlay that shadows those
+    arrays, and are merged into a new copy of the arrays once the overlay
+    grows past the square root of their length.  Each write is then cheap,
+    and iterators over an older version of the index are not disturbed.
+    """
+
+    min_overlay_size = 1024
+
+    def __init__(self,keys=()):
+        keys = sorted((_utf8(name),size,etag) for (name,size,etag) in keys)
+        names = [name for (name,size,etag) in keys]
+        sizes = array.array("d",(size or 0 for (name,size,etag) in keys))
+        etags = [etag for (name,size,etag) in keys]
+        #  The arrays, the sorted names in the overlay, and a dict mapping
+        #  those names to (size,etag) or to None if the key was deleted.
+        self._state = ((names,sizes,etags),[],{})
+        self._lock = threading.Lock()
+        self.loaded = time.time()
+
+    def _lookup(self,name):
+        """Get the (size,etag) of the named key, or None if it doesn't exist."""
+        ((names,sizes,etags),_,overlay) = self._state
+        name = _utf8(name)
+        try:
+            return overlay[name]
+        except KeyError:
+            i = bisect.bisect_left(names,name)
+            if i < len(names) and names[i] == name:
+                return (int(sizes[i]),etags[i])
+            return None
+
+    def getsize(self,name):
+        """Get the size of the named key, or None if it doesn't exist."""
+        entry = self._lookup(name)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def getkey(self,name):
+        """Get a Key object for the named key, or None if it doesn't exist."""
+        entry = self._lookup(name)
+        if entry is None:
+            return None
+        k = Key(None,_utf8(name))
+        (k.size,k.etag) = entry
+        return k
+
+    def has_prefix(self,prefix):
+        """Check whether any key starts with the given prefix.
+
+        This is a binary search in the arrays and in the overlay, only
+        stepping past keys that the overlay has deleted.
+        """
+        prefix = _utf8(prefix)
+        with self._lock:
+            ((names,sizes,etags),onames,overlay) = self._state
+            k = bisect.bisect_left(onames,prefix)
+            while k < len(onames) and onames[k].startswith(prefix):
+                if overlay[onames[k]] is not None:
+                    return True
+                k += 1
+            i = bisect.bisect_left(names,prefix)
+            while i < len(names) and names[i].startswith(prefix):
+                if overlay.get(names[i],True) is not None:
+                    return True
+                i += 1
+        return False
+
+    def iter_children(self,prefix,sep=None):
+        """Iterate over the (name,size,etag) entries just below a prefix.
+
+        Like a delimited list() request, keys in subdirectories are rolled
+        up into a single entry with a name ending in the separator, and a
+        size and etag of None.  If no separator is given, all keys starting
+        with the prefix are included.
+        """
+        prefix = _utf8(prefix)
+        with self._lock:
+            ((names,sizes,etags),onames,overlay) = self._state
+            #  Copy the part of the overlay under the prefix, as later
+            #  writes will change it in place.
+            k = bisect.bisect_left(onames,prefix)
+            changes = []
+            while k < len(onames) and onames[k].startswith(prefix):
+                changes.append((onames[k],overlay[onames[k]]))
+                k += 1
+        i = bisect.bisect_left(names,prefix)
+        k = 0
+        while True:
+            in_names = i < len(names) and names[i].startswith(prefix)
+            if k < len(changes) and not (in_names and names[i] < changes[k][0]):
+                (name,entry) = changes[k]
+                k += 1
+                if in_names and names[i] == name:
+                    i += 1
+            elif in_names:
+                (name,entry) = (names[i],(int(sizes[i]),etags[i]))
+                i += 1
+            else:
+                break
+            if entry is None:
+                continue
+            j = name.find(sep,len(prefix)) if sep else -1
+            if j == -1:
+                yield (name,entry[0],entry[1])
+            else:
+                yield (name[:j+1],None,None)
+                #  Skip over the rest of the keys in that subdirectory
+                end = name[:j] + chr(ord(sep) + 1)
+                i = bisect.bisect_left(names,end,i)
+                k = bisect.bisect_left(changes,(end,),k)
+
+    def put(self,name,size,etag):
+        """Add or update the entry for a key."""
+        self._update([(_utf8(name),(int(size or 0),etag))])
+
+    def delete(self,*names):
+        """Remove the entries for the given keys, if there are any."""
+        self._update([(_utf8(name),None) for name in names])
+
+    def _update(self,changes):
+        with self._lock:
+            (keys,onames,overlay) = self._state
+            added = []
+            for (name,entry) in changes:
+                if name not in overlay:
+                    added.append(name)
+                overlay[name] = entry
+            if len(overlay) <= max(self.min_overlay_size,len(keys[0])**0.5):
+                for name in added:
+                    bisect.insort(onames,name)
+            else:
+                self._state = (self._merge(keys,overlay),[],{})
+
+    @staticmethod
+    def _merge(keys,overlay):
+        """Apply the changes in the overlay to new copies of the arrays."""
+        (names,sizes,etags) = keys
+        (new_names,new_sizes,new_etags) = ([],array.array("d"),[])
+        i = 0
+        for name in sorted(overlay):
+            j = bisect.bisect_left(names,name,i)
+            new_names += names[i:j]
+            new_sizes += sizes[i:j]
+            new_etags += etags[i:j]
+            if j < len(names) and names[j] == name:
+                j += 1
+            if overlay[name] is not None:
+                new_names.append(name)
+                new_sizes.append(overlay[name][0])
+                new_etags.append(overlay[name][1])
+            i = j
+        new_names += names[i:]
+        new_sizes += sizes[i:]
+        new_etags += etags[i:]
+        return (new_names,new_sizes,new_etags)
+
+
+class _S3UploadFile(FileLikeBase):
+    """Write-only file that streams its contents into an S3 key.
+
+    Data is collected into parts of the filesystem's upload_part_size.  If
+    the file is closed before the first part is full, its contents are sent
+    in a single PUT.  Otherwise a multipart upload is started, each part is
+    uploaded by a thread pool as soon as it is full, and the upload is
+    completed when the file is closed.  The file can seek and truncate
+    within the data that has not been uploaded yet.
+    """
+
+    def __init__(self,fs,s3path,mode):
+        super(_S3UploadFile,self).__init__()
+        self.fs = fs
+        self.s3path = s3path
+        self.mode = mode
+        self._buffer = six.BytesIO()  # Data not yet sent
+        self._sent = 0  # Number of bytes already sent
+        self._upload = None
+        self._pool = None
+        self._parts = []
+
+    def _write(self,data,flushing=False):
+        self._buffer.write(data)
+        part_size = self.fs._upload_part_size
+        if self._buffer.tell() >= part_size:
+            pos = self._buffer.tell()
+            data = self._buffer.getvalue()
+            offset = 0
+            #  Only send data before the current position; anything after it
+            #  (e.g. from a truncate() that extended the file) may still be
+            #  overwritten.
+            while pos - offset >= part_size:
+                self._send_part(data[offset:offset+part_size])
+                offset += part_size
+            self._buffer = six.BytesIO()
+            self._buffer.write(data[offset:])
+            self._buffer.seek(pos - offset)
+            self._sent += offset
+
+    def _seek(self,offset,whence):
+        if whence == 1:
+            offset += self._tell()
+        elif whence == 2:
+            offset += self._sent + len(self._buffer.getvalue())
+        if offset < self._sent:
+            raise NotSeekableError("Can't seek into data that's been uploaded")
+        self._buffer.seek(offset - self._sent)
+
+    def _tell(self):
+        return self._sent + self._buffer.tell()
+
+    def _truncate(self,size):
+        if size < self._sent:
+            raise NotTruncatableError("Can't truncate data that's been uploaded")
+        pos = self._buffer.tell()
+        length = len(self._buffer.getvalue())
+        if size - self._sent > length:
+            self._buffer.seek(length)
+            self._buffer.write(b"\0" * (size - self._sent - length))
+        else:
+            self._buffer.truncate(size - self._sent)
+        self._buffer.seek(pos)
+
+    def _send_part(self,data):
+        if self._upload is None:
+            self._upload = self.fs._s3bukt.initiate_multipart_upload(self.s3path)
+            self._pool = ThreadPool(self.fs._upload_workers)
+        #  Wait for a worker to be free, so at most one part per worker
+        #  is waiting to be sent.  This also raises any errors early.
+        pending = [task for task in self._parts if not task.done()]
+        if len(pending) >= self.fs._upload_workers:
+            pending[0].result()
+        task = self._pool.submit(self._upload_part,len(self._parts)+1,data)
+        self._parts.append(task)
+
+    def _upload_part(self,part_num,data):
+        #  Boto is not thread-safe, so use this thread's own connection.
+        mp = MultiPartUpload(self.fs._s3bukt)
+        mp.key_name = self._upload.key_name
+        mp.id = self._upload.id
+        return mp.upload_part_from_file(six.BytesIO(data),part_num).etag
+
+    def _complete_upload(self):
+        xml = ["<CompleteMultipartUpload>"]
+        for (part_num,task) in enumerate(self._parts):
+            xml.append("<Part><PartNumber>%d</PartNumber><ETag>%s</ETag></Part>"
+                       % (part_num + 1,task.result()))
+        xml.append("</CompleteMultipartUpload>")
+        bucket = self.fs._s3bukt
+        res = bucket.complete_multipart_upload(self._upload.key_name,
+                                               self._upload.id,"".join(xml))
+        k = bucket.new_key(self.s3path)
+        k.etag = res.etag
+        k.size = self._sent + len(self._buffer.getvalue())
+        self.fs._sync_key(k)
+
+    def abort(self):
+        """Close the file without changing the contents of the key."""
+        self._buffer = six.BytesIO()
+        self.closed = True
+        if self._upload is not None:
+            for task in self._parts:
+                task.wait()
+            self._pool.close()
+            self.fs._s3bukt.cancel_multipart_upload(self._upload.key_name,
+                                                    self._upload.id)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            super(_S3UploadFile,self).close()
+            data = self._buffer.getvalue()
+            if self._upload is None:
+                self.fs._sync_set_contents(self.s3path,data)
+                return
+            if data:
+                self._send_part(data)
+            self._complete_upload()
+        except:
+            self.abort()
+            raise
+        else:
+            self._pool.close()
+
+
+def _utf8(name):
+    if isinstance(name,unicode):
+        return name.encode("utf8")
+    return name
 
 
 def _eq_utf8(name1,name2):
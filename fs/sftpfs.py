@@ -12,6 +12,7 @@ import datetime
 import stat as statinfo
 import threading
 import os
+import pipes
 import paramiko
 from getpass import getuser
 import errno
@@ -20,6 +21,7 @@ from fs.base import *
 from fs.path import *
 from fs.errors import *
 from fs.utils import isdir, isfile
+from fs.threadpool import ThreadPool
 from fs import iotools
 
 
@@ -129,12 +131,18 @@ class SFTPFS(FS):
         self._tlocal = thread_local()
         self._transport = None
         self._client = None
+        self._info_pool = None
+        self._info_pool_lock = threading.Lock()
 
         self.hostname = None
+        self._address = None  # (host,port) of the server, if known
         if isinstance(connection, basestring):
             self.hostname = connection
+            host, _, port = connection.partition(':')
+            self._address = (host, int(port or 22))
         elif isinstance(connection, tuple):
             self.hostname = '%s:%s' % connection
+            self._address = (connection[0], int(connection[1]))
 
         super(SFTPFS, self).__init__()
         self.root_path = abspath(normpath(root_path))
@@ -260,6 +268,8 @@ class SFTPFS(FS):
     def __getstate__(self):
         state = super(SFTPFS,self).__getstate__()
         del state["_tlocal"]
+        del state["_info_pool_lock"]
+        state["_info_pool"] = None
         if self._owns_transport:
             state['_transport'] = self._transport.getpeername()
         return state
@@ -270,6 +280,7 @@ class SFTPFS(FS):
         #    self.__dict__[k] = v
         #self._lock = threading.RLock()
         self._tlocal = thread_local()
+        self._info_pool_lock = threading.Lock()
         if self._owns_transport:
             self._transport = paramiko.Transport(self._transport)
             self._transport.connect(**self._credentials)
@@ -299,6 +310,10 @@ class SFTPFS(FS):
     def close(self):
         """Close the connection to the remote server."""
         if not self.closed:
+            with self._info_pool_lock:
+                if self._info_pool is not None:
+                    self._info_pool.close()
+                    self._info_pool = None
             self._tlocal = None
             #if self.client:
             #    self.client.close()
@@ -590,6 +605,73 @@ class SFTPFS(FS):
                 raise ParentDirectoryMissingError(dst,msg="Destination directory does not exist: %(path)s")
             raise
 
+    def can_copy_from(self, src_fs):
+        """Files can be copied directly between SFTPFS objects on the same
+        server, as the same user."""
+        if not isinstance(src_fs, SFTPFS):
+            return False
+        if src_fs._transport is not None and src_fs._transport is self._transport:
+            return True
+        if self._address is None or self._address != src_fs._address:
+            return False
+        return self.credentials.get('username') == src_fs.credentials.get('username')
+
+    @synchronize
+    def copy_from(self, src_fs, src, dst, overwrite=False):
+        """Copy a file from another SFTPFS on the same server.
+
+        SFTP has no request for copying files, so this runs 'cp' on the server
+        in an SSH session.  UnsupportedError is raised if that fails, so that
+        the caller can fall back to an ordinary copy.
+        """
+        if not self.can_copy_from(src_fs) or self._transport is None:
+            raise UnsupportedError("copy from another filesystem")
+        if not src_fs.isfile(src):
+            if src_fs.isdir(src):
+                raise ResourceInvalidError(src, msg="Source is not a file: %(path)s")
+            raise ResourceNotFoundError(src)
+        if not overwrite and self.exists(dst):
+            raise DestinationExistsError(dst)
+        if not self.isdir(dirname(dst)):
+            raise ParentDirectoryMissingError(dst, msg="Destination directory does not exist: %(path)s")
+        nsrc = src_fs._normpath(src).encode(src_fs.encoding)
+        ndst = self._normpath(dst).encode(self.encoding)
+        command = "cp -- %s %s" % (pipes.quote(nsrc), pipes.quote(ndst))
+        try:
+            channel = self._transport.open_session()
+            try:
+                channel.exec_command(command)
+                status = channel.recv_exit_status()
+            finally:
+                channel.close()
+        except paramiko.SSHException:
+            raise UnsupportedError("copy from another filesystem")
+        if status != 0:
+            raise UnsupportedError("copy from another filesystem")
+
+    @synchronize
+    @convert_os_errors
+    def move_from(self, src_fs, src, dst, overwrite=False):
+        """Move a file from another SFTPFS on the same server, by renaming it."""
+        if not self.can_move_from(src_fs):
+            raise UnsupportedError("move from another filesystem")
+        if src_fs.isdir(src):
+            raise ResourceInvalidError(src, msg="Source is not a file: %(path)s")
+        nsrc = src_fs._normpath(src)
+        ndst = self._normpath(dst)
+        if self.isfile(dst):
+            if not overwrite:
+                raise DestinationExistsError(dst)
+            self.remove(dst)
+        try:
+            self.client.rename(nsrc, ndst)
+        except IOError, e:
+            if getattr(e, "errno", None) == ENOENT:
+                raise ResourceNotFoundError(src)
+            if not self.isdir(dirname(dst)):
+                raise ParentDirectoryMissingError(dst, msg="Destination directory does not exist: %(path)s")
+            raise
+
     @synchronize
     @convert_os_errors
     def movedir(self,src,dst,overwrite=False,ignore_errors=False,chunk_size=16384):
@@ -630,6 +712,40 @@ class SFTPFS(FS):
     def getinfo(self, path):
         npath = self._normpath(path)
         stats = self.client.stat(npath)
+        return self._stat_info(stats)
+
+    def getinfo_many(self, paths, ignore_errors=False):
+        """Get the info for several paths, using several SFTP channels.
+
+        The stat requests are spread over a pool of up to `_info_workers`
+        threads.  Each thread has its own SFTP channel on the connection, so
+        several requests can be waiting for a reply at the same time.
+
+        """
+        paths = list(paths)
+        if len(paths) < 2 or self._transport is None:
+            return super(SFTPFS, self).getinfo_many(paths, ignore_errors=ignore_errors)
+        def getinfo(path):
+            try:
+                return self._stat_path(path)
+            except FSError:
+                if not ignore_errors:
+                    raise
+                return {}
+        with self._info_pool_lock:
+            if self._info_pool is None:
+                self._info_pool = ThreadPool(self._info_workers)
+            pool = self._info_pool
+        return zip(paths, pool.imap(getinfo, paths))
+
+    _info_workers = 8
+
+    @convert_os_errors
+    def _stat_path(self, path):
+        #  Not synchronized: each thread uses its own client
+        return self._stat_info(self.client.stat(self._normpath(path)))
+
+    def _stat_info(self, stats):
         info = dict((k, getattr(stats, k)) for k in dir(stats) if not k.startswith('_'))
         info['size'] = info['st_size']
         ct = info.get('st_ctime', None)
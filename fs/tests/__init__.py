@@ -391,6 +391,54 @@ class FSTestCases(object):
         self.assertEquals(sorted(self.fs.walkdirs(
             wildcard="*foo*")), ["/", "/foo", "/foo/baz"])
 
+    def test_walk_workers(self):
+        self.fs.setcontents('a.txt', b('hello'))
+        self.fs.makeopendir('foo').setcontents('b.txt', b('123'))
+        self.fs.makeopendir('foo/bar').setcontents('c', b('123'))
+        self.fs.makeopendir('baz').setcontents('d.txt', b('123'))
+        for search in ("breadth", "depth"):
+            expected = sorted((abspath(d), sorted(fs)) for (d, fs) in self.fs.walk(search=search))
+            found = sorted((abspath(d), sorted(fs)) for (d, fs) in self.fs.walk(search=search, workers=3))
+            self.assertEquals(found, expected)
+            seen = []
+            for dir_path, _files in self.fs.walk(search=search, workers=3):
+                if search == "breadth":
+                    self.assertTrue(dir_path in ("", "/") or dirname(dir_path) in seen)
+                else:
+                    self.assertFalse(dirname(dir_path) in seen)
+                seen.append(dir_path)
+        self.assertEquals(sorted(self.fs.walkfiles(wildcard="*.txt", workers=2)),
+                          ["/a.txt", "/baz/d.txt", "/foo/b.txt"])
+        self.assertEquals(sorted(self.fs.walkfiles(dir_wildcard="*foo*", workers=2)),
+                          ["/a.txt", "/foo/b.txt", "/foo/bar/c"])
+        self.assertEquals(sorted(self.fs.walkdirs(workers=2)),
+                          ["/", "/baz", "/foo", "/foo/bar"])
+        self.assertRaises(ResourceNotFoundError, list, self.fs.walk("nothere", workers=2))
+
+    def test_glob(self):
+        self.fs.setcontents('a.txt', b('hello'))
+        self.fs.makeopendir('foo').setcontents('b.txt', b('123'))
+        self.fs.makeopendir('foo/bar').setcontents('c.txt', b('123'))
+        self.fs.makeopendir('foo/bar/baz').setcontents('d', b('123'))
+        self.fs.makeopendir('qux').setcontents('e.txt', b('123'))
+        self.assertEquals(sorted(self.fs.glob("*.txt")), ["/a.txt"])
+        self.assertEquals(sorted(self.fs.glob("*/*.txt")),
+                          ["/foo/b.txt", "/qux/e.txt"])
+        self.assertEquals(sorted(self.fs.glob("**/*.txt")),
+                          ["/a.txt", "/foo/b.txt", "/foo/bar/c.txt", "/qux/e.txt"])
+        self.assertEquals(sorted(self.fs.glob("foo/**/?")), ["/foo/bar/baz/d"])
+        self.assertEquals(sorted(self.fs.glob("foo/**")),
+                          ["/foo/b.txt", "/foo/bar", "/foo/bar/baz", "/foo/bar/baz/d", "/foo/bar/c.txt"])
+        self.assertEquals(sorted(self.fs.glob("**/")),
+                          ["/foo", "/foo/bar", "/foo/bar/baz", "/qux"])
+        self.assertEquals(sorted(self.fs.glob("f[aeiou]o/*/baz")), ["/foo/bar/baz"])
+        self.assertEquals(sorted(self.fs.glob("*.txt", path="foo")), ["/foo/b.txt"])
+        self.assertEquals(self.fs.glob("foo/bar/c.txt"), ["/foo/bar/c.txt"])
+        self.assertEquals(self.fs.glob("foo/bar/c.txt/"), [])
+        self.assertEquals(self.fs.glob("nothere/**/*.txt"), [])
+        self.assertEquals(self.fs.glob("a.txt/*"), [])
+        self.assertEquals(list(self.fs.iglob("qux/*")), ["/qux/e.txt"])
+
     def test_unicode(self):
         alpha = u"\N{GREEK SMALL LETTER ALPHA}"
         beta = u"\N{GREEK SMALL LETTER BETA}"
@@ -528,6 +576,21 @@ class FSTestCases(object):
         self.assertEqual(self.fs.getinfokeys('info.txt', 'size', 'modified_time'), test_info)
         self.assertEqual(self.fs.getinfokeys('info.txt', 'thiscantpossiblyexistininfo'), {})
 
+    def test_getinfo_many(self):
+        self.fs.setcontents("a.txt", b("*") * 3)
+        self.fs.makeopendir("foo").setcontents("b.txt", b("*") * 5)
+        self.fs.setcontents("foo/c.txt", b("*") * 7)
+        paths = ["foo/c.txt", "a.txt", "foo/b.txt"]
+        infos = self.fs.getinfo_many(paths)
+        self.assertEqual([p for (p, _info) in infos], paths)
+        self.assertEqual([info['size'] for (_p, info) in infos], [7, 3, 5])
+        self.assertEqual(list(self.fs.igetinfo_many(paths)), infos)
+        self.assertEqual(self.fs.getinfo_many([]), [])
+        self.assertRaises(ResourceNotFoundError, self.fs.getinfo_many, ["a.txt", "foo/nothere"])
+        infos = self.fs.getinfo_many(["foo/nothere", "foo/b.txt"], ignore_errors=True)
+        self.assertEqual(infos[0], ("foo/nothere", {}))
+        self.assertEqual(infos[1][1]['size'], 5)
+
     def test_getsize(self):
         test_str = b("*") * 23
         self.fs.setcontents("info.txt", test_str)
@@ -889,6 +952,31 @@ class FSTestCases(object):
                 finally:
                     f.close()
 
+    def test_getcontents_into(self):
+        contents = b("The quick brown fox")
+        self.fs.setcontents("a.txt", contents)
+        buf = bytearray(100)
+        self.assertEqual(self.fs.getcontents_into("a.txt", buf), len(contents))
+        self.assertEqual(bytes(buf[:len(contents)]), contents)
+        #  Only as much as fits in the buffer is read
+        view = memoryview(buf)[10:15]
+        self.assertEqual(self.fs.getcontents_into("a.txt", view), 5)
+        self.assertEqual(bytes(buf[10:15]), contents[:5])
+        self.assertRaises(ResourceNotFoundError, self.fs.getcontents_into, "b.txt", buf)
+
+    def test_readinto(self):
+        contents = b("0123456789") * 1000
+        self.fs.setcontents("a.txt", contents)
+        buf = bytearray(4096)
+        with self.fs.open("a.txt", "rb") as f:
+            self.assertEqual(f.read(6), contents[:6])
+            data = []
+            count = f.readinto(buf)
+            while count:
+                data.append(bytes(buf[:count]))
+                count = f.readinto(buf)
+        self.assertEqual(b("").join(data), contents[6:])
+
     def test_settimes(self):
         def cmp_datetimes(d1, d2):
             """Test datetime objects are the same to within the timestamp accuracy"""
@@ -11,9 +11,14 @@ from fs import errors
 import unittest
 
 import os
+import errno
 import sys
 import shutil
 import tempfile
+import pickle
+import json
+
+from six import b
 
 
 from fs import osfs
@@ -38,6 +43,116 @@ class TestOSFS(unittest.TestCase,FSTestCases,ThreadingTestCases):
         self.assert_(self.fs.isvalidpath('validfile'))
         self.assert_(self.fs.isvalidpath('completely_valid/path/foo.bar'))
 
+    def test_listdirinfo_is_dir(self):
+        self.fs.makedir("foo")
+        self.fs.setcontents("bar", b("12345"))
+        info = dict(self.fs.listdirinfo())
+        self.assertTrue(info["foo"]["is_dir"])
+        self.assertFalse(info["bar"]["is_dir"])
+        self.assertEqual(info["bar"]["size"], 5)
+        self.assertEqual(info["bar"]["modified_time"], self.fs.getinfo("bar")["modified_time"])
+
+    def test_getinfo_dict(self):
+        self.fs.setcontents("bar", b("12345"))
+        info = self.fs.getinfo("bar")
+        self.assertTrue(isinstance(info, dict))
+        self.assertEqual(info["size"], 5)
+        self.assertEqual(info["st_size"], 5)
+        self.assertTrue("modified_time" in info)
+        self.assertFalse("is_dir" in info)
+        self.assertEqual(sorted(info.keys()), sorted(info.copy().keys()))
+        self.assertEqual(len(info), len(info.keys()))
+        self.assertEqual(json.loads(json.dumps(info, default=str))["size"], 5)
+        self.assertEqual(pickle.loads(pickle.dumps(info)), info)
+        self.assertEqual(type(pickle.loads(pickle.dumps(info))), dict)
+        self.assertEqual(self.fs.getinfokeys("bar", "size", "modified_time", "nothere"),
+                         {"size": 5, "modified_time": info["modified_time"]})
+        (name, info) = self.fs.listdirinfo()[0]
+        self.assertTrue(isinstance(info, dict))
+        self.assertEqual(info["is_dir"], False)
+        self.assertEqual(info.copy()["size"], 5)
+
+    def test_getinfo_lazy_times(self):
+        self.fs.setcontents("bar", b("12345"))
+        info = self.fs.getinfo("bar")
+        #  The datetimes are only built when used
+        self.assertFalse(dict.__contains__(info, "modified_time"))
+        modified_time = info["modified_time"]
+        self.assertTrue(dict.__contains__(info, "modified_time"))
+        self.assertEqual(dict(info)["modified_time"], modified_time)
+        #  Keys that haven't been computed can still be replaced or deleted
+        info["accessed_time"] = "x"
+        del info["created_time"]
+        self.assertEqual(info["accessed_time"], "x")
+        self.assertFalse("created_time" in info)
+        self.assertRaises(KeyError, info.__getitem__, "created_time")
+        self.assertEqual(info.get("created_time"), None)
+        self.assertEqual(info.copy()["accessed_time"], "x")
+        self.assertFalse("created_time" in info.copy())
+
+    def test_walk_does_not_stat_files(self):
+        self.fs.makedir("foo/bar", recursive=True)
+        self.fs.setcontents("foo/a.txt", b("a"))
+        self.fs.setcontents("foo/bar/b.txt", b("b"))
+        stats = []
+        class CountingEntry(object):
+            def __init__(self, entry):
+                self.name = entry.name
+                self.path = entry.path
+                self._entry = entry
+            def is_dir(self):
+                return self._entry.is_dir()
+            def stat(self):
+                stats.append(self.name)
+                return self._entry.stat()
+        listdir_entries = osfs._listdir_entries
+        def counting_entries(sys_path):
+            return (CountingEntry(entry) for entry in listdir_entries(sys_path))
+        osfs._listdir_entries = counting_entries
+        try:
+            self.assertEqual(sorted(self.fs.walkfiles()), ["/foo/a.txt", "/foo/bar/b.txt"])
+            self.assertEqual(sorted(self.fs.walkfiles(workers=2)), ["/foo/a.txt", "/foo/bar/b.txt"])
+            self.assertEqual(stats, [])
+            #  The entry is stat'ed once other info is needed
+            info = dict(self.fs.listdirinfo("foo"))
+            self.assertEqual(stats, [])
+            self.assertEqual(info["a.txt"]["size"], 1)
+            self.assertEqual(info["a.txt"]["modified_time"], self.fs.getinfo("foo/a.txt")["modified_time"])
+            self.assertEqual(stats, ["a.txt"])
+        finally:
+            osfs._listdir_entries = listdir_entries
+
+    def test_listdir_without_scandir(self):
+        scandir = osfs._scandir
+        osfs._scandir = None
+        try:
+            self.fs.makedir("foo")
+            self.fs.setcontents("bar", b("12345"))
+            self.assertEqual(self.fs.listdir(dirs_only=True), ["foo"])
+            self.assertEqual(self.fs.listdir(files_only=True), ["bar"])
+            info = dict(self.fs.listdirinfo(absolute=True))
+            self.assertTrue(info["/foo"]["is_dir"])
+            self.assertEqual(info["/bar"]["size"], 5)
+            self.assertRaises(errors.ResourceNotFoundError, self.fs.listdirinfo, "baz")
+        finally:
+            osfs._scandir = scandir
+
+    def test_ilistdirinfo_errors(self):
+        self.fs.setcontents("bar", b("12345"))
+        listdir_entries = osfs._listdir_entries
+        def failing_entries(sys_path):
+            for entry in listdir_entries(sys_path):
+                yield entry
+            raise OSError(errno.EIO, "Input/output error")
+        osfs._listdir_entries = failing_entries
+        try:
+            #  Errors raised while iterating are converted too
+            entries = self.fs.ilistdirinfo()
+            self.assertEqual(next(entries)[0], "bar")
+            self.assertRaises(errors.OperationFailedError, next, entries)
+        finally:
+            osfs._listdir_entries = listdir_entries
+
 
 class TestSubFS(unittest.TestCase,FSTestCases,ThreadingTestCases):
 
@@ -63,6 +178,68 @@ class TestMemoryFS(unittest.TestCase,FSTestCases,ThreadingTestCases):
     def setUp(self):
         self.fs = memoryfs.MemoryFS()
 
+    def test_getmmap(self):
+        self.fs.setcontents("a.txt", b("hello"))
+        view = self.fs.getmmap("a.txt", read_only=True)
+        self.assertTrue(view.readonly)
+        self.assertEqual(view.tobytes(), b("hello"))
+        copied = self.fs.getmmap("a.txt", copy=True)
+        copied[0:1] = b("j")
+        self.assertEqual(self.fs.getcontents("a.txt"), b("hello"))
+        self.assertEqual(copied.tobytes(), b("jello"))
+        self.assertRaises(errors.NoMMapError, self.fs.getmmap, "a.txt")
+        self.assertRaises(errors.ResourceNotFoundError, self.fs.getmmap, "b.txt", read_only=True)
+
+    def test_entry_locks(self):
+        import threading
+        self.fs.makedir("a")
+        self.fs.makedir("b")
+        self.fs.setcontents("b/f.txt", b("hello"))
+        def worker():
+            self.fs.setcontents("b/g.txt", b("world"))
+            self.fs.rename("b/g.txt", "b/h.txt")
+            self.assertEqual(sorted(self.fs.listdir("b")), ["f.txt", "h.txt"])
+        #  Holding the lock on one directory doesn't block work in another
+        entry = self.fs._lock_dir_entry("a")
+        try:
+            t = threading.Thread(target=worker)
+            t.start()
+            t.join(10)
+            self.assertFalse(t.isAlive())
+        finally:
+            entry.lock.release()
+        self.assertEqual(self.fs.getcontents("b/h.txt"), b("world"))
+
+    def test_concurrent_renames(self):
+        import threading
+        self.fs.makedir("a/b", recursive=True)
+        self.fs.makedir("c")
+        names = ["f%i" % i for i in xrange(20)]
+        for name in names:
+            self.fs.setcontents(pathjoin("a/b", name), b(name))
+        failures = []
+        def mover(src, dst):
+            try:
+                for _ in xrange(10):
+                    for name in names:
+                        try:
+                            self.fs.rename(pathjoin(src, name), pathjoin(dst, name))
+                        except (errors.ResourceNotFoundError, errors.DestinationExistsError):
+                            pass
+            except Exception, e:
+                failures.append(e)
+        threads = [threading.Thread(target=mover, args=("a/b", "c")),
+                   threading.Thread(target=mover, args=("c", "a/b")),
+                   threading.Thread(target=mover, args=("a/b", "a")),
+                   threading.Thread(target=mover, args=("a", "c"))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(failures, [])
+        found = [name for name in self.fs.walkfiles(wildcard="f*")]
+        self.assertEqual(sorted(basename(p) for p in found), sorted(names))
+
 
 from fs import mountfs
 class TestMountFS(unittest.TestCase,FSTestCases,ThreadingTestCases):
@@ -92,6 +269,49 @@ class TestMountFS_atroot(unittest.TestCase,FSTestCases,ThreadingTestCases):
     def check(self, p):
         return self.mem_fs.exists(p)
 
+class TestMountFS_rw(unittest.TestCase,FSTestCases,ThreadingTestCases):
+
+    def setUp(self):
+        self.mem_fs = memoryfs.MemoryFS()
+        self.fs = mountfs.MountFS(thread_synchronize="rw")
+        self.fs.mountdir("", self.mem_fs)
+
+    def tearDown(self):
+        self.fs.close()
+
+    def check(self, p):
+        return self.mem_fs.exists(p)
+
+    def test_concurrent_reads(self):
+        import threading
+        self.fs.setcontents("a.txt", b("hello"))
+        lock = self.fs._lock
+        results = []
+        def reader():
+            results.append(lock.acquire_read(blocking=0))
+            results.append(self.fs.exists("a.txt"))
+            lock.release_read()
+            results.append(lock.acquire(blocking=0))
+        lock.acquire_read()
+        try:
+            #  Readers don't block each other, but do block writers
+            self.assertEqual(self.fs.listdir(), ["a.txt"])
+            t = threading.Thread(target=reader)
+            t.start()
+            t.join()
+            self.assertEqual(results, [True, True, False])
+            self.assertRaises(RuntimeError, lock.acquire)
+        finally:
+            lock.release_read()
+        #  A writer can also take the read lock
+        with lock:
+            self.assertTrue(self.fs.exists("a.txt"))
+            self.fs.remove("a.txt")
+
+    def test_pickle_lock(self):
+        fs2 = pickle.loads(pickle.dumps(self.fs))
+        self.assertTrue(isinstance(fs2._lock, type(self.fs._lock)))
+
 class TestMountFS_stacked(unittest.TestCase,FSTestCases,ThreadingTestCases):
 
     def setUp(self):
@@ -4,6 +4,7 @@ from fs import iotools
 
 import io
 import unittest
+import six
 from os.path import dirname, join, abspath
 
 try:
@@ -54,3 +55,77 @@ class TestIOTools(unittest.TestCase):
         with o.open('file', 'rt') as f:
             text = f.read()
             self.assert_(isinstance(text, unicode))
+
+    def test_copy_file_data(self):
+        """Test copy_file_data"""
+        data = b"0123456789" * 1000
+        for src in (io.BytesIO(data), OpenFilelike(lambda: io.BytesIO(data)).open('file', 'rb')):
+            dst = io.BytesIO()
+            progress = []
+            self.assertEqual(iotools.copy_file_data(src, dst, 4096, progress.append), len(data))
+            self.assertEqual(dst.getvalue(), data)
+            self.assertEqual(progress, [4096, 8192, 10000])
+
+    def test_copy_file_data_to_memoryfs(self):
+        """Test copy_file_data into a MemoryFS file, through one buffer"""
+        from fs.memoryfs import MemoryFS
+        data = b"".join(six.int2byte(i) * 1000 for i in range(10))
+        mem_fs = MemoryFS()
+        written = []
+        with mem_fs.open("copy", "wb") as dst:
+            write = dst.write
+            def recording_write(chunk):
+                written.append(type(chunk))
+                return write(chunk)
+            dst.write = recording_write
+            self.assertEqual(iotools.copy_file_data(io.BytesIO(data), dst, 4096), len(data))
+        self.assertEqual(mem_fs.getcontents("copy"), data)
+        #  No new string was made for each chunk
+        self.assertTrue(written)
+        self.assertFalse(bytes in written)
+
+    def test_copy_file_data_needs_strings(self):
+        """Test copy_file_data into a file that only accepts strings"""
+        data = b"".join(six.int2byte(i) * 1000 for i in range(10))
+        class StringsOnly(object):
+            def __init__(self):
+                self.chunks = []
+            def write(self, chunk):
+                if not isinstance(chunk, bytes):
+                    raise TypeError("expected bytes")
+                self.chunks.append(chunk)
+        dst = StringsOnly()
+        self.assertEqual(iotools.copy_file_data(io.BytesIO(data), dst, 4096), len(data))
+        self.assertEqual(b"".join(dst.chunks), data)
+
+    def test_filelike_write_keeps_copy_of_buffer(self):
+        """Test that FileLikeBase doesn't keep a reference to a written buffer"""
+        from fs.filelike import FileLikeBase
+        class Chunked(FileLikeBase):
+            #  Writes whole 4-byte blocks and hands back the rest
+            def __init__(self):
+                super(Chunked, self).__init__()
+                self.data = b""
+            def _write(self, string, flushing=False):
+                n = len(string) if flushing else len(string) - len(string) % 4
+                self.data += memoryview(string)[:n].tobytes()
+                return string[n:]
+        f = Chunked()
+        buf = bytearray(b"abcdef")
+        f.write(memoryview(buf))
+        buf[:] = b"ghijkl"
+        f.write(memoryview(buf))
+        f.flush()
+        self.assertEqual(f.data, b"abcdefghijkl")
+
+    def test_readinto(self):
+        """Test readinto on a wrapped file without its own readinto"""
+        class NoReadInto(object):
+            def __init__(self, data):
+                self._f = io.BytesIO(data)
+            def read(self, size=-1):
+                return self._f.read(size)
+        f = iotools.RawWrapper(NoReadInto(b"hello world"), mode='rb')
+        buf = bytearray(5)
+        self.assertEqual(f.readinto(buf), 5)
+        self.assertEqual(bytes(buf), b"hello")
@@ -58,6 +58,30 @@ class TestPathFunctions(unittest.TestCase):
         self.assertRaises(ValueError, pathjoin, "a/b", "../../..")
         self.assertRaises(ValueError, pathjoin, "a/b/../../../d")
 
+    def test_normalizedpath(self):
+        path = NormalizedPath(u"a/b")
+        self.assertTrue(normpath(path) is path)
+        self.assertEqual(type(abspath(path)), NormalizedPath)
+        self.assertEqual(abspath(path), u"/a/b")
+        self.assertEqual(type(relpath(abspath(path))), NormalizedPath)
+        self.assertEqual(relpath(abspath(path)), u"a/b")
+
+    def test_normpath_cache(self):
+        enable_normpath_cache(2)
+        try:
+            self.assertEqual(normpath(u"a/b/../c/"), u"a/c")
+            self.assertTrue(normpath(u"a/b/../c/") is normpath(u"a/b/../c/"))
+            self.assertEqual(type(normpath(u"/a//b")), NormalizedPath)
+            self.assertEqual(normpath(u"/a//b"), u"/a/b")
+            self.assertEqual(normpath(u"x/"), u"x")
+            self.assertEqual(normpath("a/b/../c"), "a/c")
+            self.assertEqual(pathjoin(u"/a/b", u"../c"), u"/a/c")
+            self.assertEqual(type(pathjoin(u"/a/b", u"../c")), NormalizedPath)
+            self.assertRaises(ValueError, normpath, u"a/../..")
+        finally:
+            disable_normpath_cache()
+        self.assertEqual(type(normpath(u"a/b/../c/")), unicode)
+
     def test_relpath(self):
         tests = [   ("/a/b", "a/b"),
                     ("a/b", "a/b"),
@@ -150,6 +174,39 @@ class TestPathFunctions(unittest.TestCase):
         self.assertFalse(iswildcard('img.jpg'))
         self.assertFalse(iswildcard('foo/bar'))
 
+    def test_compile_wildcard(self):
+        self.assertTrue(compile_wildcard('*.jpg').match('img.jpg'))
+        self.assertFalse(compile_wildcard('*.jpg').match('img.JPG'))
+        self.assertTrue(compile_wildcard('*.jpg') is compile_wildcard('*.jpg'))
+        match = compile_wildcards(['*.pyc', '.svn', 'CVS']).match
+        self.assertTrue(match('foo.pyc'))
+        self.assertTrue(match('.svn'))
+        self.assertTrue(match('CVS'))
+        self.assertFalse(match('.svnignore'))
+        self.assertFalse(match('foo.py'))
+        self.assertFalse(compile_wildcards([]).match('foo'))
+
+    def test_wildcard_matcher(self):
+        self.assertTrue(wildcard_matcher(None)('anything'))
+        callback = lambda name: name == 'foo'
+        self.assertTrue(wildcard_matcher(callback) is callback)
+        self.assertTrue(wildcard_matcher('f*')('foo'))
+        self.assertFalse(wildcard_matcher('f*')('bar'))
+        self.assertTrue(wildcard_matcher(['f*', 'b*'])('bar'))
+        self.assertFalse(wildcard_matcher(('f*', 'b*'))('qux'))
+        #  With normcase, matching follows the platform's case rules
+        import ntpath
+        import os.path
+        normcase = os.path.normcase
+        self.assertFalse(wildcard_matcher('*.jpg', normcase=True)('img.JPG'))
+        os.path.normcase = ntpath.normcase
+        try:
+            self.assertTrue(wildcard_matcher('*.jpg', normcase=True)('img.JPG'))
+            self.assertTrue(wildcard_matcher(['*.JPG'], normcase=True)('img.jpg'))
+            self.assertFalse(wildcard_matcher('*.jpg')('img.JPG'))
+        finally:
+            os.path.normcase = normcase
+
     def test_realtivefrom(self):
         tests = [('/', '/foo.html', 'foo.html'),
                  ('/foo', '/foo/bar.html', 'bar.html'),
@@ -196,4 +253,73 @@ class Test_PathMap(unittest.TestCase):
         self.assertEquals(set(map.iterkeys()),set(("/hello/world","/hello/world/howareya","/hello/world/iamfine","/hello/kitty","/batman/isawesome")))
         self.assertEquals(set(map.values()),set(range(1,7)) - set((5,)))
 
-
+    def test_removal(self):
+        map = PathMap()
+        map["hello/world"] = 1
+        map["hello/world/howareya"] = 2
+        map["hello/kitty"] = 3
+        self.assertEquals(map.pop("hello/world"),1)
+        self.assertEquals(map.pop("hello/world"),None)
+        self.assertTrue("hello/world/howareya" in map)
+        self.assertFalse("hello/world" in map)
+        self.assertRaises(KeyError,map.__delitem__,"hello")
+        self.assertEquals(map.setdefault("hello/kitty",4),3)
+        map.clear("hello/world")
+        self.assertEquals(map.keys(),["/hello/kitty"])
+        self.assertEquals(map.names("/hello"),["kitty"])
+        del map["hello/kitty"]
+        self.assertEquals(map.keys(),[])
+        self.assertEquals(map.names(),[])
+
+    def test_update(self):
+        map = PathMap()
+        map.update([("/",0),("a/b",1),("a/c",2),("a/b/d",3),("e",4)])
+        map.update({"a/c":5})
+        self.assertEquals(sorted(map.items()),[("/",0),("/a/b",1),("/a/b/d",3),("/a/c",5),("/e",4)])
+        copy = PathMap()
+        copy.update(map)
+        self.assertEquals(sorted(copy.items()),sorted(map.items()))
+
+    def test_pickle(self):
+        import pickle
+        map = PathMap()
+        map["hello/world"] = 1
+        map["hello/kitty"] = 2
+        map2 = pickle.loads(pickle.dumps(map))
+        self.assertEquals(sorted(map2.items()),sorted(map.items()))
+
+
+
+
+class Test_GlobPattern(unittest.TestCase):
+
+    def test_match(self):
+        from fs.globbing import GlobPattern
+        pattern = GlobPattern("/logs/2014/*-??/**/*.gz")
+        self.assertEquals(pattern.prefix, "logs/2014")
+        self.assertTrue(pattern.recursive)
+        self.assertTrue(pattern.match("jan-01/app.gz"))
+        self.assertTrue(pattern.match("jan-01/a/b/app.gz"))
+        self.assertFalse(pattern.match("jan-01/a/b/app.txt"))
+        self.assertFalse(pattern.match("january/app.gz"))
+        pattern = GlobPattern("src/*.py")
+        self.assertEquals(pattern.prefix, "src")
+        self.assertFalse(pattern.recursive)
+        self.assertTrue(pattern.match("setup.py"))
+        self.assertFalse(pattern.match("fs/setup.py"))
+
+    def test_pruning(self):
+        from fs.globbing import GlobPattern
+        pattern = GlobPattern("*-??/**/*.gz")
+        self.assertFalse(pattern.advance(pattern.start(), "january"))
+        state = pattern.advance(pattern.start(), "jan-01")
+        self.assertFalse(pattern.is_match(state))
+        self.assertTrue(pattern.can_descend(state))
+        pattern = GlobPattern("*/*.txt")
+        state = pattern.advance(pattern.advance(pattern.start(), "foo"), "a.txt")
+        self.assertTrue(pattern.is_match(state))
+        self.assertFalse(pattern.can_descend(state))
+        pattern = GlobPattern("*/bar/*.txt")
+        state = pattern.advance(pattern.start(), "foo")
+        self.assertEquals(pattern.literal_names(state), ["bar"])
+        self.assertEquals(pattern.literal_names(pattern.start()), None)
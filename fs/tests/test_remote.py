@@ -8,6 +8,7 @@
 
 from fs.tests import FSTestCases, ThreadingTestCases
 
+import os
 import unittest
 import threading
 import random
@@ -231,6 +232,139 @@ class TestRemoteFileBuffer(unittest.TestCase, FSTestCases, ThreadingTestCases):
         self.assertEquals(f.read(), contents[:10] + contents2)
         f.close()
 
+    def test_buffer_budget(self):
+        '''
+            Buffers are moved to disk when the memory budget
+            shared by all RemoteFileBuffers is used up.
+        '''
+        budget = BufferBudget(1000)
+        f1 = self.fs.open('test1.txt', 'wb')
+        f2 = self.fs.open('test2.txt', 'wb')
+        f1.buffer_budget = f2.buffer_budget = budget
+        f1.write(b('x') * 600)
+        f1.flush()
+        self.assertEquals(budget.used, 600)
+        self.assertFalse(f1.wrapped_file.wrapped_file._rolled)
+        f2.write(b('y') * 600)
+        f2.flush()
+        self.assertEquals(budget.used, 600)
+        self.assertTrue(f2.wrapped_file.wrapped_file._rolled)
+        # Truncating or rewriting the middle of a buffer is accounted for
+        f1.truncate(100)
+        self.assertEquals(budget.used, 100)
+        f1.seek(0)
+        f1.write(b('z') * 50)
+        f1.flush()
+        self.assertEquals(budget.used, 100)
+        f1.truncate(600)
+        f1.seek(0, 2)
+        f1.write(b('x') * 100)
+        f1.flush()
+        self.assertEquals(budget.used, 700)
+        f1.close()
+        f2.close()
+        self.assertEquals(budget.used, 0)
+        self.assertEquals(self.fs.getcontents('test1.txt'),
+                          b('z') * 50 + b('x') * 50 + b('\0') * 500 + b('x') * 100)
+        self.assertEquals(self.fs.getcontents('test2.txt'), b('y') * 600)
+        # Files known to be too big for memory go straight to disk
+        f = RemoteFileBuffer(self.fs, 'test1.txt', 'rb',
+                             self.fs.open('test1.txt', 'rb'),
+                             size=RemoteFileBuffer.max_size_in_memory + 1)
+        self.assertTrue(f.wrapped_file.wrapped_file._rolled)
+        f.close()
+
+
+class RangeTempFS(RemoteTempFS):
+    """
+        RemoteTempFS that provides read_range(), recording
+        each range that is read from it
+    """
+    def __init__(self, *args, **kwds):
+        super(RangeTempFS, self).__init__(*args, **kwds)
+        self.ranges_read = []
+
+    def open(self, path, mode='rb', write_on_flush=True, **kwargs):
+        if RemoteFileBuffer._can_read_ranges(self, mode, 0) and self.isfile(path):
+            return RemoteFileBuffer(self, path, mode,
+                                    size=self.getsize(path))
+        return super(RangeTempFS, self).open(path, mode,
+                                             write_on_flush=write_on_flush,
+                                             **kwargs)
+
+    def read_range(self, path, offset, length):
+        self.ranges_read.append((offset, length))
+        with super(RemoteTempFS, self).open(path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+
+class TestRemoteFileBuffer_ranges(unittest.TestCase, FSTestCases, ThreadingTestCases):
+
+    def setUp(self):
+        self.fs = RangeTempFS()
+
+    def tearDown(self):
+        self.fs.close()
+
+    def _make_big_file(self):
+        self.contents = os.urandom(1024 * 1024)
+        self.fs.setcontents('big.bin', self.contents)
+        self.fs.ranges_read = []
+
+    def test_only_read_ranges_are_fetched(self):
+        self._make_big_file()
+        with self.fs.open('big.bin', 'rb') as f:
+            f.seek(500000)
+            self.assertEquals(f.read(10), self.contents[500000:500010])
+            f.seek(-10, SEEK_END)
+            self.assertEquals(f.read(), self.contents[-10:])
+            self.assertEquals(f.tell(), len(self.contents))
+        fetched = sum(length for (_, length) in self.fs.ranges_read)
+        self.assertTrue(fetched <= 2 * RemoteFileBuffer.min_read_ahead)
+        #  Data already in the buffer is not fetched again
+        self.fs.ranges_read = []
+        with self.fs.open('big.bin', 'rb') as f:
+            f.seek(1000)
+            self.assertEquals(f.read(100), self.contents[1000:1100])
+            f.seek(1050)
+            self.assertEquals(f.read(100), self.contents[1050:1150])
+        self.assertEquals(len(self.fs.ranges_read), 1)
+
+    def test_sequential_reads_grow_read_ahead(self):
+        self._make_big_file()
+        with self.fs.open('big.bin', 'rb') as f:
+            chunks = []
+            while True:
+                data = f.read(4096)
+                if not data:
+                    break
+                chunks.append(data)
+        self.assertEquals(b("").join(chunks), self.contents)
+        lengths = [length for (_, length) in self.fs.ranges_read]
+        self.assertEquals(sum(lengths), len(self.contents))
+        self.assertEquals(lengths[:3], [RemoteFileBuffer.min_read_ahead,
+                                        2 * RemoteFileBuffer.min_read_ahead,
+                                        4 * RemoteFileBuffer.min_read_ahead])
+        self.assertTrue(len(lengths) < 6)
+
+    def test_sequential_reads_release_ranges(self):
+        self._make_big_file()
+        with self.fs.open('big.bin', 'rb') as f:
+            f.release_threshold = 256 * 1024
+            chunks = []
+            while True:
+                data = f.read(4096)
+                if not data:
+                    break
+                chunks.append(data)
+                self.assertTrue(f.tell() - f._ranges[0][0] <=
+                                f.release_threshold + 2 * 4096)
+            self.assertEquals(b("").join(chunks), self.contents)
+            # Released ranges are fetched again when needed
+            f.seek(1000)
+            self.assertEquals(f.read(10), self.contents[1000:1010])
+
 
 class TestCacheFS(unittest.TestCase,FSTestCases,ThreadingTestCases):
     """Test simple operation of CacheFS"""
@@ -275,6 +409,257 @@ class TestCacheFS(unittest.TestCase,FSTestCases,ThreadingTestCases):
         finally:
             self.fs.cache_timeout = old_timeout
 
+    def test_recently_used_values_are_kept(self):
+        fs = CacheFS(self.wrapped_fs,cache_timeout=None,max_cache_size=3)
+        for name in ("a","b","c","d"):
+            self.wrapped_fs.setcontents(name,b("data"))
+        for name in ("a","b","c"):
+            self.assertTrue(fs.isfile(name))
+        self.assertTrue(fs.isfile("a"))
+        self.assertTrue(fs.isfile("d"))
+        for name in ("a","b","c","d"):
+            self.wrapped_fs.remove(name)
+        self.assertTrue(fs.isfile("a"))
+        self.assertFalse(fs.isfile("b"))
+        self.assertTrue(fs.isfile("d"))
+
+    def test_values_are_refreshed_in_background(self):
+        fs = CacheFS(self.wrapped_fs,cache_timeout=None,cache_soft_timeout=0.01)
+        try:
+            self.wrapped_fs.setcontents("hello",b("world"))
+            self.assertEquals(fs.getsize("hello"),5)
+            self.wrapped_fs.setcontents("hello",b("worldworld"))
+            time.sleep(0.05)
+            self.assertEquals(fs.getsize("hello"),5)
+            for _ in xrange(100):
+                if fs.getsize("hello") == 10:
+                    break
+                time.sleep(0.01)
+            self.assertEquals(fs.getsize("hello"),10)
+        finally:
+            fs.close()
+
+    def test_concurrent_misses_are_coalesced(self):
+        calls = []
+        gate = threading.Event()
+        class SlowFS(WrapFS):
+            def getinfo(self,path):
+                calls.append(path)
+                gate.wait(5)
+                if path == "missing":
+                    raise ResourceNotFoundError(path)
+                return super(SlowFS,self).getinfo(path)
+        self.wrapped_fs.setcontents("hello",b("world"))
+        fs = CacheFS(SlowFS(self.wrapped_fs),cache_timeout=None)
+        results = []
+        def check(path):
+            results.append(fs.isfile(path))
+        threads = [threading.Thread(target=check,args=(path,))
+                   for path in ["hello","missing"] * 5]
+        for t in threads:
+            t.start()
+        #  Let every thread reach the in-flight call before it completes
+        time.sleep(0.2)
+        gate.set()
+        for t in threads:
+            t.join()
+        self.assertEquals(sorted(results),[False] * 5 + [True] * 5)
+        self.assertEquals(calls.count("hello"),1)
+        self.assertEquals(calls.count("missing"),1)
+        #  Misses aren't cached, so a later lookup fetches again
+        self.assertFalse(fs.exists("missing"))
+        self.assertTrue(fs.exists("hello"))
+        self.assertEquals(calls.count("missing"),2)
+        self.assertEquals(calls.count("hello"),1)
+
+    def test_single_flight_interrupted(self):
+        started = threading.Event()
+        release = threading.Event()
+        class InterruptedFS(WrapFS):
+            def getinfo(self,path):
+                started.set()
+                release.wait(5)
+                raise KeyboardInterrupt
+        fs = CacheFS(InterruptedFS(self.wrapped_fs),cache_timeout=None)
+        errors = []
+        def owner():
+            try:
+                fs.getinfo("hello")
+            except KeyboardInterrupt:
+                errors.append("owner")
+        def waiter():
+            try:
+                fs.getinfo("hello")
+            except KeyboardInterrupt:
+                errors.append("waiter")
+        t1 = threading.Thread(target=owner)
+        t1.start()
+        started.wait(5)
+        t2 = threading.Thread(target=waiter)
+        t2.setDaemon(True)
+        t2.start()
+        time.sleep(0.1)
+        release.set()
+        t1.join()
+        t2.join(5)
+        self.assertFalse(t2.isAlive())
+        self.assertEquals(sorted(errors),["owner","waiter"])
+
+    def test_prefetch(self):
+        calls = []
+        class CountingFS(WrapFS):
+            def getinfo(self,path):
+                calls.append(path)
+                return super(CountingFS,self).getinfo(path)
+        self.wrapped_fs.makedir("a/b/c",recursive=True)
+        self.wrapped_fs.setcontents("a/hello",b("world"))
+        self.wrapped_fs.setcontents("a/b/c/bye",b("world"))
+        fs = CacheFS(CountingFS(self.wrapped_fs),cache_timeout=None)
+        self.assertEquals(fs.prefetch("/",workers=2),4)
+        self.assertTrue(fs.isdir("a/b"))
+        self.assertTrue(fs.isfile("a/b/c/bye"))
+        self.assertFalse(fs.exists("a/missing"))
+        self.assertFalse(fs.exists("a/b/c/missing"))
+        self.assertRaises(ResourceNotFoundError,fs.open,"a/missing")
+        self.assertEquals(calls,[])
+        f = fs.open("a/new","wb")
+        f.write(b("data"))
+        f.close()
+        self.assertTrue(fs.isfile("a/new"))
+        fs.makedir("a/x/y",recursive=True)
+        self.assertTrue(fs.isdir("a/x"))
+        fs2 = CacheFS(self.wrapped_fs,cache_timeout=None)
+        self.assertEquals(fs2.prefetch("a",depth=1,include_files=False),1)
+        self.wrapped_fs.removedir("a/b",force=True)
+        self.assertTrue(fs2.isdir("a/b"))
+        self.assertFalse(fs2.exists("a/b/c"))
+
+    def test_max_cache_bytes(self):
+        fs = CacheFS(self.wrapped_fs,cache_timeout=None,max_cache_size=None,max_cache_bytes=1)
+        for name in ("a","b"):
+            self.wrapped_fs.setcontents(name,b("data"))
+            self.assertTrue(fs.isfile(name))
+        for name in ("a","b"):
+            self.wrapped_fs.remove(name)
+        self.assertFalse(fs.isfile("a"))
+        self.assertTrue(fs.isfile("b"))
+
+    def test_cache_bytes_accounting(self):
+        from fs.remote import _cached_info_size
+        fs = CacheFS(self.wrapped_fs,cache_timeout=None)
+        fs.makedir("a")
+        fs.setcontents("a/b",b("data"))
+        #  The stub entry for the new file is replaced by its full info,
+        #  which must be accounted at its new size
+        fs.listdir("a")
+        cache = fs._CacheFSMixin__cache
+        expected = sum(_cached_info_size(path,ci) for (path,ci) in cache.items())
+        self.assertEquals(fs._CacheFSMixin__cache_bytes,expected)
+
+
+
+class TestCacheFS_contents(TestCacheFS):
+    """Test CacheFS with a cache of file contents"""
+
+    def setUp(self):
+        super(TestCacheFS_contents,self).setUp()
+        self.fs.content_cache = BlockCache(block_size=7,max_bytes=1024)
+
+    def test_contents_are_used_from_cache(self):
+        self.fs.cache_timeout = None
+        data = b("0123456789") * 10
+        self.wrapped_fs.setcontents("hello",data)
+        f = self.fs.open("hello","rb")
+        try:
+            f.seek(33)
+            self.assertEquals(f.read(10),data[33:43])
+            f.seek(-5,SEEK_END)
+            self.assertEquals(f.read(),data[-5:])
+        finally:
+            f.close()
+        self.assertEquals(self.fs.getcontents("hello"),data)
+        self.wrapped_fs.setcontents("hello",b("x") * 100)
+        self.assertEquals(self.fs.getcontents("hello"),data)
+        self.fs.clear_cache("hello")
+        self.assertEquals(self.fs.getcontents("hello"),b("x") * 100)
+
+    def test_least_recently_used_blocks_are_evicted(self):
+        cache = self.fs.content_cache
+        self.wrapped_fs.setcontents("hello",b("y") * 2000)
+        self.assertEquals(self.fs.getcontents("hello"),b("y") * 2000)
+        self.assertTrue(cache.size <= cache.max_bytes)
+        self.assertTrue(0 < len(cache) < 2000 // 7)
+        self.fs.remove("hello")
+        self.assertEquals(len(cache),0)
+        self.assertEquals(cache.size,0)
+
+    def test_contents_without_validator_are_not_cached(self):
+        class NoTimesFS(WrapFS):
+            def getinfo(self,path):
+                info = super(NoTimesFS,self).getinfo(path)
+                info.pop("modified_time",None)
+                return info
+        cache = BlockCache(block_size=7,max_bytes=1024)
+        fs = CacheFS(NoTimesFS(self.wrapped_fs),cache_timeout=None,content_cache=cache)
+        try:
+            self.wrapped_fs.setcontents("hello",b("0123456789"))
+            self.assertEquals(fs.getcontents("hello"),b("0123456789"))
+            self.assertEquals(len(cache),0)
+            #  A rewrite of the same size must not be hidden by the cache
+            self.wrapped_fs.setcontents("hello",b("9876543210"))
+            self.assertEquals(fs.getcontents("hello"),b("9876543210"))
+        finally:
+            fs.close()
+
+
+class TestCacheFS_persistent(TestCacheFS):
+    """Test CacheFS with a persistent store of cached info"""
+
+    def setUp(self):
+        super(TestCacheFS_persistent,self).setUp()
+        self.store_fs = TempFS()
+        self.store_path = self.store_fs.getsyspath("cache.db")
+        self.fs.persistent_cache = SqliteCacheStore(self.store_path)
+
+    def tearDown(self):
+        super(TestCacheFS_persistent,self).tearDown()
+        self.store_fs.close()
+
+    def _reopen(self):
+        self.fs.persistent_cache.close()
+        return CacheFS(self.wrapped_fs,cache_timeout=None,
+                       persistent_cache=SqliteCacheStore(self.store_path),
+                       persistent_cache_key="test")
+
+    def test_values_are_loaded_from_store(self):
+        self.fs.cache_timeout = None
+        self.fs.persistent_cache_key = "test"
+        self.wrapped_fs.makedir("dir")
+        self.wrapped_fs.setcontents("dir/hello",b("world"))
+        self.wrapped_fs.setcontents("dir/bye",b("world"))
+        self.assertEquals(sorted(self.fs.listdir("dir")),["bye","hello"])
+        self.wrapped_fs.removedir("dir",force=True)
+        fs = self._reopen()
+        self.assertTrue(fs.isfile("dir/hello"))
+        self.assertEquals(fs.getsize("dir/bye"),5)
+        fs.clear_cache("dir/hello")
+        self.assertFalse(fs.isfile("dir/hello"))
+        self.fs = fs
+        fs = self._reopen()
+        self.assertFalse(fs.isfile("dir/hello"))
+        self.assertTrue(fs.isfile("dir/bye"))
+        fs.persistent_cache.close()
+
+    def test_expired_values_are_not_loaded(self):
+        self.fs.persistent_cache_key = "test"
+        self.wrapped_fs.setcontents("hello",b("world"))
+        self.assertTrue(self.fs.isfile("hello"))
+        self.wrapped_fs.remove("hello")
+        time.sleep(0.05)
+        fs = self._reopen()
+        fs.cache_timeout = 0.01
+        self.assertFalse(fs.isfile("hello"))
+        fs.persistent_cache.close()
 
 
 class TestConnectionManagerFS(unittest.TestCase,FSTestCases):#,ThreadingTestCases):
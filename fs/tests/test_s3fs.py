@@ -8,14 +8,24 @@ attribute the True on te TestS3FS class to get them running.
 
 """
 
+import os
+import re
+import time
+import hashlib
 import unittest
+import threading
 
 from fs.tests import FSTestCases, ThreadingTestCases
 from fs.path import *
+from fs.errors import ResourceNotFoundError, OperationFailedError
 
-from six import PY3
+import six
+from six import PY3, b
 try:
     from fs import s3fs
+    from boto.exception import S3ResponseError
+    from boto.s3.prefix import Prefix
+    from boto.s3.multipart import MultiPartUpload
 except ImportError:
     raise unittest.SkipTest("s3fs wasn't importable")    
     
@@ -57,3 +67,357 @@ class TestS3FS_prefix(TestS3FS):
 
     def tearDown(self):
         self.fs.close()
+
+
+class FakeS3Key(object):
+    """In-memory stand-in for a boto S3 key."""
+
+    def __init__(self, bucket, name, data=None):
+        self.bucket = bucket
+        self.name = name
+        if data is not None:
+            self._set_data(data)
+        self._stream = None
+
+    def _set_data(self, data):
+        self.data = data
+        self.size = len(data)
+        self.etag = '"%s"' % (hashlib.md5(data).hexdigest(),)
+        self.last_modified = time.strftime("%a, %d %b %Y %H:%M:%S GMT",
+                                           time.gmtime())
+
+    def set_contents_from_string(self, data, **kwds):
+        self.set_contents_from_file(six.BytesIO(data), **kwds)
+
+    def set_contents_from_file(self, fp, query_args=None, **kwds):
+        self._set_data(fp.read())
+        if query_args is not None:
+            #  Uploading a part of a multipart upload
+            args = dict(arg.split("=") for arg in query_args.split("&"))
+            self.bucket._upload_part(args["uploadId"],
+                                     int(args["partNumber"]), self)
+        else:
+            self.bucket._put_key(self)
+
+    def get_contents_as_string(self, headers=None, **kwds):
+        data = self.bucket._get_data(self.name)
+        if headers and "If-Match" in headers:
+            if headers["If-Match"] != self.bucket.keys[self.name][1]:
+                raise S3ResponseError(412, "Precondition Failed")
+        if headers and "Range" in headers:
+            (start, end) = headers["Range"][len("bytes="):].split("-")
+            start = int(start)
+            if start >= len(data):
+                raise S3ResponseError(416, "Requested Range Not Satisfiable")
+            data = data[start:int(end) + 1]
+        self.bucket.bytes_read += len(data)
+        return data
+
+    def read(self, size=0):
+        if self._stream is None:
+            self._stream = six.BytesIO(self.get_contents_as_string())
+        if not size:
+            return self._stream.read()
+        return self._stream.read(size)
+
+    def close(self):
+        self._stream = None
+
+
+class FakeS3Bucket(object):
+    """In-memory stand-in for a boto S3 bucket, for testing S3FS locally."""
+
+    name = "fake-bucket"
+
+    def __init__(self):
+        self.keys = {}
+        self.uploads = {}
+        self.parts_uploaded = 0
+        self.bytes_read = 0
+        self._lock = threading.RLock()
+
+    def _put_key(self, key):
+        with self._lock:
+            self.keys[key.name] = (key.data, key.etag, key.last_modified)
+
+    def _get_data(self, name):
+        with self._lock:
+            try:
+                return self.keys[name][0]
+            except KeyError:
+                raise S3ResponseError(404, "Not Found")
+
+    def _upload_part(self, upload_id, part_num, key):
+        with self._lock:
+            self.uploads[upload_id][part_num] = (key.data, key.etag)
+            self.parts_uploaded += 1
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def new_key(self, name):
+        return FakeS3Key(self, name)
+
+    def get_key(self, name, headers=None):
+        with self._lock:
+            if name not in self.keys:
+                return None
+            (data, etag, last_modified) = self.keys[name]
+        k = FakeS3Key(self, name)
+        (k.size, k.etag, k.last_modified) = (len(data), etag, last_modified)
+        return k
+
+    def list(self, prefix="", delimiter=""):
+        with self._lock:
+            names = sorted(self.keys)
+        prefixes = set()
+        for name in names:
+            if not name.startswith(prefix):
+                continue
+            i = name.find(delimiter, len(prefix)) if delimiter else -1
+            if i == -1:
+                yield self.get_key(name)
+            elif name[:i + 1] not in prefixes:
+                prefixes.add(name[:i + 1])
+                yield Prefix(self, name[:i + 1])
+
+    def delete_key(self, name):
+        with self._lock:
+            self.keys.pop(name, None)
+
+    def copy_key(self, dst, src_bucket_name, src):
+        with self._lock:
+            if src not in self.keys:
+                raise S3ResponseError(404, "Not Found")
+            self.keys[dst] = self.keys[src]
+
+    def initiate_multipart_upload(self, name):
+        with self._lock:
+            upload = MultiPartUpload(self)
+            upload.key_name = name
+            upload.id = str(len(self.uploads) + 1)
+            self.uploads[upload.id] = {}
+            return upload
+
+    def complete_multipart_upload(self, name, upload_id, xml):
+        parts = re.findall("<PartNumber>(\d+)</PartNumber><ETag>([^<]*)</ETag>", xml)
+        with self._lock:
+            uploaded = self.uploads.pop(upload_id)
+            data = b("")
+            for (part_num, etag) in parts:
+                assert uploaded[int(part_num)][1] == etag
+                data += uploaded[int(part_num)][0]
+            k = FakeS3Key(self, name, data)
+            k.etag = '"%s-%d"' % (hashlib.md5(data).hexdigest(), len(parts))
+            self._put_key(k)
+            return k
+
+    def cancel_multipart_upload(self, name, upload_id):
+        with self._lock:
+            self.uploads.pop(upload_id, None)
+
+
+class LocalS3FS(s3fs.S3FS):
+    """S3FS that stores its keys in a FakeS3Bucket."""
+
+    def __init__(self, *args, **kwds):
+        self.fake_bucket = FakeS3Bucket()
+        super(LocalS3FS, self).__init__(FakeS3Bucket.name, *args,
+                                        aws_access_key="key",
+                                        aws_secret_key="secret", **kwds)
+
+    @property
+    def _s3bukt(self):
+        return self.fake_bucket
+
+
+class TestS3FS_local(TestS3FS):
+
+    __test__ = True
+
+    def setUp(self):
+        self.fs = LocalS3FS()
+
+    def tearDown(self):
+        self.fs.close()
+
+    def test_streaming_upload(self):
+        part_size = self.fs._upload_part_size
+        contents = os.urandom(part_size * 5 / 2)
+        with self.fs.open("big.bin", "wb") as f:
+            for i in xrange(0, len(contents), 64 * 1024):
+                f.write(contents[i:i + 64 * 1024])
+            #  Full parts are uploaded while the file is still being written
+            self.assertEquals(len(f._f._parts), 2)
+        self.assertEquals(self.fs.fake_bucket.parts_uploaded, 3)
+        self.assertEquals(self.fs.getcontents("big.bin"), contents)
+        #  Small files are sent in a single request
+        self.fs.setcontents("small.txt", b("hello"))
+        self.assertEquals(self.fs.fake_bucket.parts_uploaded, 3)
+        self.assertEquals(self.fs.getcontents("small.txt"), b("hello"))
+        #  So are the contents of large files given to setcontents
+        self.fs.setcontents("big2.bin", six.BytesIO(contents))
+        self.assertEquals(self.fs.fake_bucket.parts_uploaded, 6)
+        self.assertEquals(self.fs.getcontents("big2.bin"), contents)
+
+    def test_streaming_upload_truncate(self):
+        part_size = self.fs._upload_part_size
+        with self.fs.open("big.bin", "wb") as f:
+            f.write(b("a") * 10)
+            f.truncate(part_size * 3)
+            f.write(b("b") * (part_size + 10))
+            f.seek(part_size * 2)
+            f.write(b("c"))
+        contents = self.fs.getcontents("big.bin")
+        self.assertEquals(len(contents), part_size * 3)
+        self.assertEquals(contents[:10], b("a") * 10)
+        self.assertEquals(contents[10:part_size + 20], b("b") * (part_size + 10))
+        self.assertEquals(contents[part_size * 2:part_size * 2 + 2], b("c\0"))
+
+    def test_parallel_download(self):
+        self.fs._download_part_size = 1024 * 1024
+        contents = os.urandom(5 * 1024 * 1024 + 1000)
+        self.fs.setcontents("big.bin", contents)
+        self.fs.fake_bucket.bytes_read = 0
+        self.assertEquals(self.fs.getcontents("big.bin"), contents)
+        self.assertEquals(self.fs.fake_bucket.bytes_read, len(contents))
+        buf = bytearray(len(contents) - 10)
+        self.assertEquals(self.fs.getcontents_into("big.bin", buf), len(buf))
+        self.assertEquals(bytes(buf), contents[:-10])
+        #  Copies to other filesystems download in parallel too
+        from fs.memoryfs import MemoryFS
+        from fs.utils import copyfile
+        mem_fs = MemoryFS()
+        copyfile(self.fs, "big.bin", mem_fs, "copy.bin")
+        self.assertEquals(mem_fs.getcontents("copy.bin"), contents)
+        self.assertRaises(ResourceNotFoundError, copyfile,
+                          self.fs, "missing.bin", mem_fs, "missing.bin")
+        self.assertFalse(mem_fs.exists("missing.bin"))
+
+    def test_read_ranges_of_one_version(self):
+        contents = os.urandom(1024 * 1024)
+        self.fs.setcontents("big.bin", contents)
+        with self.fs.open("big.bin", "rb") as f:
+            self.assertEquals(f.read(10), contents[:10])
+            #  Ranges of a newer version of the file are not mixed in
+            self.fs.setcontents("big.bin", os.urandom(1024 * 1024))
+            f.seek(-10, 2)
+            self.assertRaises(OperationFailedError, f.read)
+
+    def test_move_onto_itself(self):
+        from fs.utils import movefile
+        other_fs = LocalS3FS()
+        other_fs.fake_bucket = self.fs.fake_bucket
+        self.fs.setcontents("a.txt", b("hello"))
+        #  Both filesystems name the same key, which must not be deleted
+        movefile(self.fs, "a.txt", other_fs, "a.txt", overwrite=True)
+        self.assertEquals(self.fs.getcontents("a.txt"), b("hello"))
+        self.fs.move("a.txt", "a.txt", overwrite=True)
+        self.assertEquals(self.fs.getcontents("a.txt"), b("hello"))
+        self.assertRaises(ResourceNotFoundError, other_fs.move_from,
+                          self.fs, "missing.txt", "missing.txt", True)
+
+    def test_glob_ignore_errors(self):
+        self.fs.setcontents("a/b.txt", b("hello"))
+        def failing_list(*args, **kwds):
+            raise S3ResponseError(500, "Internal Error")
+        self.fs.fake_bucket.list = failing_list
+        try:
+            self.assertRaises(S3ResponseError, self.fs.glob, "**/*.txt")
+            self.assertEquals(self.fs.glob("**/*.txt", ignore_errors=True), [])
+        finally:
+            del self.fs.fake_bucket.list
+        self.assertEquals(self.fs.glob("**/*.txt"), ["/a/b.txt"])
+
+
+class TestS3FS_inventory(TestS3FS_local):
+
+    def setUp(self):
+        self.fs = LocalS3FS(inventory=True)
+
+    def test_inventory(self):
+        self.fs.makedir("foo/bar", recursive=True)
+        self.fs.setcontents("foo/a.txt", b("hello"))
+        self.fs.setcontents("foo/bar/b.txt", b("world"))
+        self.assertEquals(self.fs.listdir("foo/bar"), ["b.txt"])
+        #  Metadata comes from the inventory, not from the bucket
+        def no_list(*args, **kwds):
+            raise AssertionError("list() called")
+        self.fs.fake_bucket.list = no_list
+        self.assertTrue(self.fs.isdir("foo"))
+        self.assertTrue(self.fs.isdir("foo/bar"))
+        self.assertFalse(self.fs.isdir("foo/a.txt"))
+        self.assertTrue(self.fs.isfile("foo/a.txt"))
+        self.assertFalse(self.fs.isfile("foo/bar"))
+        self.assertTrue(self.fs.exists("foo/bar/b.txt"))
+        self.assertFalse(self.fs.exists("foo/b"))
+        self.assertEquals(sorted(self.fs.listdir("foo")), ["a.txt", "bar"])
+        self.assertEquals(self.fs.getinfo("foo/a.txt")["size"], 5)
+        self.fs.remove("foo/a.txt")
+        self.assertFalse(self.fs.exists("foo/a.txt"))
+        self.assertEquals(self.fs.listdir("foo"), ["bar"])
+        del self.fs.fake_bucket.list
+        #  Changes made by others are seen after a refresh
+        self.fs.fake_bucket.new_key("foo/c.txt").set_contents_from_string(b("!"))
+        self.assertFalse(self.fs.exists("foo/c.txt"))
+        self.fs.refresh_inventory()
+        self.assertTrue(self.fs.exists("foo/c.txt"))
+
+    def test_inventory_overlay(self):
+        inventory = s3fs._S3Inventory([("a/%d" % i,i,None) for i in xrange(100)])
+        inventory.min_overlay_size = 4
+        expected = dict(("a/%d" % i,i) for i in xrange(100))
+        for i in xrange(0, 150, 3):
+            inventory.put("a/%d" % i,1000 + i,None)
+            expected["a/%d" % i] = 1000 + i
+            inventory.delete("a/%d" % (i + 1),"a/%d" % (i + 2))
+            expected.pop("a/%d" % (i + 1),None)
+            expected.pop("a/%d" % (i + 2),None)
+            self.assertEquals(inventory.getsize("a/%d" % i),1000 + i)
+            self.assertEquals(inventory.getsize("a/%d" % (i + 1)),None)
+        listed = dict((name,size) for (name,size,etag)
+                                  in inventory.iter_children("a/","/"))
+        self.assertEquals(listed,expected)
+        inventory.delete(*expected)
+        self.assertFalse(inventory.has_prefix("a/"))
+
+    def test_inventory_has_prefix(self):
+        inventory = s3fs._S3Inventory([("a/1",1,None),("a/2",2,None),("b/1",1,None)])
+        #  Answered by searching, without listing the keys under the prefix
+        def no_listing(*args,**kwds):
+            raise AssertionError("listed the keys")
+        inventory.iter_children = no_listing
+        self.assertTrue(inventory.has_prefix("a/"))
+        self.assertFalse(inventory.has_prefix("c/"))
+        inventory.delete("a/1")
+        self.assertTrue(inventory.has_prefix("a/"))
+        inventory.delete("a/2")
+        self.assertFalse(inventory.has_prefix("a/"))
+        inventory.put("a/3",3,None)
+        self.assertTrue(inventory.has_prefix("a/"))
+        inventory.put("c/1",1,None)
+        inventory.delete("b/1")
+        self.assertFalse(inventory.has_prefix("b/"))
+        self.assertTrue(inventory.has_prefix("c/"))
+        self.assertTrue(inventory.has_prefix(""))
+
+    def test_inventory_refresh(self):
+        self.fs.setcontents("a.txt", b("hello"))
+        self.fs.refresh_inventory()
+        #  Writes made while the keys are being listed are not lost
+        bucket_list = self.fs.fake_bucket.list
+        def list_and_write(*args, **kwds):
+            keys = list(bucket_list(*args, **kwds))
+            del self.fs.fake_bucket.list
+            self.fs.setcontents("b.txt", b("world"))
+            self.fs.remove("a.txt")
+            return keys
+        self.fs.fake_bucket.list = list_and_write
+        self.fs.refresh_inventory()
+        self.assertEquals(self.fs.listdir(), ["b.txt"])
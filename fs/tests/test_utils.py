@@ -3,9 +3,25 @@ import unittest
 from fs.tempfs import TempFS
 from fs.memoryfs import MemoryFS
 from fs import utils
+from fs.errors import OperationFailedError
 
 from six import b
 
+class DirectCopyFS(MemoryFS):
+    """A MemoryFS that records copies made directly from other instances."""
+
+    def __init__(self):
+        super(DirectCopyFS, self).__init__()
+        self.direct_copies = []
+
+    def can_copy_from(self, src_fs):
+        return isinstance(src_fs, DirectCopyFS)
+
+    def copy_from(self, src_fs, src, dst, overwrite=False):
+        self.direct_copies.append((src, dst))
+        self.setcontents(dst, src_fs.getcontents(src, "rb"))
+
+
 class TestUtils(unittest.TestCase):
     
     def _make_fs(self, fs):
@@ -113,3 +129,61 @@ class TestUtils(unittest.TestCase):
         self.assert_(fs.isdirempty('/'))
     
     
+
+    def test_copyfile_fastcopy(self):
+        """Test copyfile between system paths, with and without kernel copies"""
+        from fs import fastcopy
+        data = b("0123456789") * 100000
+        fs1 = TempFS()
+        fs2 = TempFS()
+        fs1.setcontents("big", data)
+        fs1.setcontents("empty", b(""))
+        calls = (fastcopy._copy_file_range, fastcopy._sendfile)
+        try:
+            for copy_file_range, sendfile in [calls, (None, calls[1]), (None, None)]:
+                fastcopy._copy_file_range = copy_file_range
+                fastcopy._sendfile = sendfile
+                utils.copyfile(fs1, "big", fs2, "big")
+                utils.copyfile_non_atomic(fs1, "empty", fs2, "empty")
+                self.assertEqual(fs2.getcontents("big", "rb"), data)
+                self.assertEqual(fs2.getcontents("empty", "rb"), b(""))
+                fs2.remove("big")
+                fs2.remove("empty")
+        finally:
+            fastcopy._copy_file_range, fastcopy._sendfile = calls
+        fs1.copy("big", "big2")
+        self.assertEqual(fs1.getcontents("big2", "rb"), data)
+
+    def test_copy_direct(self):
+        """Test that copies between capable filesystems use copy_from"""
+        fs1 = DirectCopyFS()
+        fs2 = DirectCopyFS()
+        self._make_fs(fs1)
+        utils.copyfile(fs1, "f1", fs2, "f1")
+        self.assertEqual(fs2.direct_copies, [("f1", "f1")])
+        self.assertEqual(fs2.getcontents("f1", "rb"), b("file 1"))
+        utils.copydir((fs1, "foo"), (fs2, "copy"))
+        self.assertEqual(fs2.direct_copies[-1], ("/foo/bar/fruit", "/copy/bar/fruit"))
+        utils.movefile(fs1, "f2", fs2, "f2")
+        self.assertEqual(fs2.direct_copies[-1], ("f2", "f2"))
+        self.assert_(not fs1.exists("f2"))
+        self.assertEqual(fs2.getcontents("f2", "rb"), b("file 2"))
+        # An ordinary MemoryFS can't copy directly
+        fs3 = MemoryFS()
+        self.assert_(not utils.copyfile_direct(fs1, "f3", fs3, "f3"))
+        utils.copyfile(fs1, "f3", fs3, "f3")
+        self.assertEqual(fs3.getcontents("f3", "rb"), b("file 3"))
+
+    def test_countbytes(self):
+        fs = MemoryFS()
+        self._make_fs(fs)
+        self.assertEqual(utils.countbytes(fs), 23)
+        # Files with no size in their info are reported as getsize() does
+        class NoSizeFS(MemoryFS):
+            def getinfo(self, path):
+                info = super(NoSizeFS, self).getinfo(path)
+                info.pop("size", None)
+                return info
+        fs = NoSizeFS()
+        self._make_fs(fs)
+        self.assertRaises(OperationFailedError, utils.countbytes, fs)
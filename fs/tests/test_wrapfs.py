@@ -109,3 +109,25 @@ class TestHideDotFilesFS(unittest.TestCase):
         self.assertEquals(len(list(self.fs.ilistdir())), 2)
 
 
+from fs.wrapfs.hidefs import HideFS
+class TestHideFS(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(u"fstest")
+        open(os.path.join(self.temp_dir, u"a.pyc"), 'w').close()
+        open(os.path.join(self.temp_dir, u"a.py"), 'w').close()
+        os.mkdir(os.path.join(self.temp_dir, u".svn"))
+        open(os.path.join(self.temp_dir, u".svn", u"entries"), 'w').close()
+        self.fs = HideFS(osfs.OSFS(self.temp_dir), "*.pyc", ".svn")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        self.fs.close()
+
+    def test_hidden(self):
+        self.assertEquals(self.fs.listdir(), [u"a.py"])
+        self.assertFalse(self.fs.exists("a.pyc"))
+        self.assertFalse(self.fs.exists(".svn/entries"))
+        self.assertRaises(ResourceNotFoundError, self.fs.getcontents, ".svn/entries")
+
+
@@ -14,6 +14,7 @@ import shutil
 import fs.tests
 from fs.path import *
 from fs import zipfs
+from fs import errors
 
 from six import PY3, b
 
@@ -90,6 +91,59 @@ class TestReadZipFS(unittest.TestCase):
         check_listing('foo', ['second.txt', 'bar'])
         check_listing('foo/bar', ['baz.txt'])
 
+    def test_getmmap(self):
+        m = self.fs.getmmap("foo/bar/baz.txt", read_only=True)
+        self.assertEqual(len(m), 3)
+        self.assertEqual(m[:], b("baz"))
+        self.assertEqual(self.fs.getmmap("a.txt", read_only=True)[:], b("Hello, World!"))
+        self.assertRaises(errors.NoMMapError, self.fs.getmmap, "a.txt")
+        self.assertRaises(errors.ResourceNotFoundError, self.fs.getmmap, "nope.txt", read_only=True)
+
+    def test_getmmap_compressed(self):
+        self.fs.close()
+        zf = zipfile.ZipFile(self.temp_filename, "a", zipfile.ZIP_DEFLATED)
+        zf.writestr("big.txt", b("x") * 10000)
+        zf.close()
+        self.fs = zipfs.ZipFS(self.temp_filename, "r")
+        self.assertRaises(errors.NoMMapError, self.fs.getmmap, "big.txt", read_only=True)
+        self.assertEqual(self.fs.getmmap("b.txt", read_only=True)[:], b("b"))
+
+
+class TestReadZipFS_rw(TestReadZipFS):
+
+    def setUp(self):
+        super(TestReadZipFS_rw, self).setUp()
+        self.fs.close()
+        self.zip_file = open(self.temp_filename, "rb")
+        self.fs = zipfs.ZipFS(self.zip_file, "r", thread_synchronize="rw")
+
+    def tearDown(self):
+        self.zip_file.close()
+        super(TestReadZipFS_rw, self).tearDown()
+
+    def test_getmmap(self):
+        #  Only zips opened from a system path can be mapped
+        self.assertRaises(errors.NoMMapError, self.fs.getmmap, "a.txt", read_only=True)
+
+    test_getmmap_compressed = None
+
+    def test_concurrent_getcontents(self):
+        import threading
+        errors = []
+        def reader():
+            try:
+                for _ in xrange(50):
+                    self.assertEqual(self.fs.getcontents("a.txt"), b("Hello, World!"))
+                    self.assertEqual(self.fs.getinfo("foo/bar/baz.txt")["size"], 3)
+            except Exception, e:
+                errors.append(e)
+        threads = [threading.Thread(target=reader) for _ in xrange(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+
 
 class TestWriteZipFS(unittest.TestCase):
 
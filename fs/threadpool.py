@@ -0,0 +1,159 @@
+"""
+fs.threadpool
+=============
+
+A minimal pool of worker threads, used by filesystems that want to issue
+several slow (typically network) requests at the same time.
+
+Python 2 has no `concurrent.futures` in the standard library, so this module
+provides just enough of one for our purposes::
+
+    >>> from fs.threadpool import ThreadPool
+    >>> with ThreadPool(8) as pool:
+    ...     for info in pool.imap(s3fs.getinfo, paths):
+    ...         print info["size"]
+
+"""
+
+__all__ = ['ThreadPool',
+           'Task']
+
+import sys
+import Queue
+try:
+    import threading
+except ImportError:
+    import dummy_threading as threading
+
+
+#  Number of threads used if the caller doesn't specify
+DEFAULT_WORKERS = 4
+
+
+class Task(object):
+    """The pending result of a function submitted to a :class:`ThreadPool`."""
+
+    def __init__(self, func, args, kwds):
+        self.func = func
+        self.args = args
+        self.kwds = kwds
+        self._done = threading.Event()
+        self._result = None
+        self._exc_info = None
+
+    def run(self):
+        try:
+            self._result = self.func(*self.args, **self.kwds)
+        except Exception:
+            self._exc_info = sys.exc_info()
+        except BaseException:
+            #  e.g. KeyboardInterrupt; anyone waiting on the result sees it
+            #  too, and it still propagates in this thread
+            self._exc_info = sys.exc_info()
+            raise
+        finally:
+            self._done.set()
+
+    def done(self):
+        """Check if the task has finished running."""
+        return self._done.isSet()
+
+    def wait(self, timeout=None):
+        """Wait for the task to finish, returns True if it has finished."""
+        self._done.wait(timeout)
+        return self._done.isSet()
+
+    def result(self):
+        """Wait for the task to finish and return its result.
+
+        If the function raised an exception, it is re-raised here.
+
+        """
+        self._done.wait()
+        if self._exc_info is not None:
+            exc_info = self._exc_info
+            raise exc_info[0], exc_info[1], exc_info[2]
+        return self._result
+
+
+class ThreadPool(object):
+    """A fixed-size pool of daemon threads that run submitted functions.
+
+    Threads are started on demand, so creating a pool that is never used
+    costs nothing.  Call :meth:`close` (or use the pool as a context manager)
+    to stop the threads when the pool is no longer needed.
+
+    """
+
+    def __init__(self, num_workers=DEFAULT_WORKERS):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.num_workers = num_workers
+        self._jobs = Queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _worker(self):
+        while True:
+            task = self._jobs.get()
+            if task is None:
+                return
+            task.run()
+
+    def submit(self, func, *args, **kwds):
+        """Schedule func(\*args, \*\*kwds) to be run by a worker thread.
+
+        :rtype: a :class:`Task` object
+
+        """
+        task = Task(func, args, kwds)
+        with self._lock:
+            if self._closed:
+                raise ValueError("ThreadPool is closed")
+            if len(self._threads) < self.num_workers:
+                thread = threading.Thread(target=self._worker)
+                thread.setDaemon(True)
+                thread.start()
+                self._threads.append(thread)
+            self._jobs.put(task)
+        return task
+
+    def imap(self, func, iterable, window=None):
+        """Like `itertools.imap`, but calls func in the worker threads.
+
+        Results are yielded in the same order as `iterable`.  At most `window`
+        calls (twice the number of workers by default) are scheduled ahead of
+        the result being yielded, so very long iterables are not consumed all
+        at once.
+
+        """
+        if window is None:
+            window = self.num_workers * 2
+        pending = []
+        try:
+            for item in iterable:
+                pending.append(self.submit(func, item))
+                if len(pending) >= window:
+                    yield pending.pop(0).result()
+            while pending:
+                yield pending.pop(0).result()
+        finally:
+            #  If the caller stops early, wait for anything still in flight
+            for task in pending:
+                task.wait()
+
+    def close(self):
+        """Stop the worker threads once they have finished any pending tasks."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for _thread in self._threads:
+                self._jobs.put(None)
@@ -10,6 +10,9 @@ multiple Filesystems, for instance moving and copying between non-similar Filesy
 
 __all__ = ['copyfile',
            'movefile',
+           'copyfile_direct',
+           'copyfile_download',
+           'movefile_direct',
            'movedir',
            'copydir',
            'countbytes',
@@ -21,13 +24,17 @@ __all__ = ['copyfile',
 import sys
 import stat
 import six
+from itertools import islice
 
 from fs.mountfs import MountFS
+from fs.wrapfs.subfs import SubFS
 from fs.path import pathjoin
 from fs.errors import DestinationNotOlderError, DestinationExistsError, \
                       RemoveRootError, ResourceNotFoundError, \
-                      ResourceInvalidError, ParentDirectoryMissingError
+                      ResourceInvalidError, ParentDirectoryMissingError, \
+                      UnsupportedError
 from fs.base import FS
+from fs import iotools
 
 
 def assert_write(src_fs, src_path, dst_fs, dst_path, overwrite=True, update=False):
@@ -76,6 +83,14 @@ def copyfile(src_fs, src_path, dst_fs, dst_path, overwrite=True, update=False,
         FS._shutil_copyfile(src_syspath, dst_syspath)
         return
 
+    # Server-side copy if the destination supports it
+    if copyfile_direct(src_fs, src_path, dst_fs, dst_path, overwrite=True):
+        return
+
+    # Parallel download if the source supports it
+    if copyfile_download(src_fs, src_path, dst_fs, dst_path):
+        return
+
     src_lock = getattr(src_fs, '_lock', None)
 
     if src_lock is not None:
@@ -94,6 +109,91 @@ def copyfile(src_fs, src_path, dst_fs, dst_path, overwrite=True, update=False,
             src_lock.release()
 
 
+def _direct_location(fs, path):
+    """Look through SubFS and MountFS objects to find the FS (and path
+    within it) that actually stores a file."""
+    while True:
+        if isinstance(fs, SubFS):
+            fs, path = fs.wrapped_fs, fs._encode(path)
+        elif isinstance(fs, MountFS):
+            delegate_fs, _mount_path, delegate_path = fs._delegate(path)
+            if delegate_fs is None or delegate_fs is fs:
+                return fs, path
+            fs, path = delegate_fs, delegate_path
+        else:
+            return fs, path
+
+
+def copyfile_direct(src_fs, src_path, dst_fs, dst_path, overwrite=True):
+    """Copy a file from one filesystem to another without reading its contents,
+    if the destination filesystem supports it (see :meth:`fs.base.FS.can_copy_from`).
+
+    :param src_fs: Source filesystem object
+    :param src_path: Source path
+    :param dst_fs: Destination filesystem object
+    :param dst_path: Destination path
+    :param overwrite: Write to the destination file even if it already exists
+    :returns: True if the file was copied, False if it needs an ordinary copy
+
+    """
+    src_fs, src_path = _direct_location(src_fs, src_path)
+    dst_fs, dst_path = _direct_location(dst_fs, dst_path)
+    if not dst_fs.can_copy_from(src_fs):
+        return False
+    try:
+        dst_fs.copy_from(src_fs, src_path, dst_path, overwrite=overwrite)
+    except UnsupportedError:
+        return False
+    return True
+
+
+def copyfile_download(src_fs, src_path, dst_fs, dst_path):
+    """Copy a file from one filesystem to another by having the source
+    filesystem write its contents into the destination file, if the source
+    filesystem supports it (see :meth:`fs.s3fs.S3FS.download`).
+
+    :param src_fs: Source filesystem object
+    :param src_path: Source path
+    :param dst_fs: Destination filesystem object
+    :param dst_path: Destination path
+    :returns: True if the file was copied, False if it needs an ordinary copy
+
+    """
+    src_fs, src_path = _direct_location(src_fs, src_path)
+    download = getattr(src_fs, 'download', None)
+    if download is None or not src_fs.isfile(src_path):
+        return False
+    dst = dst_fs.open(dst_path, 'wb')
+    try:
+        download(src_path, dst)
+    finally:
+        dst.close()
+    return True
+
+
+def movefile_direct(src_fs, src_path, dst_fs, dst_path, overwrite=True):
+    """Move a file from one filesystem to another without reading its contents,
+    if the destination filesystem supports it (see :meth:`fs.base.FS.can_move_from`).
+
+    :param src_fs: Source filesystem object
+    :param src_path: Source path
+    :param dst_fs: Destination filesystem object
+    :param dst_path: Destination path
+    :param overwrite: Write to the destination file even if it already exists
+    :returns: True if the file was moved, False if it needs an ordinary move
+
+    """
+    src_fs, src_path = _direct_location(src_fs, src_path)
+    dst_fs, dst_path = _direct_location(dst_fs, dst_path)
+    if not dst_fs.can_move_from(src_fs):
+        return False
+    try:
+        dst_fs.move_from(src_fs, src_path, dst_path, overwrite=overwrite)
+    except UnsupportedError:
+        return False
+    return True
+
+
 def copyfile_non_atomic(src_fs, src_path, dst_fs, dst_path, overwrite=True,
                         update=False, chunk_size=64*1024):
     """A non atomic version of copyfile (will not block other threads using src_fs or dst_fst)
@@ -109,17 +209,28 @@ def copyfile_non_atomic(src_fs, src_path, dst_fs, dst_path, overwrite=True,
 
     assert_write(src_fs, src_path, dst_fs, dst_path, overwrite, update)
 
+    src_syspath = src_fs.getsyspath(src_path, allow_none=True)
+    dst_syspath = dst_fs.getsyspath(dst_path, allow_none=True)
+
+    # System copy if there are two sys paths
+    if src_syspath is not None and dst_syspath is not None:
+        FS._shutil_copyfile(src_syspath, dst_syspath)
+        return
+
+    # Server-side copy if the destination supports it
+    if copyfile_direct(src_fs, src_path, dst_fs, dst_path, overwrite=True):
+        return
+
+    # Parallel download if the source supports it
+    if copyfile_download(src_fs, src_path, dst_fs, dst_path):
+        return
+
     src = None
     dst = None
     try:
         src = src_fs.open(src_path, 'rb')
         dst = dst_fs.open(dst_path, 'wb')
-        write = dst.write
-        read = src.read
-        chunk = read(chunk_size)
-        while chunk:
-            write(chunk)
-            chunk = read(chunk_size)
+        iotools.copy_file_data(src, dst, chunk_size)
     finally:
         if src is not None:
             src.close()
@@ -153,6 +264,10 @@ def movefile(src_fs, src_path, dst_fs, dst_path, overwrite=True, chunk_size=64*1
         FS._shutil_movefile(src_syspath, dst_syspath)
         return
 
+    # Server-side move if the destination supports it
+    if movefile_direct(src_fs, src_path, dst_fs, dst_path, overwrite=overwrite):
+        return
+
     src_lock = getattr(src_fs, '_lock', None)
 
     if src_lock is not None:
@@ -190,18 +305,17 @@ def movefile_non_atomic(src_fs, src_path, dst_fs, dst_path, overwrite=True, chun
     if not overwrite and dst_fs.exists(dst_path):
         raise DestinationExistsError(dst_path)
 
+    # Server-side move if the destination supports it
+    if movefile_direct(src_fs, src_path, dst_fs, dst_path, overwrite=overwrite):
+        return
+
     src = None
     dst = None
     try:
         # Chunk copy
         src = src_fs.open(src_path, 'rb')
         dst = dst_fs.open(dst_path, 'wb')
-        write = dst.write
-        read = src.read
-        chunk = read(chunk_size)
-        while chunk:
-            write(chunk)
-            chunk = read(chunk_size)
+        iotools.copy_file_data(src, dst, chunk_size)
     except:
         raise
     else:
@@ -314,10 +428,29 @@ def countbytes(fs):
     :param fs: A filesystem object
 
     """
-    total = sum(fs.getsize(f) for f in fs.walkfiles())
+    total = sum(size for (_path, size) in _iter_sizes(fs, fs.walkfiles()))
     return total
 
 
+def _iter_sizes(fs, paths, batch_size=1000):
+    """Iterate over (path, size) pairs for the given files.
+
+    The info is fetched with getinfo_many, a batch at a time, so that the
+    paths needn't all be held in memory.  If the info lacks a size, the path
+    is passed to getsize, which raises the usual error.
+    """
+    paths = iter(paths)
+    while True:
+        batch = list(islice(paths, batch_size))
+        if not batch:
+            break
+        for (path, info) in fs.getinfo_many(batch):
+            size = info.get('size')
+            if size is None:
+                size = fs.getsize(path)
+            yield (path, size)
+
+
 def isdir(fs,path,info=None):
     """Check whether a path within a filesystem is a directory.
 
@@ -391,8 +524,8 @@ def find_duplicates(fs,
     # Create a dictionary that maps file sizes on to the paths of files with
     # that filesize. So we can find files of the same size with a quick lookup
     file_sizes = defaultdict(list)
-    for path in compare_paths:
-        file_sizes[fs.getsize(path)].append(path)
+    for path, size in _iter_sizes(fs, compare_paths):
+        file_sizes[size].append(path)
 
     size_duplicates = [paths for paths in file_sizes.itervalues() if len(paths) > 1]
 
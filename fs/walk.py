@@ -0,0 +1,208 @@
+"""
+fs.walk
+=======
+
+A directory walker that lists directories concurrently.
+
+The :meth:`~fs.base.FS.walk` method lists one directory at a time, which is
+fine for local filesystems but means that walking a network filesystem is
+bound by the round-trip time multiplied by the number of directories.  The
+functions in this module produce the same output as the corresponding FS
+methods, but fan the directory listings out over a pool of threads::
+
+    >>> from fs.walk import walkfiles
+    >>> for path in walkfiles(s3fs, "/logs", wildcard="*.gz", workers=16):
+    ...     print path
+
+These functions are also used by the FS methods when they are given a
+``workers`` argument, e.g. ``s3fs.walkfiles("/logs", workers=16)``.
+
+"""
+
+__all__ = ['walk',
+           'walkfiles',
+           'walkdirs']
+
+import sys
+import Queue
+try:
+    import threading
+except ImportError:
+    import dummy_threading as threading
+
+from fs.path import normpath, pathcombine, wildcard_matcher
+from fs.errors import ResourceNotFoundError
+
+
+#  Number of threads used if the caller doesn't specify
+DEFAULT_WORKERS = 4
+
+
+def walk(fs,
+         path="/",
+         wildcard=None,
+         dir_wildcard=None,
+         search="breadth",
+         ignore_errors=False,
+         workers=DEFAULT_WORKERS):
+    """Walks a directory tree using a pool of threads, and yields the path of
+    each directory and a list of its file contents.
+
+    The arguments are the same as for :meth:`fs.base.FS.walk`.  Directories
+    are listed as soon as they are discovered, so the order in which they
+    are yielded is not fixed; but a "breadth" search always yields a
+    directory before its sub-directories, and a "depth" search always
+    yields the sub-directories before their parent.
+
+    :param fs: a filesystem object
+    :param path: root path to start walking
+    :param wildcard: if given, only return files that match this wildcard
+    :param dir_wildcard: if given, only walk directories that match the wildcard
+    :param search: either "breadth" or "depth"
+    :param ignore_errors: ignore any errors reading the directory
+    :param workers: the number of directories to list concurrently
+
+    :rtype: iterator of (current_path, paths)
+
+    """
+    if search not in ("breadth", "depth"):
+        raise ValueError("Search should be 'breadth' or 'depth'")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    path = normpath(path)
+    if not fs.exists(path):
+        raise ResourceNotFoundError(path)
+
+    wildcard = wildcard_matcher(wildcard)
+    dir_wildcard = wildcard_matcher(dir_wildcard)
+    #  As with FS.walk, the dir_wildcard is matched against the full path
+    #  for a breadth search and against the directory name for a depth search
+    match_dir_path = search == "breadth"
+
+    def listdir(dir_path):
+        files = []
+        dirs = []
+        try:
+            #  Use the list form, so that wrappers which retry failed calls
+            #  (e.g. on a dropped connection) cover the whole listing
+            for name, info in fs.listdirinfo(dir_path):
+                sub_path = pathcombine(dir_path, name)
+                try:
+                    is_dir = info["is_dir"]
+                except KeyError:
+                    is_dir = fs.isdir(sub_path)
+                if is_dir:
+                    if dir_wildcard(sub_path if match_dir_path else name):
+                        dirs.append(sub_path)
+                elif wildcard(name):
+                    files.append(name)
+        except ResourceNotFoundError:
+            #  Could happen if another thread / process deletes something whilst we are walking
+            pass
+        except Exception:
+            if not ignore_errors:
+                raise
+        return files, dirs
+
+    jobs = Queue.Queue()
+    results = Queue.Queue()
+    stopped = threading.Event()
+
+    def worker():
+        while True:
+            dir_path = jobs.get()
+            if dir_path is None or stopped.isSet():
+                return
+            try:
+                results.put((dir_path, listdir(dir_path), None))
+            except Exception:
+                results.put((dir_path, None, sys.exc_info()))
+
+    threads = [threading.Thread(target=worker) for _ in xrange(workers)]
+    for thread in threads:
+        thread.setDaemon(True)
+        thread.start()
+
+    try:
+        jobs.put(path)
+        pending = 1
+        #  For a depth search, maps a directory on to its parent, its files
+        #  and the number of its sub-directories that have not been yielded
+        parents = {}
+        waiting = {}
+        while pending:
+            dir_path, listing, exc_info = results.get()
+            pending -= 1
+            if exc_info is not None:
+                raise exc_info[0], exc_info[1], exc_info[2]
+            files, dirs = listing
+            for sub_path in dirs:
+                jobs.put(sub_path)
+                pending += 1
+            if match_dir_path:
+                yield (dir_path, files)
+                continue
+            for sub_path in dirs:
+                parents[sub_path] = dir_path
+            waiting[dir_path] = [parents.pop(dir_path, None), files, len(dirs)]
+            while dir_path is not None:
+                parent, files, remaining = waiting[dir_path]
+                if remaining:
+                    break
+                del waiting[dir_path]
+                yield (dir_path, files)
+                if parent is not None:
+                    waiting[parent][2] -= 1
+                dir_path = parent
+    finally:
+        stopped.set()
+        for thread in threads:
+            jobs.put(None)
+
+
+def walkfiles(fs,
+              path="/",
+              wildcard=None,
+              dir_wildcard=None,
+              search="breadth",
+              ignore_errors=False,
+              workers=DEFAULT_WORKERS):
+    """Like the :func:`walk` function, but just yields file paths.
+
+    :param fs: a filesystem object
+    :param path: root path to start walking
+    :param wildcard: if given, only return files that match this wildcard
+    :param dir_wildcard: if given, only walk directories that match the wildcard
+    :param search: either "breadth" or "depth"
+    :param ignore_errors: ignore any errors reading the directory
+    :param workers: the number of directories to list concurrently
+
+    :rtype: iterator of file paths
+
+    """
+    for path, files in walk(fs, path, wildcard=wildcard, dir_wildcard=dir_wildcard, search=search, ignore_errors=ignore_errors, workers=workers):
+        for f in files:
+            yield pathcombine(path, f)
+
+
+def walkdirs(fs,
+             path="/",
+             wildcard=None,
+             search="breadth",
+             ignore_errors=False,
+             workers=DEFAULT_WORKERS):
+    """Like the :func:`walk` function, but just yields directory paths.
+
+    :param fs: a filesystem object
+    :param path: root path to start walking
+    :param wildcard: if given, only return directories that match this wildcard
+    :param search: either "breadth" or "depth"
+    :param ignore_errors: ignore any errors reading the directory
+    :param workers: the number of directories to list concurrently
+
+    :rtype: iterator of dir paths
+
+    """
+    for p, _files in walk(fs, path, dir_wildcard=wildcard, search=search, ignore_errors=ignore_errors, workers=workers):
+        yield p
@@ -466,6 +466,9 @@ class PollingWatchableFS(WatchableFS):
     (configurable) delay to account for the polling interval.
     """
 
+    #  Number of files whose info is fetched in each getinfo_many call
+    _poll_batch_size = 64
+
     def __init__(self,wrapped_fs,poll_interval=60*5):
         super(PollingWatchableFS,self).__init__(wrapped_fs)
         self.poll_interval = poll_interval
@@ -528,6 +531,16 @@ class PollingWatchableFS(WatchableFS):
             if not self.closed:
                 raise
 
+    def _iter_file_info(self,fpaths):
+        for i in xrange(0,len(fpaths),self._poll_batch_size):
+            if self._poll_close_event.isSet():
+                return
+            batch = fpaths[i:i+self._poll_batch_size]
+            for (fpath,info) in self.wrapped_fs.getinfo_many(batch):
+                if self._poll_close_event.isSet():
+                    return
+                yield (fpath,info)
+
     def _check_for_changes(self,dirnm):
         #  Check the metadata for the directory itself.
         new_info = self.wrapped_fs.getinfo(dirnm)
@@ -542,11 +555,10 @@ class PollingWatchableFS(WatchableFS):
         #  We assume that if the file's data changes, something in its
         #  metadata will also change; don't want to read through each file!
         #  Subdirectories will be handled by the outer polling loop.
-        for filenm in self.wrapped_fs.listdir(dirnm,files_only=True):
-            if self._poll_close_event.isSet():
-                return
-            fpath = pathjoin(dirnm,filenm)
-            new_info = self.wrapped_fs.getinfo(fpath)
+        #  Fetch the metadata in small batches, so that closing the FS
+        #  doesn't have to wait for a whole large directory to be stat'd.
+        fpaths = [pathjoin(dirnm,filenm) for filenm in self.wrapped_fs.listdir(dirnm,files_only=True)]
+        for (fpath,new_info) in self._iter_file_info(fpaths):
             try:
                 old_info = self._path_info[fpath]
             except KeyError:
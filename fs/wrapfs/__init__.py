@@ -15,9 +15,7 @@ standard unix shell functionality of hiding dot-files in directory listings.
 
 """
 
-import re
 import sys
-import fnmatch
 import threading
 
 from fs.base import FS, threading, synchronize, NoDefaultMeta
@@ -192,11 +190,7 @@ class WrapFS(FS):
         full = kwds.pop("full",False)
         absolute = kwds.pop("absolute",False)
         wildcard = kwds.pop("wildcard",None)
-        if wildcard is None:
-            wildcard = lambda fn:True
-        elif not callable(wildcard):
-            wildcard_re = re.compile(fnmatch.translate(wildcard))
-            wildcard = lambda fn:bool (wildcard_re.match(fn))
+        wildcard = wildcard_matcher(wildcard)
         entries = []
         enc_path = self._encode(path)
         for e in self.wrapped_fs.listdir(enc_path,**kwds):
@@ -220,11 +214,7 @@ class WrapFS(FS):
         full = kwds.pop("full",False)
         absolute = kwds.pop("absolute",False)
         wildcard = kwds.pop("wildcard",None)
-        if wildcard is None:
-            wildcard = lambda fn:True
-        elif not callable(wildcard):
-            wildcard_re = re.compile(fnmatch.translate(wildcard))
-            wildcard = lambda fn:bool (wildcard_re.match(fn))
+        wildcard = wildcard_matcher(wildcard)
         enc_path = self._encode(path)
         for e in self.wrapped_fs.ilistdir(enc_path,**kwds):
             e = basename(self._decode(pathcombine(enc_path,e)))
@@ -246,11 +236,7 @@ class WrapFS(FS):
         full = kwds.pop("full",False)
         absolute = kwds.pop("absolute",False)
         wildcard = kwds.pop("wildcard",None)
-        if wildcard is None:
-            wildcard = lambda fn:True
-        elif not callable(wildcard):
-            wildcard_re = re.compile(fnmatch.translate(wildcard))
-            wildcard = lambda fn:bool (wildcard_re.match(fn))
+        wildcard = wildcard_matcher(wildcard)
         entries = []
         enc_path = self._encode(path)
         for (nm,info) in self.wrapped_fs.listdirinfo(enc_path,**kwds):
@@ -274,11 +260,7 @@ class WrapFS(FS):
         full = kwds.pop("full",False)
         absolute = kwds.pop("absolute",False)
         wildcard = kwds.pop("wildcard",None)
-        if wildcard is None:
-            wildcard = lambda fn:True
-        elif not callable(wildcard):
-            wildcard_re = re.compile(fnmatch.translate(wildcard))
-            wildcard = lambda fn:bool (wildcard_re.match(fn))
+        wildcard = wildcard_matcher(wildcard)
         enc_path = self._encode(path)
         for (nm,info) in self.wrapped_fs.ilistdirinfo(enc_path,**kwds):
             nm = basename(self._decode(pathcombine(enc_path,nm)))
@@ -291,19 +273,19 @@ class WrapFS(FS):
             yield (nm,info)
 
     @rewrite_errors
-    def walk(self,path="/",wildcard=None,dir_wildcard=None,search="breadth",ignore_errors=False):
-        if dir_wildcard is not None:
+    def walk(self,path="/",wildcard=None,dir_wildcard=None,search="breadth",ignore_errors=False,workers=None):
+        if dir_wildcard is not None or workers:
             #  If there is a dir_wildcard, fall back to the default impl
             #  that uses listdir().  Otherwise we run the risk of enumerating
             #  lots of directories that will just be thrown away.
-            for item in super(WrapFS,self).walk(path,wildcard,dir_wildcard,search,ignore_errors):
+            #  The default impl also handles concurrent walking.
+            for item in super(WrapFS,self).walk(path,wildcard,dir_wildcard,search,ignore_errors,workers):
                 yield item
         #  Otherwise, the wrapped FS may provide a more efficient impl
         #  which we can use directly.
         else:
-            if wildcard is not None and not callable(wildcard):
-                wildcard_re = re.compile(fnmatch.translate(wildcard))
-                wildcard = lambda fn:bool (wildcard_re.match(fn))
+            if wildcard is not None:
+                wildcard = wildcard_matcher(wildcard)
             for (dirpath,filepaths) in self.wrapped_fs.walk(self._encode(path),search=search,ignore_errors=ignore_errors):
                 filepaths = [basename(self._decode(pathcombine(dirpath,p)))
                                  for p in filepaths]
@@ -313,19 +295,18 @@ class WrapFS(FS):
                 yield (dirpath,filepaths)
 
     @rewrite_errors
-    def walkfiles(self,path="/",wildcard=None,dir_wildcard=None,search="breadth",ignore_errors=False):
-        if dir_wildcard is not None:
+    def walkfiles(self,path="/",wildcard=None,dir_wildcard=None,search="breadth",ignore_errors=False,workers=None):
+        if dir_wildcard is not None or workers:
             #  If there is a dir_wildcard, fall back to the default impl
             #  that uses listdir().  Otherwise we run the risk of enumerating
             #  lots of directories that will just be thrown away.
-            for item in super(WrapFS,self).walkfiles(path,wildcard,dir_wildcard,search,ignore_errors):
+            for item in super(WrapFS,self).walkfiles(path,wildcard,dir_wildcard,search,ignore_errors,workers):
                 yield item
         #  Otherwise, the wrapped FS may provide a more efficient impl
         #  which we can use directly.
         else:
-            if wildcard is not None and not callable(wildcard):
-                wildcard_re = re.compile(fnmatch.translate(wildcard))
-                wildcard = lambda fn:bool (wildcard_re.match(fn))
+            if wildcard is not None:
+                wildcard = wildcard_matcher(wildcard)
             for filepath in self.wrapped_fs.walkfiles(self._encode(path),search=search,ignore_errors=ignore_errors):
                 filepath = abspath(self._decode(filepath))
                 if wildcard is not None:
@@ -334,12 +315,12 @@ class WrapFS(FS):
                 yield filepath
 
     @rewrite_errors
-    def walkdirs(self,path="/",wildcard=None,search="breadth",ignore_errors=False):
-        if wildcard is not None:
+    def walkdirs(self,path="/",wildcard=None,search="breadth",ignore_errors=False,workers=None):
+        if wildcard is not None or workers:
             #  If there is a wildcard, fall back to the default impl
             #  that uses listdir().  Otherwise we run the risk of enumerating
             #  lots of directories that will just be thrown away.
-            for item in super(WrapFS,self).walkdirs(path,wildcard,search,ignore_errors):
+            for item in super(WrapFS,self).walkdirs(path,wildcard,search,ignore_errors,workers):
                 yield item
         #  Otherwise, the wrapped FS may provide a more efficient impl
         #  which we can use directly.
@@ -368,6 +349,12 @@ class WrapFS(FS):
     def getinfo(self, path):
         return self.wrapped_fs.getinfo(self._encode(path))
 
+    @rewrite_errors
+    def getinfo_many(self, paths, ignore_errors=False):
+        paths = list(paths)
+        infos = self.wrapped_fs.getinfo_many([self._encode(p) for p in paths], ignore_errors=ignore_errors)
+        return [(path, info) for (path, (_p, info)) in zip(paths, infos)]
+
     @rewrite_errors
     def settimes(self, path, *args, **kwds):
         return self.wrapped_fs.settimes(self._encode(path), *args,**kwds)
@@ -474,6 +461,6 @@ wrap_fs_methods.method_names = ["open","exists","isdir","isfile","listdir",
     "makedir","remove","setcontents","removedir","rename","getinfo","copy",
     "move","copydir","movedir","close","getxattr","setxattr","delxattr",
     "listxattrs","validatepath","getsyspath","createfile", "hasmeta", "getmeta","listdirinfo",
-    "ilistdir","ilistdirinfo"]
+    "ilistdir","ilistdirinfo","getinfo_many"]
 
 
@@ -8,7 +8,6 @@ An FS wrapper class for hiding dot-files in directory listings.
 
 from fs.wrapfs import WrapFS
 from fs.path import *
-from fnmatch import fnmatch
 
 
 class HideDotFilesFS(WrapFS):
@@ -52,6 +51,8 @@ class HideDotFilesFS(WrapFS):
 
     def walk(self, path="/", wildcard=None, dir_wildcard=None, search="breadth",hidden=False):
         if search == "breadth":
+            wildcard = wildcard_matcher(wildcard, normcase=True)
+            dir_wildcard = wildcard_matcher(dir_wildcard, normcase=True)
             dirs = [path]
             while dirs:
                 current_path = dirs.pop()
@@ -59,16 +60,10 @@ class HideDotFilesFS(WrapFS):
                 for filename in self.listdir(current_path,hidden=hidden):
                     path = pathjoin(current_path, filename)
                     if self.isdir(path):
-                        if dir_wildcard is not None:
-                            if fnmatch(path, dir_wildcard):
-                                dirs.append(path)
-                        else:
+                        if dir_wildcard(path):
                             dirs.append(path)
                     else:
-                        if wildcard is not None:
-                            if fnmatch(path, wildcard):
-                                paths.append(filename)
-                        else:
+                        if wildcard(path):
                             paths.append(filename)
                 yield (current_path, paths)
         elif search == "depth":
@@ -7,10 +7,8 @@ Removes resources from a directory listing if they match a given set of wildcard
 """
 
 from fs.wrapfs import WrapFS
-from fs.path import iteratepath
+from fs.path import iteratepath, compile_wildcards
 from fs.errors import ResourceNotFoundError
-import re
-import fnmatch
 
 
 class HideFS(WrapFS):
@@ -23,12 +21,14 @@ class HideFS(WrapFS):
     """
 
     def __init__(self, wrapped_fs, *hide_wildcards):
-        self._hide_wildcards = [re.compile(fnmatch.translate(wildcard)) for wildcard in hide_wildcards]
+        self._hide_wildcards = hide_wildcards
+        #  One regex for all the wildcards, so each path component is only matched once
+        self._hide_match = compile_wildcards(hide_wildcards).match
         super(HideFS, self).__init__(wrapped_fs)
 
     def _should_hide(self, path):
-        return any(any(wildcard.match(part) for wildcard in self._hide_wildcards)
-                for part in iteratepath(path))
+        hide_match = self._hide_match
+        return any(hide_match(part) for part in iteratepath(path))
 
     def _encode(self, path):
         if self._should_hide(path):
@@ -49,7 +49,8 @@ class LimitSizeFS(WrapFS):
         self.cur_size = self._get_cur_size()
 
     def _get_cur_size(self,path="/"):
-        return sum(self.getsize(f) for f in self.walkfiles(path))
+        infos = self.getinfo_many(self.walkfiles(path))
+        return sum(info["size"] for (_path,info) in infos)
 
     def getsyspath(self, path, allow_none=False):
         #  If people could grab syspaths, they could route around our
@@ -220,6 +221,15 @@ class LimitSizeFS(WrapFS):
             pass
         return info
 
+    def getinfo_many(self, paths, ignore_errors=False):
+        infos = super(LimitSizeFS,self).getinfo_many(paths,ignore_errors=ignore_errors)
+        for (path,info) in infos:
+            try:
+                info["size"] = max(self._file_sizes[path][0],info["size"])
+            except KeyError:
+                pass
+        return infos
+
     def getsize(self, path):
         size = super(LimitSizeFS,self).getsize(path)
         try:
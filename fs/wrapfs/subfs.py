@@ -24,7 +24,12 @@ class SubFS(WrapFS):
         super(SubFS, self).__init__(wrapped_fs)
 
     def _encode(self, path):
-        return pathjoin(self.sub_dir, relpath(normpath(path)))
+        path = relpath(normpath(path))
+        if not path:
+            return NormalizedPath(self.sub_dir)
+        if self.sub_dir == '/':
+            return NormalizedPath(u'/' + path)
+        return NormalizedPath(self.sub_dir + u'/' + path)
 
     def _decode(self, path):
         return abspath(normpath(path))[len(self.sub_dir):]
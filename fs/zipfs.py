@@ -8,6 +8,9 @@ A FS object that represents the contents of a Zip file
 
 import datetime
 import os.path
+import struct
+import threading
+import zipfile
 
 from fs.base import *
 from fs.path import *
@@ -98,7 +101,7 @@ class ZipFS(FS):
         :param compression: can be 'deflated' (default) to compress data or 'stored' to just store date
         :param allow_zip_64: set to True to use zip files greater than 2 GB, default is False
         :param encoding: the encoding to use for unicode filenames
-        :param thread_synchronize: set to True (default) to enable thread-safety
+        :param thread_synchronize: set to True (default) to enable thread-safety, or "rw" to also allow concurrent reads
         :raises `fs.errors.ZipOpenError`: thrown if the zip file could not be opened
         :raises `fs.errors.ZipNotFoundError`: thrown if the zip file does not exist (derived from ZipOpenError)
 
@@ -141,6 +144,7 @@ class ZipFS(FS):
         if mode in 'wa':
             self.temp_fs = tempfs.TempFS()
 
+        self._read_lock = threading.Lock()
         self._path_fs = MemoryFS()
         if mode in 'ra':
             self._parse_resource_list()
@@ -228,13 +232,18 @@ class ZipFS(FS):
 
         raise ValueError("Mode must contain be 'r' or 'w'")
 
-    @synchronize
+    @synchronize_read
     def getcontents(self, path, mode="rb", encoding=None, errors=None, newline=None):
         if not self.exists(path):
             raise ResourceNotFoundError(path)
         path = normpath(relpath(path))
         try:
-            contents = self.zf.read(self._encode_path(path))
+            if self._zip_file_string:
+                contents = self.zf.read(self._encode_path(path))
+            else:
+                #  Every read seeks the same file object, so they can't overlap
+                with self._read_lock:
+                    contents = self.zf.read(self._encode_path(path))
         except KeyError:
             raise ResourceNotFoundError(path)
         except RuntimeError:
@@ -272,7 +281,7 @@ class ZipFS(FS):
     def listdir(self, path="/", wildcard=None, full=False, absolute=False, dirs_only=False, files_only=False):
         return self._path_fs.listdir(path, wildcard, full, absolute, dirs_only, files_only)
 
-    @synchronize
+    @synchronize_read
     def getinfo(self, path):
         if not self.exists(path):
             raise ResourceNotFoundError(path)
@@ -292,3 +301,53 @@ class ZipFS(FS):
         if 'FileHeader' in info:
             del info['FileHeader']
         return info
+
+    def getmmap(self, path, read_only=False, copy=False):
+        """Maps a file in the zip in to memory.
+
+        Only files stored without compression, in a zip file opened for
+        reading from a system path, can be mapped.  The zip file is mapped
+        read-only and a buffer covering just the file's data is returned
+        (a memoryview, or on Python 2 a buffer object).
+
+        """
+        if not read_only:
+            raise NoMMapError(path, msg="Files in a zip can only be mapped read-only: %(path)s")
+        if self.zip_mode != 'r' or not self._zip_file_string:
+            raise NoMMapError(path, msg="Only zip files opened for reading from a system path can be mapped: %(path)s")
+        path = normpath(relpath(path))
+        try:
+            zinfo = self.zf.getinfo(self._encode_path(path))
+        except KeyError:
+            raise ResourceNotFoundError(path)
+        if zinfo.compress_type != ZIP_STORED or zinfo.flag_bits & 0x1:
+            raise NoMMapError(path, msg="Only files stored without compression or encryption can be mapped: %(path)s")
+
+        try:
+            import mmap
+        except ImportError:
+            raise NoMMapError(msg="mmap not supported")
+
+        with open(self.zip_path, 'rb') as f:
+            #  The local header's extra field may differ from the one in
+            #  the central directory, so read it to find the data offset
+            f.seek(zinfo.header_offset)
+            header = f.read(zipfile.sizeFileHeader)
+            if len(header) != zipfile.sizeFileHeader:
+                raise NoMMapError(path, msg="Truncated file header: %(path)s")
+            header = struct.unpack(zipfile.structFileHeader, header)
+            if header[zipfile._FH_SIGNATURE] != zipfile.stringFileHeader:
+                raise NoMMapError(path, msg="Bad magic number for file header: %(path)s")
+            data_offset = (zinfo.header_offset + zipfile.sizeFileHeader +
+                           header[zipfile._FH_FILENAME_LENGTH] +
+                           header[zipfile._FH_EXTRA_FIELD_LENGTH])
+            size = zinfo.file_size
+            if not size:
+                return memoryview(b'')
+            #  Mappings must start on a multiple of the allocation granularity
+            start = data_offset - (data_offset % mmap.ALLOCATIONGRANULARITY)
+            m = mmap.mmap(f.fileno(), data_offset - start + size,
+                          access=mmap.ACCESS_READ, offset=start)
+        if PY3:
+            return memoryview(m)[data_offset - start:]
+        return buffer(m, data_offset - start, size)
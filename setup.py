@@ -44,6 +44,8 @@ if PY3:
     extra["use_2to3"] = True
 
 setup(install_requires=['setuptools', 'six'],
+      # Faster directory listings before Python 3.5 (see fs.osfs)
+      extras_require={'scandir': ['scandir']},
       name='fs',
       version=VERSION,
       description="Filesystem abstraction layer",